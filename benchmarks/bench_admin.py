@@ -0,0 +1,109 @@
+"""Замер списка публикаций в админке на большой таблице.
+
+Заполняет временную базу синтетическими постами с длинным текстом и
+измеряет время и число SQL-запросов первой и последней страницы
+changelist, а также сохранения категории у всех строк страницы.
+
+    python benchmarks/bench_admin.py --posts 1000000
+"""
+import argparse
+import statistics
+import time
+
+from common import setup_django
+
+BATCH_SIZE = 10_000
+CATEGORIES = 20
+TEXT = 'Длинный текст публикации. ' * 200
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+    from django.utils import timezone
+
+    from blog.models import Category, Post, User
+
+    Category.objects.bulk_create(
+        Category(title=f'Категория {n}', slug=f'c{n}', description='-')
+        for n in range(CATEGORIES)
+    )
+    categories = list(Category.objects.values_list('pk', flat=True))
+    author = User.objects.create_superuser('admin', 'admin@blogicum.not', '-')
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        # Полнотекстовый индекс для замера не нужен.
+        for name in ('insert', 'delete', 'update'):
+            cursor.execute(f'DROP TRIGGER blog_post_search_{name}')
+        for start in range(0, args.posts, BATCH_SIZE):
+            cursor.executemany(
+                'INSERT INTO blog_post (is_published, title, text, image,'
+                ' created_at, pub_date, updated_at, author_id, category_id,'
+                ' comment_count, image_variants, image_status)'
+                " VALUES (1, %s, %s, '', %s, %s, %s, %s, %s, 0, '{}', '')",
+                [
+                    (f'Пост {n}', TEXT, now, now, now, author.pk,
+                     categories[n % CATEGORIES])
+                    for n in range(start, min(start + BATCH_SIZE,
+                                              args.posts))
+                ],
+            )
+
+    client = Client()
+    client.force_login(author)
+    url = reverse('admin:blog_post_changelist')
+    last_page = args.posts // 100
+
+    def measure(name, request):
+        request()
+        timings = []
+        for _ in range(args.repeat):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = request()
+                timings.append((time.perf_counter() - start) * 1000)
+            assert response.status_code in (200, 302), response.status_code
+        print(
+            f'{name}: медиана {statistics.median(timings):.1f} мс, '
+            f'{len(queries)} SQL-запросов'
+        )
+
+    measure('Первая страница', lambda: client.get(url))
+    measure('Последняя страница', lambda: client.get(url, {'p': last_page}))
+    measure(
+        'Фильтр по категории',
+        lambda: client.get(url, {'category__id__exact': categories[0]}),
+    )
+
+    page = list(Post.objects.order_by('-pk').values_list('pk', flat=True)[
+        :100
+    ])
+    saves = []
+
+    def save():
+        # Каждое сохранение меняет категорию у всех строк страницы.
+        saves.append(None)
+        data = {
+            'form-TOTAL_FORMS': len(page),
+            'form-INITIAL_FORMS': len(page),
+            '_save': 'Сохранить',
+        }
+        for n, pk in enumerate(page):
+            data[f'form-{n}-id'] = pk
+            data[f'form-{n}-category'] = categories[(n + len(saves)) % 2]
+        return client.post(url, data)
+
+    measure('Сохранение 100 строк', save)
+
+
+if __name__ == '__main__':
+    main()
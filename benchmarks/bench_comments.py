@@ -0,0 +1,90 @@
+"""Замер пропускной способности добавления комментариев.
+
+Несколько потоков одновременно отправляют комментарии к одному
+популярному посту через `CommentCreateView`.
+
+    python benchmarks/bench_comments.py --posters 8 --comments 50
+"""
+import argparse
+import threading
+import time
+
+from common import setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posters', type=int, default=8)
+    parser.add_argument('--comments', type=int, default=50,
+                        help='Комментариев от каждого автора.')
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.db import connection, connections
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+    from django.utils import timezone
+
+    from blog.models import Category, Comment, Post, User
+
+    category = Category.objects.create(
+        title='Бенчмарк', slug='bench', description='-',
+    )
+    author = User.objects.create_user('author')
+    post = Post.objects.create(
+        title='Популярный пост', text='-', author=author,
+        category=category, pub_date=timezone.now(),
+    )
+    url = f'/posts/{post.pk}/comment/'
+    posters = [
+        User.objects.create_user(f'poster{n}') for n in range(args.posters)
+    ]
+
+    client = Client()
+    client.force_login(posters[0])
+    # Первый комментарий заполняет кэши и создаёт строки счётчиков;
+    # запросы считаются на втором, как у любого следующего.
+    client.post(url, {'text': 'разогрев'})
+    with CaptureQueriesContext(connection) as queries:
+        client.post(url, {'text': 'замер запросов'})
+    writes = [
+        query['sql'].split()[0] for query in queries.captured_queries
+    ]
+
+    errors = []
+
+    def post_comments(user):
+        poster_client = Client()
+        poster_client.force_login(user)
+        for n in range(args.comments):
+            response = poster_client.post(url, {'text': f'комментарий {n}'})
+            if response.status_code != 302:
+                errors.append(response.status_code)
+        connections.close_all()
+
+    threads = [
+        threading.Thread(target=post_comments, args=(user,))
+        for user in posters
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    total = args.posters * args.comments
+    post.refresh_from_db()
+    print(f'Авторов: {args.posters}, комментариев: {total}')
+    print(f'Время: {elapsed:.2f} с, {total / elapsed:.1f} комментариев/с')
+    print(f'Ошибок: {len(errors)}')
+    print(f'SQL на один комментарий: {len(writes)} ({", ".join(writes)})')
+    print(
+        'Счётчик сходится:',
+        post.comment_count == Comment.objects.filter(post=post).count(),
+    )
+
+
+if __name__ == '__main__':
+    main()
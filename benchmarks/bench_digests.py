@@ -0,0 +1,70 @@
+"""Замер сборки дайджестов категорий на синтетических подписчиках.
+
+Создаёт пользователей, подписки на случайные категории и свежие
+публикации, затем собирает дайджесты в режиме dry-run (без отправки) и
+печатает число дайджестов в секунду.
+
+    python benchmarks/bench_digests.py --subscribers 100000
+"""
+import argparse
+import random
+
+from common import setup_django, timer
+
+BATCH_SIZE = 5000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--subscribers', type=int, default=100_000)
+    parser.add_argument('--categories', type=int, default=20)
+    parser.add_argument('--per-subscriber', type=int, default=3)
+    parser.add_argument('--posts', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    from blog.digests import send_digests
+    from blog.models import Category, CategorySubscription, Post, User
+
+    now = timezone.now()
+    Category.objects.bulk_create(
+        Category(title=f'Категория {n}', slug=f'c{n}', description='-')
+        for n in range(args.categories)
+    )
+    categories = list(Category.objects.all())
+    author = User.objects.create_user('author')
+    Post.objects.bulk_create(
+        Post(
+            title=f'Пост {n}', text='-', author=author, category=category,
+            pub_date=now - timedelta(minutes=n + 1),
+        )
+        for category in categories for n in range(args.posts)
+    )
+    User.objects.bulk_create((
+        User(username=f'reader{n}', email=f'reader{n}@blogicum.not')
+        for n in range(args.subscribers)
+    ), batch_size=BATCH_SIZE)
+    readers = User.objects.filter(
+        username__startswith='reader',
+    ).values_list('pk', flat=True)
+    CategorySubscription.objects.bulk_create((
+        CategorySubscription(user_id=pk, category=category)
+        for pk in readers.iterator()
+        for category in random.sample(categories, args.per_subscriber)
+    ), batch_size=BATCH_SIZE)
+
+    results = {}
+    with timer(results, 'dry_run'):
+        count = send_digests(until=now, dry_run=True)
+    elapsed = results['dry_run']
+    print(f'Дайджестов: {count} за {elapsed:.2f} с')
+    print(f'Скорость: {count / elapsed:.0f} дайджестов в секунду')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Замер отрисовки страницы из 10 карточек постов.
+
+Сравнивает отрисовку с пустым кэшем фрагментов (все карточки
+отрисовываются заново) и с прогретым кэшем.
+
+    python benchmarks/bench_post_cards.py --repeat 200
+"""
+import argparse
+
+from common import setup_django, timer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.core.cache.utils import make_template_fragment_key
+    from django.test import Client
+    from django.utils import timezone
+
+    from blog.models import Category, Location, Post, User
+
+    settings.PAGE_CACHE_TIMEOUT = 0
+    category = Category.objects.create(
+        title='Бенчмарк', slug='bench', description='-',
+    )
+    location = Location.objects.create(name='Лаборатория')
+    author = User.objects.create_user('author')
+    Post.objects.bulk_create(
+        Post(
+            title=f'Пост {n}', text='Слово ' * 50, author=author,
+            category=category, location=location, pub_date=timezone.now(),
+        )
+        for n in range(10)
+    )
+    # Удаляются только карточки: счётчик страниц и справочники остаются
+    # в кэше, и замеры отличаются лишь отрисовкой карточек.
+    card_keys = [
+        make_template_fragment_key(
+            'post_card', [post.pk, post.updated_at, post.comment_count],
+        )
+        for post in Post.objects.all()
+    ]
+
+    client = Client()
+    results = {}
+    client.get('/')
+    with timer(results, 'cold'):
+        for _ in range(args.repeat):
+            cache.delete_many(card_keys)
+            client.get('/')
+    with timer(results, 'warm'):
+        for _ in range(args.repeat):
+            client.get('/')
+
+    for name, elapsed in results.items():
+        print(
+            f'{name}: {elapsed / args.repeat * 1000:.2f} мс на страницу'
+        )
+    print(f'Ускорение: {results["cold"] / results["warm"]:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Замер полнотекстового поиска по публикациям.
+
+Заполняет временную базу синтетическими постами (слова из словаря с
+распределением Ципфа), строит индекс FTS5 и измеряет время первой
+страницы поиска для редкого, среднего и частого слова и для двух слов.
+
+    python benchmarks/bench_search.py --posts 1000000
+"""
+import argparse
+import random
+import statistics
+
+from common import setup_django
+
+VOCABULARY = 20_000
+WORDS_IN_TEXT = 40
+BATCH_SIZE = 10_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.db import connection
+    from django.utils import timezone
+
+    from blog import search
+    from blog.models import Category, User
+
+    rng = random.Random(0)
+    words = [f'слово{n}' for n in range(VOCABULARY)]
+    weights = [1 / (n + 1) for n in range(VOCABULARY)]
+    category = Category.objects.create(
+        title='Бенчмарк', slug='bench', description='-',
+    )
+    author = User.objects.create_user('author')
+    now = timezone.now()
+
+    def rows(start, count):
+        for n in range(start, start + count):
+            text = rng.choices(words, weights, k=WORDS_IN_TEXT)
+            yield (
+                ' '.join(text[:5]), ' '.join(text), now, now, now,
+                author.pk, category.pk,
+            )
+
+    with connection.cursor() as cursor:
+        # Индекс строится одним проходом после вставки, а не триггерами.
+        for name in ('insert', 'delete', 'update'):
+            cursor.execute(f'DROP TRIGGER blog_post_search_{name}')
+        for start in range(0, args.posts, BATCH_SIZE):
+            cursor.executemany(
+                'INSERT INTO blog_post (is_published, title, text, image,'
+                ' created_at, pub_date, updated_at, author_id, category_id,'
+                ' comment_count, image_variants, image_status)'
+                " VALUES (1, %s, %s, '', %s, %s, %s, %s, %s, 0, '{}', '')",
+                list(rows(start, min(BATCH_SIZE, args.posts - start))),
+            )
+    search.ensure_index()
+    search.rebuild()
+
+    queries = {
+        'редкое слово': words[-1],
+        'среднее слово': words[VOCABULARY // 100],
+        'частое слово': words[0],
+        'два слова': f'{words[10]} {words[500]}',
+    }
+    for name, query in queries.items():
+        timings = []
+        for _ in range(args.repeat):
+            start = timezone.now()
+            page = search.SearchPaginator(search.search(query), 10).page()
+            timings.append((timezone.now() - start).total_seconds() * 1000)
+        print(
+            f'{name}: {len(page)} на странице, медиана '
+            f'{statistics.median(timings):.2f} мс'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Замер запуска `wsgi.application` в профилях dev и prod.
+
+Каждый запуск идёт в отдельном процессе: импорт приложения, первый
+ответ на `GET /pages/about/` и повторный ответ уже прогретого процесса.
+Время до первого ответа — сумма импорта и первого ответа: в dev часть
+URLconf загружается debug-панелью ещё при импорте. Для prod статика
+один раз собирается `collectstatic` во временный каталог: без манифеста
+хранилище не отдаст хешированные имена.
+
+    python benchmarks/bench_startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import PROJECT_DIR
+
+URL = '/pages/about/'
+STAGES = ('import', 'first', 'second')
+
+
+def request(application, path):
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': sys.stdin.buffer,
+    }
+    statuses = []
+    body = b''.join(application(
+        environ, lambda status, headers: statuses.append(status),
+    ))
+    return statuses[0], body
+
+
+def child():
+    sys.path.insert(0, str(PROJECT_DIR))
+    timings = {}
+    start = time.perf_counter()
+    from blogicum.wsgi import application
+    timings['import'] = time.perf_counter() - start
+    for stage in STAGES[1:]:
+        start = time.perf_counter()
+        status, _ = request(application, URL)
+        timings[stage] = time.perf_counter() - start
+    timings['status'] = status
+    timings['debug_toolbar'] = 'debug_toolbar' in sys.modules
+    print(json.dumps(timings))
+
+
+def profile_env(profile, static_root):
+    env = {
+        **os.environ,
+        'DJANGO_ENV': profile,
+        'DJANGO_STATIC_ROOT': static_root,
+    }
+    env.pop('DJANGO_SETTINGS_MODULE', None)
+    return env
+
+
+def collectstatic(static_root):
+    subprocess.run(
+        [
+            sys.executable, str(PROJECT_DIR / 'manage.py'),
+            'collectstatic', '--noinput', '--verbosity', '0',
+        ],
+        env=profile_env('prod', static_root), check=True,
+    )
+
+
+def run_profile(profile, static_root):
+    output = subprocess.run(
+        [sys.executable, __file__, '--child'],
+        env=profile_env(profile, static_root),
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--child', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return
+
+    with tempfile.TemporaryDirectory(prefix='blogicum-static-') as root:
+        collectstatic(root)
+        for profile in ('dev', 'prod'):
+            runs = [run_profile(profile, root) for _ in range(args.runs)]
+            medians = {
+                stage: statistics.median(run[stage] for run in runs) * 1000
+                for stage in STAGES
+            }
+            print(
+                f'{profile}: до первого ответа '
+                f'{medians["import"] + medians["first"]:.1f} мс '
+                f'(импорт {medians["import"]:.1f} мс, '
+                f'первый ответ {medians["first"]:.1f} мс, '
+                f'повторный {medians["second"]:.1f} мс), '
+                f'статус {runs[0]["status"]}, '
+                f'debug_toolbar: {runs[0]["debug_toolbar"]}'
+            )
+
+
+if __name__ == '__main__':
+    main()
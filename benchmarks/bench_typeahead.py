@@ -0,0 +1,98 @@
+"""Замер индекса подсказок поиска: память и время ответа.
+
+Строит индекс из синтетических заголовков (3–8 слов из словаря с
+распределением Ципфа) и печатает прирост памяти процесса на 100 тысяч
+заголовков, время построения, поиска по префиксу и обновления поста.
+
+    python benchmarks/bench_typeahead.py --titles 100000
+"""
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+
+from common import setup_django
+
+VOCABULARY = 20_000
+CATEGORIES = 50
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from blog.typeahead import POST, TitleIndex
+
+    # Замеряется только поиск по загруженному индексу, без сверки с базой.
+    TitleIndex.background = False
+
+    rng = random.Random(0)
+    syllables = ['ка', 'ло', 'ре', 'ми', 'ну', 'сто', 'вер', 'пан', 'дор']
+    words = sorted({
+        ''.join(rng.choices(syllables, k=rng.randint(2, 4)))
+        for _ in range(VOCABULARY)
+    })
+    weights = [1 / (n + 1) for n in range(len(words))]
+    now = time.time()
+    posts = [
+        (pk, (
+            ' '.join(rng.choices(words, weights, k=rng.randint(3, 8)))
+            .capitalize(),
+            now - pk, pk % CATEGORIES + 1,
+        ))
+        for pk in range(1, args.titles + 1)
+    ]
+    categories = [
+        (pk, (f'Категория {pk}', f'c{pk}', True))
+        for pk in range(1, CATEGORIES + 1)
+    ]
+
+    index = TitleIndex()
+    started = time.perf_counter()
+    index.load(iter(posts), iter(categories))
+    elapsed = time.perf_counter() - started
+
+    index = TitleIndex()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    index.load(iter(posts), iter(categories))
+    size, peak = tracemalloc.get_traced_memory()
+    size -= before
+    tracemalloc.stop()
+    per_100k = size / args.titles * 100_000
+    print(
+        f'Заголовков: {args.titles}, ключей: {len(index._keys)}, '
+        f'построение {elapsed:.2f} с'
+    )
+    print(
+        f'Память: {size / 2**20:.1f} МБ, {per_100k / 2**20:.1f} МБ '
+        f'на 100 тысяч заголовков, пик при построении '
+        f'{(peak - before) / 2**20:.1f} МБ'
+    )
+
+    prefixes = [word[:rng.randint(2, 5)] for word in words[::50]]
+    timings = []
+    for _ in range(args.repeat):
+        prefix = rng.choice(prefixes)
+        started = time.perf_counter()
+        index.lookup(prefix)
+        timings.append((time.perf_counter() - started) * 1e6)
+    print(f'Поиск по префиксу: медиана {statistics.median(timings):.0f} мкс,'
+          f' максимум {max(timings):.0f} мкс')
+
+    timings = []
+    for _ in range(args.repeat):
+        pk, (title, *rest) = rng.choice(posts)
+        started = time.perf_counter()
+        index.apply((POST, pk, (title[::-1], *rest)))
+        timings.append((time.perf_counter() - started) * 1e6)
+    print(f'Обновление поста: медиана {statistics.median(timings):.0f} мкс')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Общая настройка Django для скриптов замеров.
+
+Каждый замер работает с временной базой SQLite и своим файловым
+кэшем, чтобы не трогать рабочие `db.sqlite3` и кэш сайта.
+"""
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'blogicum'
+
+
+def setup_django(db_path=None):
+    """Настраивает Django на временную базу и применяет миграции."""
+    sys.path.insert(0, str(PROJECT_DIR))
+    work_dir = Path(tempfile.mkdtemp(prefix='blogicum-'))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+    os.environ.setdefault('DJANGO_ENV', 'prod')
+    os.environ['DJANGO_CACHE_DIR'] = str(work_dir / 'cache')
+
+    import django
+    from django.conf import settings
+
+    if db_path is None:
+        db_path = work_dir / 'db.sqlite3'
+    settings.DATABASES['default']['NAME'] = str(db_path)
+    settings.DATABASES['default'].setdefault('OPTIONS', {})['timeout'] = 30
+    # Хешированные имена статики есть только после collectstatic.
+    settings.STATICFILES_STORAGE = (
+        'django.contrib.staticfiles.storage.StaticFilesStorage'
+    )
+    django.setup()
+
+    from django.core.management import call_command
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    call_command('migrate', verbosity=0)
+    return db_path
+
+
+@contextmanager
+def timer(results, name):
+    start = time.perf_counter()
+    yield
+    results[name] = time.perf_counter() - start
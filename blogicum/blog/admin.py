@@ -1,6 +1,104 @@
+import json
+
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.contrib.admin.options import get_content_type_for_model
+from django.db import transaction
+from django.db.models.functions import Substr
+from django.forms.utils import flatatt
+from django.utils import timezone
+from django.utils.html import format_html, format_html_join
+
+from . import feed, typeahead
+from .forms import CategoryChoiceField
+from .models import Category, CategorySubscription, Comment, Location, Post
+from .signals import after_commit
+from core.cache import invalidate_tags
+from core.paginators import EstimatedCountPaginator, invalidate_cached_counts
+
+TEXT_PREVIEW_LENGTH = 60
+
+
+class CategorySelect(forms.Select):
+    """`<select>`, который отрисовывает варианты один раз на каждое
+    выбранное значение: строки changelist получают готовый HTML.
+
+    Копии виджета в формах строк делят один словарь отрисовок.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rendered_options = {}
+
+    def render(self, name, value, attrs=None, renderer=None):
+        selected = tuple(self.format_value(value))
+        options = self.rendered_options.get(selected)
+        if options is None:
+            options = self.rendered_options[selected] = format_html_join(
+                '\n', '<option value="{}"{}>{}</option>', (
+                    (
+                        option_value,
+                        ' selected' if str(option_value) in selected else '',
+                        label,
+                    )
+                    for option_value, label in self.choices
+                ),
+            )
+        return format_html(
+            '<select name="{}"{}>{}</select>',
+            name, flatatt(self.build_attrs(self.attrs, attrs)), options,
+        )
+
+
+class AdminCategoryField(CategoryChoiceField):
+    """Выбор категории по справочнику `registry` для админки.
+
+    Список вариантов строится один раз на форму и общий для всех строк
+    changelist вместе с отрисовкой `CategorySelect`.
+    """
+
+    widget = CategorySelect
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.choices = list(self.choices)
+
+
+class EditedRowField(forms.ModelChoiceField):
+    """Поле pk строки changelist: пост строки formset уже загрузил, и поле
+    возвращает его, а не запрашивает каждую строку отдельно."""
+
+    def __init__(self, instance, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.instance = instance
+
+    def to_python(self, value):
+        if (
+            value not in self.empty_values
+            and not self.instance._state.adding
+            and str(value) == str(self.instance.pk)
+        ):
+            return self.instance
+        return super().to_python(value)
+
+
+class PostChangeListFormSet(forms.BaseModelFormSet):
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        name = self._pk_field.name
+        field = form.fields[name]
+        form.fields[name] = EditedRowField(
+            form.instance, field.queryset, initial=field.initial,
+            required=False, widget=field.widget,
+        )
 
-from .models import Category, Comment, Location, Post
+
+class PostChangeListForm(forms.ModelForm):
+    def _get_validation_exclusions(self):
+        # Категорию уже проверил AdminCategoryField по справочнику: модель
+        # проверила бы её ещё раз запросом на каждую строку.
+        return [*super()._get_validation_exclusions(), 'category']
 
 
 @admin.register(Category)
@@ -35,7 +133,7 @@ class LocationAdmin(admin.ModelAdmin):
 class PostAdmin(admin.ModelAdmin):
     list_display = (
         'title',
-        'text',
+        'short_text',
         'pub_date',
         'author',
         'location',
@@ -48,7 +146,108 @@ class PostAdmin(admin.ModelAdmin):
     search_fields = ('title',)
     list_filter = ('category',)
     list_display_links = ('title',)
+    list_select_related = ('author', 'location', 'category')
     empty_value_display = 'Не задано'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if getattr(request.resolver_match, 'url_name', None) != (
+            'blog_post_changelist'
+        ):
+            return queryset
+        # Для списка нужно только начало текста: весь текст не читается.
+        return queryset.defer('text').annotate(
+            text_start=Substr('text', 1, TEXT_PREVIEW_LENGTH + 1),
+        )
+
+    @admin.display(description='Текст')
+    def short_text(self, post):
+        text = post.text_start
+        if len(text) > TEXT_PREVIEW_LENGTH:
+            text = text[:TEXT_PREVIEW_LENGTH - 1] + '…'
+        return text
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'category':
+            kwargs['form_class'] = AdminCategoryField
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_form(self, request, **kwargs):
+        kwargs.setdefault('form', PostChangeListForm)
+        return super().get_changelist_form(request, **kwargs)
+
+    def get_changelist_formset(self, request, **kwargs):
+        kwargs.setdefault('formset', PostChangeListFormSet)
+        return super().get_changelist_formset(request, **kwargs)
+
+    def changelist_view(self, request, extra_context=None):
+        if request.method != 'POST' or '_save' not in request.POST:
+            return super().changelist_view(request, extra_context)
+        # Изменённые в списке посты и записи журнала админки сохраняются
+        # одним запросом каждые.
+        request.edited_posts = []
+        request.edited_log = []
+        with transaction.atomic():
+            response = super().changelist_view(request, extra_context)
+            self.save_edited(request.edited_posts)
+            LogEntry.objects.bulk_create(request.edited_log)
+        return response
+
+    def save_model(self, request, obj, form, change):
+        edited = getattr(request, 'edited_posts', None)
+        if edited is None or not change:
+            return super().save_model(request, obj, form, change)
+        edited.append(obj)
+
+    def log_change(self, request, object, message):
+        log = getattr(request, 'edited_log', None)
+        if log is None:
+            return super().log_change(request, object, message)
+        entry = LogEntry(
+            user_id=request.user.pk,
+            content_type_id=get_content_type_for_model(object).pk,
+            object_id=str(object.pk),
+            object_repr=str(object)[:200],
+            action_flag=CHANGE,
+            change_message=(
+                json.dumps(message) if isinstance(message, list)
+                else message
+            ),
+        )
+        log.append(entry)
+        return entry
+
+    def save_edited(self, posts):
+        """Сохраняет посты одним запросом.
+
+        `bulk_update()` не отправляет `post_save`, поэтому лента, индекс
+        подсказок и кэш страниц обновляются здесь, один раз на все
+        посты. Автор, дата и картинка в списке не меняются: статистика
+        профилей и варианты картинок остаются прежними.
+        """
+        if not posts:
+            return
+        now = timezone.now()
+        for post in posts:
+            post.updated_at = now
+        Post.objects.bulk_update(posts, (*self.list_editable, 'updated_at'))
+        feed.sync_posts([post.pk for post in posts])
+        after_commit(
+            typeahead.index.publish_many,
+            [typeahead.post_entry(post) for post in posts],
+        )
+        after_commit(invalidate_cached_counts)
+        after_commit(invalidate_tags, 'feed', *(
+            tag
+            for post in posts
+            for tag in (
+                f'post:{post.pk}',
+                f'feed:category:{post.category_id}',
+                f'feed:author:{post.author_id}',
+            )
+        ))
 
 
 @admin.register(Comment)
@@ -59,3 +258,16 @@ class CommentAdmin(admin.ModelAdmin):
         'created_at',
         'author',
     )
+
+
+@admin.register(CategorySubscription)
+class CategorySubscriptionAdmin(admin.ModelAdmin):
+    list_display = (
+        'user',
+        'category',
+        'created_at',
+    )
+    list_filter = ('category',)
+    search_fields = ('user__username', 'user__email')
+    raw_id_fields = ('user',)
+    list_select_related = ('user', 'category')
@@ -0,0 +1,110 @@
+"""Дайджесты новых публикаций для подписчиков категорий.
+
+Публикации каждой категории за период читаются одним запросом и
+отрисовываются во фрагмент письма один раз за рассылку; дайджест
+подписчика склеивается из готовых фрагментов его категорий. Письма
+передаются почтовому бэкенду пачками через одно соединение.
+"""
+from datetime import timedelta
+from itertools import groupby, islice
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import get_template, render_to_string
+from django.utils import timezone
+
+from .models import CategorySubscription, DigestRun, Post
+from .registry import registry
+
+CHUNK_SIZE = 500
+DEFAULT_PERIOD = timedelta(days=1)
+MAX_POSTS_PER_CATEGORY = 20
+FROM_EMAIL = 'digest@blogicum.not'
+SUBJECT = 'Новые публикации в ваших категориях'
+SECTION_TEMPLATE = 'emails/digest_category.txt'
+DIGEST_TEMPLATE = 'emails/digest.txt'
+
+
+def period(until=None):
+    """Начало и конец периода следующей рассылки."""
+    until = until or timezone.now()
+    last = DigestRun.objects.order_by('-period_end').values_list(
+        'period_end', flat=True,
+    ).first()
+    return last or until - DEFAULT_PERIOD, until
+
+
+def category_sections(since, until):
+    """Фрагменты дайджеста для категорий с новыми публикациями."""
+    sections = {}
+    category_ids = CategorySubscription.objects.order_by().values_list(
+        'category_id', flat=True,
+    ).distinct()
+    for category_id in category_ids:
+        category = registry.category(category_id)
+        if category is None or not category.is_published:
+            continue
+        posts = list(Post.active_objects.filter(
+            category_id=category_id,
+            pub_date__gt=since,
+            pub_date__lte=until,
+        ).order_by('-pub_date')[:MAX_POSTS_PER_CATEGORY])
+        if posts:
+            sections[category_id] = render_to_string(SECTION_TEMPLATE, {
+                'category': category,
+                'posts': posts,
+                'site_url': settings.SITE_URL,
+            })
+    return sections
+
+
+def digests(sections, chunk_size=CHUNK_SIZE):
+    """Пары `(адрес, текст письма)`, по одной на подписчика."""
+    template = get_template(DIGEST_TEMPLATE)
+    rows = CategorySubscription.objects.filter(
+        category_id__in=sections,
+        user__is_active=True,
+    ).exclude(user__email='').order_by('user_id', 'category_id').values_list(
+        'user_id', 'user__username', 'user__email', 'category_id',
+    ).iterator(chunk_size=chunk_size)
+    for (_, username, email), group in groupby(
+        rows, key=lambda row: row[:3],
+    ):
+        yield email, template.render({
+            'username': username,
+            'sections': [sections[row[3]] for row in group],
+        })
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def send_digests(until=None, chunk_size=CHUNK_SIZE, dry_run=False):
+    """Собирает и отправляет дайджесты; возвращает их число.
+
+    С `dry_run=True` письма только собираются: ничего не отправляется
+    и период рассылки не сдвигается.
+    """
+    since, until = period(until)
+    sections = category_sections(since, until)
+    count = 0
+    connection = None if dry_run else get_connection()
+    if connection is not None:
+        connection.open()
+    try:
+        for chunk in _chunks(digests(sections, chunk_size), chunk_size):
+            count += len(chunk)
+            if connection is not None:
+                connection.send_messages([
+                    EmailMessage(SUBJECT, body, FROM_EMAIL, [email])
+                    for email, body in chunk
+                ])
+    finally:
+        if connection is not None:
+            connection.close()
+    if not dry_run:
+        DigestRun.objects.create(period_end=until, digests=count)
+    return count
@@ -0,0 +1,126 @@
+"""Поддержка таблицы ленты `FeedEntry`."""
+from django.conf import settings
+from django.utils import timezone
+from django.utils.text import Truncator
+
+from .models import Category, FeedEntry, Post
+
+EXCERPT_WORDS = 10
+CARD_TEMPLATE = 'includes/feed_card.html'
+CARD_FIELDS = (
+    'pub_date', 'title', 'excerpt', 'image', 'author_username',
+    'category_slug', 'category_title', 'location_name', 'comment_count',
+    'image_variants',
+)
+
+
+def is_enabled():
+    """Отдаются ли ленты из `FeedEntry` (настройка `FEED_READ_MODEL`)."""
+    return getattr(settings, 'FEED_READ_MODEL', False)
+
+
+def visible_entries():
+    return FeedEntry.objects.filter(pub_date__lte=timezone.now())
+
+
+def feed_posts():
+    """Посты, которым положена строка в ленте.
+
+    Совпадает с `Post.active_objects` без условия на дату: отложенные
+    публикации попадают в таблицу сразу и отсекаются при чтении.
+    """
+    return Post.objects.select_related(
+        'author', 'category', 'location',
+    ).filter(is_published=True, category__is_published=True)
+
+
+def build_entry(post):
+    location = post.location
+    return FeedEntry(
+        post=post,
+        category=post.category,
+        pub_date=post.pub_date,
+        title=post.title,
+        excerpt=Truncator(post.text).words(EXCERPT_WORDS),
+        image=post.image.name or '',
+        author_username=post.author.username,
+        category_slug=post.category.slug,
+        category_title=post.category.title,
+        location_name=(
+            location.name if location and location.is_published else ''
+        ),
+        comment_count=post.comment_count,
+        image_variants=post.image_variants,
+    )
+
+
+def _bulk_create(posts, chunk_size):
+    total = 0
+    batch = []
+    for post in posts.iterator(chunk_size=chunk_size):
+        batch.append(build_entry(post))
+        if len(batch) >= chunk_size:
+            total += len(FeedEntry.objects.bulk_create(batch))
+            batch = []
+    return total + len(FeedEntry.objects.bulk_create(batch))
+
+
+def sync_post(post_id):
+    post = feed_posts().filter(pk=post_id).first()
+    if post is None:
+        FeedEntry.objects.filter(post_id=post_id).delete()
+        return
+    build_entry(post).save()
+
+
+def sync_posts(post_ids):
+    """`sync_post()` для нескольких постов с постоянным числом запросов."""
+    posts = list(feed_posts().filter(pk__in=post_ids))
+    FeedEntry.objects.filter(post_id__in=post_ids).delete()
+    FeedEntry.objects.bulk_create(build_entry(post) for post in posts)
+
+
+def category_saving(category):
+    """Запоминает видимость категории в базе до сохранения: строки ленты
+    добавляются или удаляются, только если она изменилась."""
+    category._feed_was_published = None if category._state.adding else (
+        Category.objects.filter(pk=category.pk).values_list(
+            'is_published', flat=True,
+        ).first()
+    )
+
+
+def sync_category(category, chunk_size=1000):
+    was_published = getattr(category, '_feed_was_published', None)
+    entries = FeedEntry.objects.filter(category=category)
+    if was_published is None:
+        # Прежняя видимость неизвестна: строки пересобираются целиком.
+        entries.delete()
+        _bulk_create(feed_posts().filter(category=category), chunk_size)
+    elif not category.is_published:
+        if was_published:
+            entries.delete()
+    elif not was_published:
+        _bulk_create(feed_posts().filter(category=category), chunk_size)
+    else:
+        entries.exclude(
+            category_slug=category.slug, category_title=category.title,
+        ).update(category_slug=category.slug, category_title=category.title)
+
+
+def sync_location(location):
+    FeedEntry.objects.filter(post__location=location).update(
+        location_name=location.name if location.is_published else '',
+    )
+
+
+def sync_author(user):
+    FeedEntry.objects.filter(post__author=user).exclude(
+        author_username=user.username,
+    ).update(author_username=user.username)
+
+
+def rebuild(chunk_size=1000):
+    """Полностью пересобирает таблицу ленты, возвращает число строк."""
+    FeedEntry.objects.all().delete()
+    return _bulk_create(feed_posts(), chunk_size)
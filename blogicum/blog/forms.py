@@ -1,34 +1,105 @@
 from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
-from django.core.mail import send_mail
+from django.core.validators import validate_image_file_extension
+from django.forms.models import ModelChoiceIterator
 
 from .models import Comment, Post
+from .registry import registry
 
 User = get_user_model()
 
 
+class RegistryChoiceIterator(ModelChoiceIterator):
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for obj in self.field.get_objects():
+            yield self.choice(obj)
+
+    def __len__(self):
+        return (len(self.field.get_objects())
+                + (self.field.empty_label is not None))
+
+
+class RegistryChoiceField(forms.ModelChoiceField):
+    """Поле выбора, которое берёт варианты из справочника `registry`.
+
+    `registry_objects` и `registry_object` — имена методов справочника,
+    которые возвращают все записи и запись по pk.
+    """
+
+    iterator = RegistryChoiceIterator
+    registry_objects = None
+    registry_object = None
+
+    def get_objects(self):
+        return getattr(registry, self.registry_objects)()
+
+    def get_object(self, pk):
+        return getattr(registry, self.registry_object)(pk)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        if isinstance(value, self.queryset.model):
+            value = value.pk
+        try:
+            obj = self.get_object(int(value))
+        except (TypeError, ValueError):
+            obj = None
+        if obj is None:
+            raise forms.ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+        return obj
+
+
+class CategoryChoiceField(RegistryChoiceField):
+    registry_objects = 'categories'
+    registry_object = 'category'
+
+
+class LocationChoiceField(RegistryChoiceField):
+    registry_objects = 'locations'
+    registry_object = 'location'
+
+
+class UploadedImageField(forms.FileField):
+    """Поле картинки, которое не открывает файл через Pillow.
+
+    Форма проверяет только расширение; содержимое проверяет и
+    обрабатывает `manage.py process_images` уже после сохранения поста.
+    """
+
+    default_validators = [validate_image_file_extension]
+
+    def widget_attrs(self, widget):
+        attrs = super().widget_attrs(widget)
+        if isinstance(widget, forms.FileInput):
+            attrs.setdefault('accept', 'image/*')
+        return attrs
+
+
 class PostForm(forms.ModelForm):
     """Форма публикации"""
 
     class Meta:
         model = Post
         fields = ('title', 'text', 'image', 'location', 'category', 'pub_date')
+        field_classes = {
+            'category': CategoryChoiceField,
+            'location': LocationChoiceField,
+            'image': UploadedImageField,
+        }
         widgets = {'pub_date': forms.DateInput(
             format='%%d-%m-%Y %H:%M',
             attrs={'type': 'datetime-local'},
         ),
         }
 
-    def clean(self):
-        send_mail(
-            subject='Тема',
-            message='Текст',
-            from_email='post_form@blogicum.not',
-            recipient_list=['admin@blogicum.not'],
-            fail_silently=True,
-        )
-
 
 class CustomUserCreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
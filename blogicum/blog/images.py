@@ -0,0 +1,228 @@
+"""Обработка картинок публикаций.
+
+Загруженный файл обрабатывает фоновый обработчик
+(`manage.py process_images`): `process_upload()` проверяет, что файл
+читается как картинка, поворачивает её по EXIF и пересохраняет без
+метаданных в новый файл, затем создаёт уменьшенные копии. Исходный
+файл и копии прежней картинки обработчик удаляет только после того,
+как новые пути записаны в базу.
+
+Для каждой ширины из `VARIANT_WIDTHS`, меньшей ширины оригинала,
+сохраняются копия в формате оригинала (JPEG или PNG для картинок с
+прозрачностью) и копия в WebP; WebP сохраняется и для полного размера.
+Пути к копиям и их размеры хранятся в `Post.image_variants`.
+
+Картинки в других форматах (GIF, BMP и т. п.) пересохраняются в JPEG
+или PNG под именем с новым расширением. Анимированные картинки не
+пересохраняются и копий не получают: остался бы только первый кадр.
+"""
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+VARIANT_WIDTHS = {'card': 640, 'detail': 1280}
+VARIANTS_DIR = 'variants'
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+SOURCE_FORMATS = {
+    '.jpg': 'JPEG', '.jpeg': 'JPEG', '.png': 'PNG', '.webp': 'WEBP',
+}
+EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp'}
+
+
+def _encode(image, image_format):
+    buffer = BytesIO()
+    if image_format == 'WEBP':
+        image.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=4)
+    elif image_format == 'JPEG':
+        image.convert('RGB').save(
+            buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True,
+            progressive=True,
+        )
+    else:
+        image.save(buffer, 'PNG', optimize=True)
+    return ContentFile(buffer.getvalue())
+
+
+def _save(image, name, image_format):
+    return default_storage.save(
+        f'{VARIANTS_DIR}/{name}.{EXTENSIONS[image_format]}',
+        _encode(image, image_format),
+    )
+
+
+def _open(name):
+    """Читает картинку из хранилища; None, если это не картинка."""
+    try:
+        with default_storage.open(name) as file:
+            image = Image.open(file)
+            if not getattr(image, 'is_animated', False):
+                image = ImageOps.exif_transpose(image)
+            image.load()
+    except (
+        OSError, UnidentifiedImageError, ValueError,
+        Image.DecompressionBombError,
+    ):
+        return None
+    return image
+
+
+def _has_alpha(image):
+    return image.mode in ('RGBA', 'LA') or (
+        image.mode == 'P' and 'transparency' in image.info
+    )
+
+
+def _normalize(image):
+    has_alpha = _has_alpha(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+    return image, 'PNG' if has_alpha else 'JPEG'
+
+
+def _build_variants(original, fallback_format, name):
+    stem = os.path.splitext(os.path.basename(name))[0]
+    width, height = original.size
+
+    sizes = []
+    for label, target in sorted(
+        VARIANT_WIDTHS.items(), key=lambda item: item[1],
+    ):
+        if target >= width:
+            continue
+        resized = original.resize(
+            (target, round(height * target / width)),
+            Image.Resampling.LANCZOS,
+        )
+        sizes.append({
+            'name': label,
+            'width': resized.width,
+            'height': resized.height,
+            'src': _save(resized, f'{stem}_{label}', fallback_format),
+            'webp': _save(resized, f'{stem}_{label}', 'WEBP'),
+        })
+    return {
+        'source': name,
+        'width': width,
+        'height': height,
+        'webp': _save(original, stem, 'WEBP'),
+        'sizes': sizes,
+    }
+
+
+def process_upload(name):
+    """Готовит загруженную картинку `name` к показу.
+
+    Картинка сохраняется уже повёрнутой и без EXIF в новый файл, а
+    `name` не удаляется: пока результат не записан в базу, пост
+    ссылается на него. Возвращает словарь для `Post.image_variants`
+    (имя нового файла в нём под ключом `source`) или пустой словарь,
+    если файл не картинка.
+    """
+    original = _open(name)
+    if original is None:
+        return {}
+    if getattr(original, 'is_animated', False):
+        return {
+            'source': name,
+            'width': original.width,
+            'height': original.height,
+            'sizes': [],
+        }
+    original, fallback_format = _normalize(original)
+    root, extension = os.path.splitext(name)
+    # Формат оригинала сохраняется, если браузеры его показывают.
+    source_format = SOURCE_FORMATS.get(extension.lower())
+    image_format = source_format or fallback_format
+    if image_format == 'JPEG' and fallback_format == 'PNG':
+        image_format = 'PNG'
+    # Имя занято исходным файлом, поэтому хранилище выдаст новое.
+    saved = default_storage.save(
+        f'{root}.{EXTENSIONS[image_format]}',
+        _encode(original, image_format),
+    )
+    return _build_variants(original, fallback_format, saved)
+
+
+def variant_files(variants):
+    """Пути копий из `Post.image_variants`, без самой картинки."""
+    names = {variants['webp']} if variants.get('webp') else set()
+    for size in variants.get('sizes', ()):
+        names.update((size['src'], size['webp']))
+    return names
+
+
+def delete_files(names):
+    for name in names:
+        default_storage.delete(name)
+
+
+class PictureSource:
+    """Размеры и адрес картинки для атрибутов `<img>`."""
+
+    def __init__(self, url, width=None, height=None):
+        self.url = url
+        self.width = width
+        self.height = height
+
+
+class Picture:
+    """Данные для тега `<picture>` по картинке и её копиям."""
+
+    def __init__(self, name, variants):
+        self.name = name
+        # Копии другой картинки (например, до замены файла) не подходят:
+        # новая картинка ещё ждёт обработчика.
+        self.pending = bool(name) and variants.get('source') != name
+        # Обработчик не смог прочитать файл и сохранил только его имя.
+        self.failed = not self.pending and 'width' not in variants
+        if self.pending or self.failed:
+            variants = {}
+        self.variants = variants
+
+    def _url(self, name):
+        return default_storage.url(name)
+
+    def _source(self, label):
+        for size in self.variants.get('sizes', ()):
+            if size['name'] == label:
+                return PictureSource(
+                    self._url(size['src']), size['width'], size['height'],
+                )
+        return PictureSource(
+            self._url(self.name),
+            self.variants.get('width'),
+            self.variants.get('height'),
+        )
+
+    @property
+    def card(self):
+        return self._source('card')
+
+    @property
+    def detail(self):
+        return self._source('detail')
+
+    @property
+    def srcset(self):
+        if not self.variants:
+            return ''
+        return ', '.join([
+            *(f'{self._url(size["src"])} {size["width"]}w'
+              for size in self.variants['sizes']),
+            f'{self._url(self.name)} {self.variants["width"]}w',
+        ])
+
+    @property
+    def webp_srcset(self):
+        # У анимированной картинки копии в WebP нет.
+        if not self.variants.get('webp'):
+            return ''
+        return ', '.join([
+            *(f'{self._url(size["webp"])} {size["width"]}w'
+              for size in self.variants['sizes']),
+            f'{self._url(self.variants["webp"])} {self.variants["width"]}w',
+        ])
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import IMAGE_PENDING, IMAGE_PROCESSING, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Ставит картинки существующих постов в очередь '
+        '`manage.py process_images`.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Обработать заново и картинки, у которых уже есть копии.',
+        )
+
+    def handle(self, *args, **options):
+        # Картинки в очереди и в обработке уже получат копии.
+        posts = Post.objects.exclude(image='').exclude(
+            image_status__in=(IMAGE_PENDING, IMAGE_PROCESSING),
+        )
+        pks = [
+            pk
+            for pk, name, variants in posts.values_list(
+                'pk', 'image', 'image_variants',
+            ).iterator()
+            if options['force'] or variants.get('source') != name
+        ]
+        queued = Post.objects.filter(pk__in=pks).update(
+            image_status=IMAGE_PENDING,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'В очередь поставлено картинок: {queued}. Обработайте их '
+            'командой `manage.py process_images`.'
+        ))
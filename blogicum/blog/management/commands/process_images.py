@@ -0,0 +1,161 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from blog import images
+from blog.models import (IMAGE_FAILED, IMAGE_PENDING, IMAGE_PROCESSING,
+                         IMAGE_READY, FeedEntry, ImageClaim, Post)
+from core.cache import invalidate_tags
+
+BATCH_SIZE = 16
+POLL_INTERVAL = 2.0
+STALE_AFTER = 600
+
+
+class Command(BaseCommand):
+    help = (
+        'Обрабатывает картинки постов из очереди: проверяет файл, '
+        'поворачивает по EXIF, удаляет метаданные и создаёт копии.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Число процессов; по умолчанию — число ядер.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько картинок забирать из очереди за раз.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Обработать очередь и завершиться, не дожидаясь новых '
+                 'картинок.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=POLL_INTERVAL,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=STALE_AFTER,
+            help='Через сколько секунд вернуть в очередь картинку, '
+                 'обработчик которой завершился аварийно.',
+        )
+
+    def handle(self, *args, **options):
+        done = failed = 0
+        # Процессы пула только читают и пишут файлы, с базой работает
+        # основной процесс.
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            while True:
+                self.requeue_stale(options['stale_after'])
+                jobs = self.claim(options['batch_size'])
+                if not jobs:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                futures = {
+                    pk: pool.submit(images.process_upload, name)
+                    for pk, name in jobs.items()
+                }
+                for pk, future in futures.items():
+                    try:
+                        variants = future.result()
+                    except Exception as error:
+                        self.stderr.write(f'Пост {pk}: {error!r}')
+                        variants = {}
+                    if self.finish(pk, jobs[pk], variants):
+                        done += 1
+                    else:
+                        failed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано картинок: {done}, не удалось прочитать: {failed}.'
+        ))
+
+    def requeue_stale(self, stale_after):
+        stale = ImageClaim.objects.filter(
+            claimed_at__lt=timezone.now() - timedelta(seconds=stale_after),
+        )
+        with transaction.atomic():
+            Post.objects.filter(
+                image_status=IMAGE_PROCESSING, image_claim__in=stale,
+            ).update(image_status=IMAGE_PENDING)
+            stale.delete()
+
+    def claim(self, batch_size):
+        """Забирает картинки из очереди; возвращает {pk: имя файла}.
+
+        Строка достаётся тому обработчику, чей UPDATE её изменил, поэтому
+        несколько обработчиков могут работать одновременно. Время взятия
+        пишется в `ImageClaim` в той же транзакции, что и статус.
+        """
+        candidates = Post.objects.filter(
+            image_status=IMAGE_PENDING,
+        ).order_by('pk').values_list('pk', 'image')[:batch_size]
+        jobs = {}
+        with transaction.atomic():
+            for pk, name in candidates:
+                if Post.objects.filter(
+                    pk=pk, image_status=IMAGE_PENDING,
+                ).update(image_status=IMAGE_PROCESSING):
+                    jobs[pk] = name
+            if jobs:
+                ImageClaim.objects.filter(pk__in=jobs).delete()
+                now = timezone.now()
+                ImageClaim.objects.bulk_create(
+                    ImageClaim(post_id=pk, claimed_at=now) for pk in jobs
+                )
+        return jobs
+
+    def finish(self, pk, name, variants):
+        """Сохраняет результат; возвращает, удалось ли прочитать файл.
+
+        Исходный файл и прежние копии удаляются после фиксации, когда
+        пост уже ссылается на новые файлы, а ненужный результат — сразу.
+        """
+        if variants:
+            status, saved = IMAGE_READY, variants['source']
+        else:
+            # Имя сохраняется, чтобы сигнал не вернул файл в очередь.
+            status, saved, variants = IMAGE_FAILED, name, {'source': name}
+        new_files = images.variant_files(variants) | {saved}
+        with transaction.atomic():
+            # Если за время обработки картинку заменили, результат не
+            # нужен: новая картинка уже стоит в очереди.
+            previous = Post.objects.select_for_update().filter(
+                pk=pk, image=name, image_status=IMAGE_PROCESSING,
+            ).values_list('image_variants', flat=True).first()
+            ImageClaim.objects.filter(pk=pk).delete()
+            if previous is None:
+                unused = new_files - {name}
+            else:
+                Post.objects.filter(pk=pk).update(
+                    image=saved,
+                    image_status=status,
+                    image_variants=variants,
+                    updated_at=timezone.now(),
+                )
+                FeedEntry.objects.filter(pk=pk, image=name).update(
+                    image=saved, image_variants=variants,
+                )
+                unused = (
+                    images.variant_files(previous) | {name}
+                ) - new_files
+        if previous is not None:
+            invalidate_tags(f'post:{pk}')
+        images.delete_files(unused)
+        return status == IMAGE_READY
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog import feed
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает таблицу ленты опубликованных постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Сколько записей ленты вставлять за один запрос.',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            total = feed.rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Записей в ленте: {total}.'
+        ))
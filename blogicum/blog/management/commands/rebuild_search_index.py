@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from blog import search
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Заново строит полнотекстовый индекс публикаций.'
+
+    def handle(self, *args, **options):
+        search.ensure_index()
+        search.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано публикаций: {Post.objects.count()}.'
+        ))
@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import (Count, F, OuterRef, PositiveIntegerField,
+                              Subquery)
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, FeedEntry, Post
+
+CHUNK_SIZE = 1000
+
+
+def actual_comment_count():
+    """Выражение с фактическим числом комментариев поста; подходит и для
+    `FeedEntry`, первичный ключ которой — pk поста."""
+    comments = Comment.objects.filter(
+        post=OuterRef('pk'),
+    ).order_by().values('post').annotate(total=Count('pk')).values('total')
+    return Coalesce(
+        Subquery(comments), 0, output_field=PositiveIntegerField(),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет и исправляет счётчики комментариев у публикаций и в '
+        'таблице ленты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Сколько публикаций проверять за одну транзакцию.',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        last_pk = 0
+        checked = fixed = 0
+        while True:
+            pks = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:chunk_size]
+            )
+            if not pks:
+                break
+            with transaction.atomic():
+                drifted = set()
+                for model in (Post, FeedEntry):
+                    model_drifted = list(model.objects.filter(
+                        pk__in=pks,
+                    ).annotate(
+                        actual=actual_comment_count(),
+                    ).exclude(
+                        comment_count=F('actual'),
+                    ).values_list('pk', flat=True))
+                    model.objects.filter(pk__in=model_drifted).update(
+                        comment_count=actual_comment_count(),
+                    )
+                    drifted.update(model_drifted)
+                fixed += len(drifted)
+            checked += len(pks)
+            last_pk = pks[-1]
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено публикаций: {checked}, исправлено: {fixed}.'
+        ))
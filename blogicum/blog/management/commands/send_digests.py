@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog import digests
+
+
+class Command(BaseCommand):
+    help = (
+        'Рассылает подписчикам категорий дайджест публикаций, вышедших '
+        'после прошлой рассылки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=digests.CHUNK_SIZE,
+            help='Сколько писем передавать почтовому бэкенду за раз.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только собрать дайджесты и показать скорость сборки.',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = digests.send_digests(
+            chunk_size=options['chunk_size'],
+            dry_run=options['dry_run'],
+        )
+        elapsed = time.perf_counter() - started
+        verb = 'Собрано' if options['dry_run'] else 'Отправлено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} дайджестов: {count} за {elapsed:.2f} с '
+            f'({count / elapsed if elapsed else 0:.0f} в секунду).'
+        ))
@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog import outbox
+
+POLL_INTERVAL = 5.0
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди `EmailOutbox`.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=outbox.BATCH_SIZE,
+            help='Сколько писем отправлять через одно соединение.',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=outbox.MAX_ATTEMPTS,
+            help='После скольких неудачных попыток больше не отправлять.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Отправить письма, которым пора уходить, и завершиться.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=POLL_INTERVAL,
+            help='Пауза в секундах, когда отправлять нечего.',
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Только показать глубину очереди и задержку доставки.',
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.write_metrics()
+            return
+        total_sent = total_failed = 0
+        while True:
+            sent, failed, duration = outbox.dispatch(
+                options['batch_size'], options['max_attempts'],
+            )
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                if options['verbosity'] > 1:
+                    self.stdout.write(
+                        f'Пачка: отправлено {sent}, ошибок {failed}, '
+                        f'{duration:.3f} с.'
+                    )
+                continue
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Отправлено писем: {total_sent}, ошибок: {total_failed}.'
+        ))
+        if options['verbosity'] > 1:
+            self.write_metrics()
+
+    def write_metrics(self):
+        for name, value in outbox.metrics().items():
+            self.stdout.write(f'{name}: {value}')
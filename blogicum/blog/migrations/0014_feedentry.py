@@ -0,0 +1,71 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils.text import Truncator
+
+
+def fill_feed(apps, schema_editor):
+    FeedEntry = apps.get_model('blog', 'FeedEntry')
+    Post = apps.get_model('blog', 'Post')
+    posts = Post.objects.select_related(
+        'author', 'category', 'location',
+    ).filter(is_published=True, category__is_published=True)
+    FeedEntry.objects.bulk_create((
+        FeedEntry(
+            post=post,
+            category=post.category,
+            pub_date=post.pub_date,
+            title=post.title,
+            excerpt=Truncator(post.text).words(10),
+            image=post.image.name or '',
+            author_username=post.author.username,
+            category_slug=post.category.slug,
+            category_title=post.category.title,
+            location_name=(
+                post.location.name
+                if post.location and post.location.is_published else ''
+            ),
+            comment_count=post.comment_count,
+        )
+        for post in posts.iterator()
+    ), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feed_entry', serialize=False, to='blog.post')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата и время публикации')),
+                ('title', models.CharField(max_length=256, verbose_name='Заголовок')),
+                ('excerpt', models.TextField(verbose_name='Начало текста')),
+                ('image', models.CharField(blank=True, max_length=100, verbose_name='Картинка публикации')),
+                ('author_username', models.CharField(max_length=150, verbose_name='Автор публикации')),
+                ('category_slug', models.SlugField(verbose_name='Идентификатор категории')),
+                ('category_title', models.CharField(max_length=256, verbose_name='Категория')),
+                ('location_name', models.CharField(blank=True, max_length=256, verbose_name='Местоположение')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Количество комментариев')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog.category')),
+            ],
+            options={
+                'verbose_name': 'запись ленты',
+                'verbose_name_plural': 'Записи ленты',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['-pub_date', '-post'], name='feedentry_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['category', '-pub_date', '-post'], name='feedentry_category_feed_idx'),
+        ),
+        migrations.RunPython(fill_feed, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_feedentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='Меняется и при изменении категории, места или автора.', verbose_name='Изменено'),
+        ),
+    ]
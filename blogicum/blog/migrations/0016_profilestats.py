@@ -0,0 +1,64 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_stats(apps, schema_editor):
+    ProfileStats = apps.get_model('blog', 'ProfileStats')
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    User = apps.get_model('auth', 'User')
+
+    def count(model):
+        return Coalesce(Subquery(
+            model.objects.filter(author=OuterRef('pk')).values(
+                'author',
+            ).annotate(total=Count('pk')).values('total')
+        ), Value(0))
+
+    users = User.objects.annotate(
+        stats_post_count=count(Post),
+        stats_comment_count=count(Comment),
+        stats_last_post_date=Subquery(
+            Post.objects.filter(author=OuterRef('pk')).order_by(
+                '-pub_date',
+            ).values('pub_date')[:1]
+        ),
+    )
+    ProfileStats.objects.bulk_create((
+        ProfileStats(
+            user_id=user.pk,
+            post_count=user.stats_post_count,
+            comment_count=user.stats_comment_count,
+            last_post_date=user.stats_last_post_date,
+        )
+        for user in users.iterator()
+    ), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('blog', '0015_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='profile_stats', serialize=False, to='auth.user')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Публикаций')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Комментариев')),
+                ('last_post_date', models.DateTimeField(blank=True, null=True, verbose_name='Дата последней публикации')),
+            ],
+            options={
+                'verbose_name': 'статистика пользователя',
+                'verbose_name_plural': 'Статистика пользователей',
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
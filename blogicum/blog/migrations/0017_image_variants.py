@@ -0,0 +1,23 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_profilestats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedentry',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Копии картинки'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Копии картинки'),
+        ),
+    ]
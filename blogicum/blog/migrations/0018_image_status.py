@@ -0,0 +1,34 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:47
+
+from django.db import migrations, models
+
+
+def fill_image_status(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    for post in Post.objects.exclude(image='').only(
+        'image', 'image_variants',
+    ).iterator():
+        processed = post.image_variants.get('source') == post.image.name
+        Post.objects.filter(pk=post.pk).update(
+            image_status='ready' if processed else 'pending',
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Ждёт обработки'), ('processing', 'Обрабатывается'), ('ready', 'Готова'), ('failed', 'Не удалось прочитать')], editable=False, help_text='Новую картинку обрабатывает `manage.py process_images`.', max_length=16, verbose_name='Обработка картинки'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('image_status__in', ('pending', 'processing'))), fields=['image_status', 'id'], name='post_image_queue_idx'),
+        ),
+        migrations.RunPython(fill_image_status, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:54
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0019_email_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DigestRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_end', models.DateTimeField(db_index=True, verbose_name='Публикации до')),
+                ('digests', models.PositiveIntegerField(default=0, verbose_name='Дайджестов')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Отправлена')),
+            ],
+            options={
+                'verbose_name': 'рассылка дайджестов',
+                'verbose_name_plural': 'Рассылки дайджестов',
+            },
+        ),
+        migrations.CreateModel(
+            name='CategorySubscription',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Оформлена')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subscriptions', to='blog.category', verbose_name='Категория')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_subscriptions', to=settings.AUTH_USER_MODEL, verbose_name='Подписчик')),
+            ],
+            options={
+                'verbose_name': 'подписка на категорию',
+                'verbose_name_plural': 'Подписки на категории',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='categorysubscription',
+            constraint=models.UniqueConstraint(fields=('user', 'category'), name='unique_category_subscription'),
+        ),
+    ]
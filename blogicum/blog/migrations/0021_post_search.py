@@ -0,0 +1,75 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+CREATE_TABLE = """
+CREATE VIRTUAL TABLE blog_post_search USING fts5(
+    title, text,
+    content='blog_post', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+)
+"""
+TRIGGERS = (
+    """CREATE TRIGGER blog_post_search_insert AFTER INSERT ON blog_post BEGIN
+        INSERT INTO blog_post_search(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END""",
+    """CREATE TRIGGER blog_post_search_delete AFTER DELETE ON blog_post BEGIN
+        INSERT INTO blog_post_search(blog_post_search, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END""",
+    """CREATE TRIGGER blog_post_search_update
+    AFTER UPDATE OF title, text ON blog_post BEGIN
+        INSERT INTO blog_post_search(blog_post_search, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO blog_post_search(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END""",
+)
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_TABLE)
+    for sql in TRIGGERS:
+        schema_editor.execute(sql)
+    schema_editor.execute(
+        "INSERT INTO blog_post_search(blog_post_search) VALUES ('rebuild')"
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name in ('insert', 'delete', 'update'):
+        schema_editor.execute(
+            f'DROP TRIGGER IF EXISTS blog_post_search_{name}'
+        )
+    schema_editor.execute('DROP TABLE IF EXISTS blog_post_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0020_category_subscriptions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearch',
+            fields=[
+                ('post', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search', serialize=False, to='blog.post')),
+                ('title', models.TextField(verbose_name='Заголовок')),
+                ('text', models.TextField(verbose_name='Текст')),
+            ],
+            options={
+                'verbose_name': 'поисковый индекс публикации',
+                'verbose_name_plural': 'Поисковый индекс публикаций',
+                'db_table': 'blog_post_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.16 on 2026-10-18 21:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0021_post_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TypeaheadEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=1, verbose_name='Вид')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Объект')),
+                ('data', models.JSONField(null=True, verbose_name='Данные')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+            ],
+            options={
+                'verbose_name': 'событие подсказок',
+                'verbose_name_plural': 'События подсказок',
+            },
+        ),
+    ]
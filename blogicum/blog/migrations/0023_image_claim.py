@@ -0,0 +1,40 @@
+# Generated by Django 3.2.16 on 2026-10-18 22:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def claim_processing_images(apps, schema_editor):
+    # До этой миграции срок обработки отсчитывался от `updated_at`.
+    Post = apps.get_model('blog', 'Post')
+    ImageClaim = apps.get_model('blog', 'ImageClaim')
+    ImageClaim.objects.bulk_create(
+        ImageClaim(post_id=pk, claimed_at=updated_at)
+        for pk, updated_at in Post.objects.filter(
+            image_status='processing',
+        ).values_list('pk', 'updated_at')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0022_typeahead_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageClaim',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='image_claim', serialize=False, to='blog.post')),
+                ('claimed_at', models.DateTimeField(db_index=True, verbose_name='Взята в обработку')),
+            ],
+            options={
+                'verbose_name': 'обработка картинки',
+                'verbose_name_plural': 'Обработка картинок',
+            },
+        ),
+        migrations.RunPython(
+            claim_processing_images, migrations.RunPython.noop,
+        ),
+    ]
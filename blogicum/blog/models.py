@@ -1,26 +1,61 @@
-import datetime
-
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
 from django.db import models
 from django.db.models.query import QuerySet
 from django.urls import reverse
+from django.utils import timezone
 
+from .images import Picture
 from core.models import PublishedModel
 
 User = get_user_model()
 
+# Поля пользователя, которые можно класть в общий кэш.
+PUBLIC_USER_FIELDS = (
+    'username', 'first_name', 'last_name', 'date_joined', 'is_staff',
+)
+
+
+def private_user_fields(prefix=''):
+    """Остальные поля пользователя (пароль, почта и т. п.) с префиксом
+    `prefix` для `defer()` через связь."""
+    return [
+        prefix + field.name for field in User._meta.concrete_fields
+        if not field.primary_key and field.name not in PUBLIC_USER_FIELDS
+    ]
+
+
+class PostQuerySet(models.QuerySet):
+    def with_related(self):
+        return self.select_related('author', 'location', 'category')
+
+    def visible_to(self, user):
+        """Публикации, которые пользователь `user` может открыть.
+
+        Снятые с публикации, отложенные и посты из скрытых категорий
+        видны только их автору.
+        """
+        visible = models.Q(
+            is_published=True,
+            pub_date__lte=timezone.now(),
+        ) & (
+            models.Q(category__isnull=True)
+            | models.Q(category__is_published=True)
+        )
+        if user.is_authenticated:
+            visible |= models.Q(author_id=user.pk)
+        return self.filter(visible)
+
 
 class PostManager(models.Manager):
     def get_queryset(self) -> QuerySet:
         return Post.objects.select_related(
             'author',
-            'location',
-            'category',
         ).filter(
             is_published=True,
             category__is_published=True,
-            pub_date__lte=datetime.datetime.now(),
-        ).annotate(comment_count=models.Count('comments'))
+            pub_date__lte=timezone.now(),
+        )
 
 
 class Category(PublishedModel):
@@ -52,6 +87,18 @@ class Location(PublishedModel):
         return self.name
 
 
+IMAGE_PENDING = 'pending'
+IMAGE_PROCESSING = 'processing'
+IMAGE_READY = 'ready'
+IMAGE_FAILED = 'failed'
+IMAGE_STATUS_CHOICES = (
+    (IMAGE_PENDING, 'Ждёт обработки'),
+    (IMAGE_PROCESSING, 'Обрабатывается'),
+    (IMAGE_READY, 'Готова'),
+    (IMAGE_FAILED, 'Не удалось прочитать'),
+)
+
+
 class Post(PublishedModel):
     title = models.CharField('Заголовок', max_length=256)
     text = models.TextField('Текст')
@@ -84,13 +131,60 @@ class Post(PublishedModel):
         null=True,
         related_name='posts',
     )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    image_variants = models.JSONField(
+        'Копии картинки',
+        default=dict,
+        blank=True,
+        editable=False,
+    )
+    image_status = models.CharField(
+        'Обработка картинки',
+        max_length=16,
+        choices=IMAGE_STATUS_CHOICES,
+        blank=True,
+        editable=False,
+        help_text='Новую картинку обрабатывает `manage.py process_images`.',
+    )
+    updated_at = models.DateTimeField(
+        'Изменено',
+        auto_now=True,
+        help_text='Меняется и при изменении категории, места или автора.',
+    )
 
-    objects = models.Manager()
+    objects = PostQuerySet.as_manager()
     active_objects = PostManager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_feed_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx',
+            ),
+            models.Index(
+                fields=('image_status', 'id'),
+                condition=models.Q(image_status__in=(
+                    IMAGE_PENDING, IMAGE_PROCESSING,
+                )),
+                name='post_image_queue_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title
@@ -98,6 +192,10 @@ class Post(PublishedModel):
     def get_absolute_url(self):
         return reverse("blog:post_detail", args=(self.pk,))
 
+    @property
+    def picture(self):
+        return Picture(self.image.name, self.image_variants)
+
 
 class Comment(models.Model):
     text = models.TextField('Текст комментария')
@@ -119,3 +217,266 @@ class Comment(models.Model):
         ordering = ('created_at',)
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_idx',
+            ),
+        )
+
+
+class FeedEntry(models.Model):
+    """Готовая к показу карточка опубликованного поста.
+
+    Строки поддерживаются сигналами из `blog.signals`, а при
+    расхождении пересобираются командой `rebuild_feed`.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='feed_entry',
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    pub_date = models.DateTimeField('Дата и время публикации')
+    title = models.CharField('Заголовок', max_length=256)
+    excerpt = models.TextField('Начало текста')
+    image = models.CharField('Картинка публикации', max_length=100,
+                             blank=True)
+    author_username = models.CharField('Автор публикации', max_length=150)
+    category_slug = models.SlugField('Идентификатор категории')
+    category_title = models.CharField('Категория', max_length=256)
+    location_name = models.CharField('Местоположение', max_length=256,
+                                     blank=True)
+    image_variants = models.JSONField('Копии картинки', default=dict,
+                                      blank=True)
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-post'),
+                name='feedentry_feed_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-post'),
+                name='feedentry_category_feed_idx',
+            ),
+        )
+
+    def __str__(self):
+        return self.title
+
+    @property
+    def image_url(self):
+        return default_storage.url(self.image)
+
+    @property
+    def picture(self):
+        return Picture(self.image, self.image_variants)
+
+
+class ProfileStats(models.Model):
+    """Счётчики для страницы пользователя.
+
+    Строки поддерживаются сигналами из `blog.signals`, а при
+    расхождении пересобираются командой `rebuild_profile_stats`.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='profile_stats',
+    )
+    post_count = models.PositiveIntegerField('Публикаций', default=0)
+    comment_count = models.PositiveIntegerField('Комментариев', default=0)
+    last_post_date = models.DateTimeField(
+        'Дата последней публикации',
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        verbose_name = 'статистика пользователя'
+        verbose_name_plural = 'Статистика пользователей'
+
+    def __str__(self):
+        return str(self.user_id)
+
+
+OUTBOX_PENDING = 'pending'
+OUTBOX_SENT = 'sent'
+OUTBOX_FAILED = 'failed'
+OUTBOX_STATUS_CHOICES = (
+    (OUTBOX_PENDING, 'Ждёт отправки'),
+    (OUTBOX_SENT, 'Отправлено'),
+    (OUTBOX_FAILED, 'Не удалось отправить'),
+)
+
+
+class EmailOutbox(models.Model):
+    """Письмо, которое отправит команда `send_outbox`.
+
+    Запись создаётся в той же транзакции, что и изменение, о котором
+    сообщает письмо, поэтому письмо не теряется и не уходит при откате.
+    """
+
+    subject = models.CharField('Тема', max_length=256)
+    body = models.TextField('Текст')
+    from_email = models.CharField('Отправитель', max_length=254)
+    recipients = models.JSONField('Получатели', default=list)
+    status = models.CharField(
+        'Состояние',
+        max_length=16,
+        choices=OUTBOX_STATUS_CHOICES,
+        default=OUTBOX_PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка',
+        default=timezone.now,
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = (
+            models.Index(
+                fields=('next_attempt_at', 'id'),
+                condition=models.Q(status=OUTBOX_PENDING),
+                name='outbox_queue_idx',
+            ),
+            models.Index(
+                fields=('sent_at',),
+                condition=models.Q(status=OUTBOX_SENT),
+                name='outbox_sent_idx',
+            ),
+        )
+
+    def __str__(self):
+        return self.subject
+
+
+class CategorySubscription(models.Model):
+    """Подписка читателя на дайджест новых публикаций категории."""
+
+    user = models.ForeignKey(
+        User,
+        verbose_name='Подписчик',
+        on_delete=models.CASCADE,
+        related_name='category_subscriptions',
+    )
+    category = models.ForeignKey(
+        Category,
+        verbose_name='Категория',
+        on_delete=models.CASCADE,
+        related_name='subscriptions',
+    )
+    created_at = models.DateTimeField('Оформлена', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'подписка на категорию'
+        verbose_name_plural = 'Подписки на категории'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'category'),
+                name='unique_category_subscription',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.user_id} → {self.category_id}'
+
+
+class DigestRun(models.Model):
+    """Отправленная рассылка дайджестов.
+
+    Следующая рассылка берёт публикации, вышедшие после `period_end`
+    последней записи.
+    """
+
+    period_end = models.DateTimeField('Публикации до', db_index=True)
+    digests = models.PositiveIntegerField('Дайджестов', default=0)
+    created_at = models.DateTimeField('Отправлена', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'рассылка дайджестов'
+        verbose_name_plural = 'Рассылки дайджестов'
+
+    def __str__(self):
+        return f'{self.period_end:%Y-%m-%d %H:%M}'
+
+
+class PostSearch(models.Model):
+    """Строка полнотекстового индекса публикаций.
+
+    Таблица — виртуальная таблица SQLite FTS5, её создаёт миграция, а
+    заполняют триггеры на `blog_post` (см. `blog.search`).
+    """
+
+    post = models.OneToOneField(
+        Post,
+        primary_key=True,
+        db_column='rowid',
+        on_delete=models.DO_NOTHING,
+        related_name='search',
+    )
+    title = models.TextField('Заголовок')
+    text = models.TextField('Текст')
+
+    class Meta:
+        managed = False
+        db_table = 'blog_post_search'
+        verbose_name = 'поисковый индекс публикации'
+        verbose_name_plural = 'Поисковый индекс публикаций'
+
+
+class TypeaheadEvent(models.Model):
+    """Событие журнала индекса подсказок (см. `blog.typeahead`).
+
+    Номер события — первичный ключ: его выдаёт база, поэтому два
+    процесса не получат один номер.
+    """
+
+    kind = models.CharField('Вид', max_length=1)
+    object_id = models.PositiveIntegerField('Объект')
+    data = models.JSONField('Данные', null=True)
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'событие подсказок'
+        verbose_name_plural = 'События подсказок'
+
+
+class ImageClaim(models.Model):
+    """Картинка поста, взятая в обработку `manage.py process_images`.
+
+    Время взятия хранится отдельно от `Post.updated_at`: взятие не меняет
+    версию страницы поста, а правка поста не продлевает срок обработки.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='image_claim',
+    )
+    claimed_at = models.DateTimeField('Взята в обработку', db_index=True)
+
+    class Meta:
+        verbose_name = 'обработка картинки'
+        verbose_name_plural = 'Обработка картинок'
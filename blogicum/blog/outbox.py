@@ -0,0 +1,164 @@
+"""Очередь исходящих писем.
+
+Запрос только добавляет строку в `EmailOutbox` (`enqueue()`) в своей
+транзакции. Команда `send_outbox` забирает письма пачками и отправляет
+их через одно соединение почтового бэкенда (`dispatch()`). Неудачная
+отправка повторяется с растущей паузой, после `MAX_ATTEMPTS` попыток
+письмо помечается неотправленным.
+"""
+import time
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import (OUTBOX_FAILED, OUTBOX_PENDING, OUTBOX_SENT,
+                     EmailOutbox)
+
+BATCH_SIZE = 50
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 60
+BACKOFF_MAX = 3600
+# Забранные письма откладываются на это время: если отправитель упадёт,
+# другой повторит их позже.
+LEASE = 300
+METRICS_WINDOW = timedelta(hours=1)
+
+POST_NOTIFICATION_FROM = 'post_form@blogicum.not'
+POST_NOTIFICATION_TO = ['admin@blogicum.not']
+
+
+def enqueue(subject, body, from_email, recipients):
+    return EmailOutbox.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email,
+        recipients=list(recipients),
+    )
+
+
+def enqueue_post_notification(post):
+    """Письмо администратору о новой публикации."""
+    return enqueue(
+        subject=f'Новая публикация: {post.title}'[:256],
+        body=(
+            f'Публикация «{post.title}» от @{post.author.username}: '
+            f'{post.get_absolute_url()}'
+        ),
+        from_email=POST_NOTIFICATION_FROM,
+        recipients=POST_NOTIFICATION_TO,
+    )
+
+
+def backoff(attempts):
+    """Пауза в секундах перед следующей попыткой."""
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1))
+
+
+def claim(batch_size=BATCH_SIZE):
+    """Забирает письма, которым пора уходить.
+
+    Письмо достаётся тому отправителю, чей UPDATE его изменил, поэтому
+    несколько отправителей могут работать одновременно.
+    """
+    now = timezone.now()
+    candidates = EmailOutbox.objects.filter(
+        status=OUTBOX_PENDING, next_attempt_at__lte=now,
+    ).order_by('next_attempt_at', 'pk').values_list(
+        'pk', 'next_attempt_at',
+    )[:batch_size]
+    claimed = [
+        pk for pk, next_attempt_at in candidates
+        if EmailOutbox.objects.filter(
+            pk=pk, status=OUTBOX_PENDING, next_attempt_at=next_attempt_at,
+        ).update(next_attempt_at=now + timedelta(seconds=LEASE))
+    ]
+    return list(EmailOutbox.objects.filter(pk__in=claimed).order_by('pk'))
+
+
+def _failed(message, error, max_attempts):
+    attempts = message.attempts + 1
+    EmailOutbox.objects.filter(pk=message.pk).update(
+        attempts=attempts,
+        last_error=repr(error),
+        status=OUTBOX_FAILED if attempts >= max_attempts else OUTBOX_PENDING,
+        next_attempt_at=timezone.now() + timedelta(seconds=backoff(attempts)),
+    )
+
+
+def dispatch(batch_size=BATCH_SIZE, max_attempts=MAX_ATTEMPTS):
+    """Отправляет одну пачку писем через одно соединение.
+
+    Возвращает число отправленных и неотправленных писем и время
+    отправки пачки в секундах.
+    """
+    messages = claim(batch_size)
+    if not messages:
+        return 0, 0, 0.0
+    started = time.monotonic()
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for message in messages:
+            _failed(message, error, max_attempts)
+        return 0, len(messages), time.monotonic() - started
+    sent = failed = 0
+    try:
+        for message in messages:
+            try:
+                EmailMessage(
+                    message.subject,
+                    message.body,
+                    message.from_email,
+                    message.recipients,
+                    connection=connection,
+                ).send()
+            except Exception as error:
+                _failed(message, error, max_attempts)
+                failed += 1
+            else:
+                EmailOutbox.objects.filter(pk=message.pk).update(
+                    status=OUTBOX_SENT,
+                    attempts=message.attempts + 1,
+                    sent_at=timezone.now(),
+                )
+                sent += 1
+    finally:
+        connection.close()
+    return sent, failed, time.monotonic() - started
+
+
+def _percentile(values, percent):
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def metrics(window=METRICS_WINDOW):
+    """Глубина очереди и задержка доставки писем за `window`.
+
+    Задержка — время от постановки письма в очередь до отправки, в
+    секундах.
+    """
+    now = timezone.now()
+    pending = EmailOutbox.objects.filter(status=OUTBOX_PENDING)
+    oldest = pending.aggregate(oldest=Min('created_at'))['oldest']
+    latencies = sorted(
+        (sent_at - created_at).total_seconds()
+        for created_at, sent_at in EmailOutbox.objects.filter(
+            status=OUTBOX_SENT, sent_at__gte=now - window,
+        ).values_list('created_at', 'sent_at')
+    )
+    return {
+        'queue_depth': pending.count(),
+        'due': pending.filter(next_attempt_at__lte=now).count(),
+        'failed': EmailOutbox.objects.filter(status=OUTBOX_FAILED).count(),
+        'oldest_pending_age': (
+            (now - oldest).total_seconds() if oldest else 0.0
+        ),
+        'sent': len(latencies),
+        'latency_p50': _percentile(latencies, 50),
+        'latency_p95': _percentile(latencies, 95),
+    }
@@ -0,0 +1,85 @@
+"""Справочники категорий и местоположений в памяти процесса.
+
+Таблицы маленькие и меняются редко, поэтому загружаются целиком при
+первом обращении. При сохранении или удалении записи сигнал после
+фиксации транзакции меняет метку версии в общем кэше, и каждый процесс
+перечитывает справочник при следующем обращении.
+
+Метка читается из кэша один раз за запрос: остальные обращения того же
+запроса обслуживает память. Вне запроса (команды, фоновые задачи) она
+читается при каждом обращении.
+"""
+import threading
+import uuid
+
+from django.core.cache import cache
+
+from .models import Category, Location
+
+VERSION_KEY = 'blog:registry-version'
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._data = None
+        # Метка версии, прочитанная в текущем запросе этого потока.
+        self._request = threading.local()
+
+    def start_request(self):
+        self._request.active = True
+        self._request.version = None
+
+    def finish_request(self):
+        self._request.active = False
+        self._request.version = None
+
+    def invalidate(self):
+        cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+        self._data = None
+        self._request.version = None
+
+    def _current_version(self):
+        version = getattr(self._request, 'version', None)
+        if version is None:
+            version = cache.get_or_set(VERSION_KEY, uuid.uuid4().hex, None)
+            if getattr(self._request, 'active', False):
+                self._request.version = version
+        return version
+
+    def _get_data(self):
+        version = self._current_version()
+        data = self._data
+        if data is not None and self._version == version:
+            return data
+        with self._lock:
+            categories = list(Category.objects.order_by('pk'))
+            locations = list(Location.objects.order_by('pk'))
+            data = {
+                'categories': categories,
+                'category_by_id': {obj.pk: obj for obj in categories},
+                'category_by_slug': {obj.slug: obj for obj in categories},
+                'locations': locations,
+                'location_by_id': {obj.pk: obj for obj in locations},
+            }
+            self._data, self._version = data, version
+        return data
+
+    def categories(self):
+        return self._get_data()['categories']
+
+    def category(self, pk):
+        return self._get_data()['category_by_id'].get(pk)
+
+    def category_by_slug(self, slug):
+        return self._get_data()['category_by_slug'].get(slug)
+
+    def locations(self):
+        return self._get_data()['locations']
+
+    def location(self, pk):
+        return self._get_data()['location_by_id'].get(pk)
+
+
+registry = Registry()
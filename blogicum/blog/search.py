@@ -0,0 +1,117 @@
+"""Полнотекстовый поиск по публикациям на SQLite FTS5.
+
+Виртуальная таблица `blog_post_search` хранит только индекс, текст она
+читает из `blog_post` (external content). Индекс обновляют триггеры на
+вставку, удаление и изменение заголовка или текста поста, поэтому он
+не отстаёт и при `bulk_create()` или `QuerySet.update()`. Миграции,
+которые пересоздают `blog_post`, удаляют её триггеры: после каждого
+`migrate` их восстанавливает `ensure_index()`.
+
+Видимость результатов та же, что у `Post.active_objects`; ранжирование —
+BM25 по всем совпадениям, совпадение в заголовке весит больше
+совпадения в тексте. Веса записаны в настройку `rank` индекса, поэтому
+запрос сортирует по скрытому столбцу `rank`, а первую страницу SQLite
+отбирает сортировкой с `LIMIT`, не упорядочивая все совпадения.
+"""
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections, models
+from django.db.models.expressions import RawSQL
+
+from .models import Post
+from core.paginators import KeysetPaginator
+
+TABLE = 'blog_post_search'
+TITLE_WEIGHT = 10.0
+TEXT_WEIGHT = 1.0
+MAX_TERMS = 8
+RANK = f'bm25({TITLE_WEIGHT}, {TEXT_WEIGHT})'
+TRIGGERS = (
+    f'''CREATE TRIGGER IF NOT EXISTS {TABLE}_insert
+    AFTER INSERT ON blog_post BEGIN
+        INSERT INTO {TABLE}(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS {TABLE}_delete
+    AFTER DELETE ON blog_post BEGIN
+        INSERT INTO {TABLE}({TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS {TABLE}_update
+    AFTER UPDATE OF title, text ON blog_post BEGIN
+        INSERT INTO {TABLE}({TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO {TABLE}(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END''',
+)
+
+
+def ensure_index(using=DEFAULT_DB_ALIAS, **kwargs):
+    """Восстанавливает триггеры и функцию ранжирования индекса, если
+    таблица индекса есть."""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    if TABLE not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        for sql in TRIGGERS:
+            cursor.execute(sql)
+        cursor.execute(
+            f"INSERT INTO {TABLE}({TABLE}, rank) VALUES ('rank', %s)",
+            (RANK,),
+        )
+
+
+def rebuild():
+    """Заново индексирует все посты и сжимает индекс."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {TABLE}({TABLE}) VALUES ('rebuild')")
+        cursor.execute(f"INSERT INTO {TABLE}({TABLE}) VALUES ('optimize')")
+
+
+def fts_query(text):
+    """Запрос FTS5 из слов `text`: все слова обязательны.
+
+    Каждое слово берётся в кавычки, поэтому операторы FTS5 во вводе
+    пользователя не работают и не дают синтаксических ошибок.
+    """
+    words = re.findall(r'\w+', text.lower())[:MAX_TERMS]
+    return ' '.join(f'"{word}"' for word in words)
+
+
+def _condition(sql, params=()):
+    return RawSQL(sql, params, output_field=models.BooleanField())
+
+
+def search(text):
+    """Видимые посты, подходящие под `text`, с рангом BM25 в `rank`.
+
+    Меньший ранг — более релевантный пост. Пустой запрос (или запрос
+    без слов) не находит ничего.
+    """
+    query = fts_query(text)
+    if not query:
+        return Post.objects.none().annotate(
+            rank=models.Value(0.0, output_field=models.FloatField()),
+        )
+    return Post.active_objects.filter(
+        search__isnull=False,
+    ).filter(
+        _condition(f'"{TABLE}" MATCH %s', (query,)),
+    ).annotate(rank=RawSQL(
+        f'"{TABLE}".rank', (), output_field=models.FloatField(),
+    )).order_by('rank', 'pk')
+
+
+class SearchPaginator(KeysetPaginator):
+    """Курсорная пагинация по рангу BM25 и pk."""
+
+    def __init__(self, queryset, per_page, ordering=('rank', 'pk')):
+        super().__init__(queryset, per_page, ordering)
+
+    def _get_field(self, name):
+        if name == 'rank':
+            return models.FloatField()
+        return super()._get_field(name)
@@ -0,0 +1,289 @@
+"""Обработчики сигналов приложения blog."""
+from functools import partial
+
+from django.core.signals import request_finished, request_started
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import feed, images, stats, typeahead
+from .models import (
+    IMAGE_PENDING, Category, Comment, FeedEntry, Location, Post, User,
+)
+from .registry import registry
+from core.cache import invalidate_tags
+from core.paginators import invalidate_cached_counts
+
+
+def after_commit(func, *args):
+    """Вызывает `func` после фиксации транзакции.
+
+    Сброс кэша до фиксации позволил бы другому процессу прочитать ещё
+    старые строки и снова закэшировать их уже после сброса, а событие
+    индекса подсказок осталось бы в памяти и после отката.
+    """
+    transaction.on_commit(partial(func, *args))
+
+
+def touch_posts(*conditions, **filters):
+    """Обновляет `updated_at` постов, страницы которых показывают
+    изменённый объект."""
+    Post.objects.filter(*conditions, **filters).update(
+        updated_at=timezone.now(),
+    )
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, **kwargs):
+    """Увеличивает счётчик комментариев поста при создании комментария.
+
+    Любое изменение комментария обновляет `updated_at` поста.
+    """
+    if not instance.post_id:
+        return
+    if not created:
+        touch_posts(pk=instance.post_id)
+        return
+    Post.objects.filter(pk=instance.post_id).update(
+        comment_count=F('comment_count') + 1,
+        updated_at=timezone.now(),
+    )
+    FeedEntry.objects.filter(pk=instance.post_id).update(
+        comment_count=F('comment_count') + 1,
+    )
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    """Уменьшает счётчик комментариев поста при удалении комментария.
+
+    Срабатывает и при каскадном удалении, и при удалении через админку.
+    """
+    if not instance.post_id:
+        return
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1,
+        updated_at=timezone.now(),
+    )
+    FeedEntry.objects.filter(
+        pk=instance.post_id, comment_count__gt=0,
+    ).update(comment_count=F('comment_count') - 1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_feed_counts(sender, **kwargs):
+    """Сбрасывает счётчики лент: пост или категория могли сменить
+    видимость, а число постов в ленте — измениться."""
+    after_commit(invalidate_cached_counts)
+
+
+@receiver(post_save, sender=Post)
+def sync_feed_post(sender, instance, **kwargs):
+    feed.sync_post(instance.pk)
+
+
+@receiver(pre_save, sender=Category)
+def remember_feed_category(sender, instance, **kwargs):
+    feed.category_saving(instance)
+
+
+@receiver(post_save, sender=Category)
+def sync_feed_category(sender, instance, **kwargs):
+    feed.sync_category(instance)
+
+
+@receiver(post_save, sender=Location)
+def sync_feed_location(sender, instance, **kwargs):
+    feed.sync_location(instance)
+
+
+@receiver(pre_delete, sender=Location)
+def clear_feed_location(sender, instance, **kwargs):
+    """Посты удаляемого места получат `location=NULL` без сигналов."""
+    FeedEntry.objects.filter(post__location=instance).update(
+        location_name='',
+    )
+
+
+@receiver(post_save, sender=User)
+def sync_feed_author(sender, instance, **kwargs):
+    feed.sync_author(instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def reset_registry(sender, **kwargs):
+    after_commit(registry.invalidate)
+
+
+@receiver(request_started)
+def start_registry_request(sender, **kwargs):
+    registry.start_request()
+
+
+@receiver(request_finished)
+def finish_registry_request(sender, **kwargs):
+    registry.finish_request()
+
+
+@receiver(post_save, sender=Post)
+def index_post_title(sender, instance, **kwargs):
+    after_commit(typeahead.index.publish, typeahead.post_entry(instance))
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post_title(sender, instance, **kwargs):
+    after_commit(typeahead.index.publish, (typeahead.POST, instance.pk, None))
+
+
+@receiver(post_save, sender=Category)
+def index_category_title(sender, instance, **kwargs):
+    after_commit(
+        typeahead.index.publish, typeahead.category_entry(instance),
+    )
+
+
+@receiver(post_delete, sender=Category)
+def unindex_category_title(sender, instance, **kwargs):
+    after_commit(
+        typeahead.index.publish, (typeahead.CATEGORY, instance.pk, None),
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def purge_post_pages(sender, instance, **kwargs):
+    after_commit(
+        invalidate_tags,
+        'feed',
+        f'post:{instance.pk}',
+        f'feed:category:{instance.category_id}',
+        f'feed:author:{instance.author_id}',
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_comment_pages(sender, instance, **kwargs):
+    # Страница автора показывает число его комментариев.
+    after_commit(
+        invalidate_tags,
+        f'post:{instance.post_id}',
+        f'feed:author:{instance.author_id}',
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def purge_category_pages(sender, instance, **kwargs):
+    after_commit(
+        invalidate_tags,
+        'feed',
+        f'category:{instance.pk}',
+        f'feed:category:{instance.pk}',
+    )
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def purge_location_pages(sender, instance, **kwargs):
+    after_commit(invalidate_tags, 'feed-entries', f'location:{instance.pk}')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def purge_author_pages(sender, instance, update_fields=None, **kwargs):
+    """Отметка о входе на страницах не видна и кэш не сбрасывает."""
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    after_commit(
+        invalidate_tags,
+        'feed-entries',
+        f'author:{instance.pk}',
+        f'feed:author:{instance.pk}',
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_category_posts(sender, instance, created=False, **kwargs):
+    if not created:
+        touch_posts(category=instance)
+
+
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def touch_location_posts(sender, instance, created=False, **kwargs):
+    if not created:
+        touch_posts(location=instance)
+
+
+@receiver(post_save, sender=User)
+def touch_author_posts(sender, instance, created, update_fields=None,
+                       **kwargs):
+    if created or update_fields and set(update_fields) == {'last_login'}:
+        return
+    touch_posts(Q(author=instance) | Q(comments__author=instance))
+
+
+@receiver(pre_save, sender=Post)
+def remember_stats_post_author(sender, instance, **kwargs):
+    stats.post_saving(instance)
+
+
+@receiver(post_save, sender=Post)
+def update_stats_post_saved(sender, instance, created, **kwargs):
+    stats.post_saved(instance, created)
+
+
+@receiver(post_delete, sender=Post)
+def update_stats_post_deleted(sender, instance, **kwargs):
+    stats.post_deleted(instance)
+
+
+@receiver(post_save, sender=Comment)
+def update_stats_comment_created(sender, instance, created, **kwargs):
+    if created:
+        stats.comment_created(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def update_stats_comment_deleted(sender, instance, **kwargs):
+    stats.comment_deleted(instance)
+
+
+@receiver(post_save, sender=Post)
+def queue_image_processing(sender, instance, **kwargs):
+    """Ставит новую картинку поста в очередь `manage.py process_images`.
+
+    Сам файл здесь не открывается, чтобы время ответа на создание и
+    редактирование поста не зависело от размера картинки.
+    """
+    name = instance.image.name or ''
+    if not name:
+        if instance.image_status or instance.image_variants:
+            after_commit(
+                images.delete_files,
+                images.variant_files(instance.image_variants),
+            )
+            instance.image_status, instance.image_variants = '', {}
+            Post.objects.filter(pk=instance.pk).update(
+                image_status='', image_variants={},
+            )
+            FeedEntry.objects.filter(pk=instance.pk).update(
+                image_variants={},
+            )
+        return
+    if (instance.image_variants.get('source') == name
+            or instance.image_status == IMAGE_PENDING):
+        return
+    instance.image_status = IMAGE_PENDING
+    Post.objects.filter(pk=instance.pk).update(image_status=IMAGE_PENDING)
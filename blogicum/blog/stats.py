@@ -0,0 +1,111 @@
+"""Поддержка таблицы `ProfileStats`."""
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Post, ProfileStats, User
+
+
+def _count(queryset, field):
+    return Coalesce(Subquery(
+        queryset.filter(**{field: OuterRef('pk')}).values(field).annotate(
+            total=Count('pk'),
+        ).values('total')
+    ), Value(0))
+
+
+def _last_post_date(user_id):
+    # Берётся из индекса post_author_feed_idx.
+    return Subquery(
+        Post.objects.filter(author_id=user_id).order_by(
+            '-pub_date',
+        ).values('pub_date')[:1]
+    )
+
+
+def users_with_stats():
+    """Пользователи со счётчиками, посчитанными по базе."""
+    return User.objects.annotate(
+        stats_post_count=_count(Post.objects, 'author'),
+        stats_comment_count=_count(Comment.objects, 'author'),
+        stats_last_post_date=_last_post_date(OuterRef('pk')),
+    )
+
+
+def build_stats(user):
+    return ProfileStats(
+        user_id=user.pk,
+        post_count=user.stats_post_count,
+        comment_count=user.stats_comment_count,
+        last_post_date=user.stats_last_post_date,
+    )
+
+
+def refresh(user_id):
+    """Пересчитывает строку одного пользователя."""
+    user = users_with_stats().filter(pk=user_id).first()
+    if user is not None:
+        build_stats(user).save()
+
+
+def _update(user_id, create=True, **changes):
+    updated = ProfileStats.objects.filter(pk=user_id).update(**changes)
+    if not updated and create:
+        refresh(user_id)
+
+
+def post_saving(post):
+    """Запоминает автора поста в базе до сохранения: в админке автора
+    можно сменить, и тогда `post_saved()` поправит строки обоих."""
+    post._stats_author_id = None if post._state.adding else (
+        Post.objects.filter(pk=post.pk).values_list(
+            'author_id', flat=True,
+        ).first()
+    )
+
+
+def post_saved(post, created):
+    previous = getattr(post, '_stats_author_id', None)
+    moved = previous is not None and previous != post.author_id
+    changes = {'last_post_date': _last_post_date(post.author_id)}
+    if created or moved:
+        changes['post_count'] = F('post_count') + 1
+    _update(post.author_id, **changes)
+    if moved:
+        _post_removed(previous)
+
+
+def _post_removed(user_id):
+    # Строки удаляемого вместе с постами пользователя не создаются заново.
+    ProfileStats.objects.filter(pk=user_id, post_count__gt=0).update(
+        post_count=F('post_count') - 1,
+        last_post_date=_last_post_date(user_id),
+    )
+
+
+def post_deleted(post):
+    _post_removed(post.author_id)
+
+
+def comment_created(comment):
+    _update(comment.author_id, comment_count=F('comment_count') + 1)
+
+
+def comment_deleted(comment):
+    ProfileStats.objects.filter(
+        pk=comment.author_id, comment_count__gt=0,
+    ).update(comment_count=F('comment_count') - 1)
+
+
+def rebuild(chunk_size=1000):
+    """Полностью пересобирает таблицу, возвращает число строк."""
+    ProfileStats.objects.all().delete()
+    total = 0
+    batch = []
+    for user in users_with_stats().order_by('pk').iterator(
+        chunk_size=chunk_size,
+    ):
+        batch.append(build_stats(user))
+        if len(batch) >= chunk_size:
+            total += len(ProfileStats.objects.bulk_create(batch))
+            batch = []
+    return total + len(ProfileStats.objects.bulk_create(batch))
@@ -0,0 +1,17 @@
+from django import template
+
+from blog.registry import registry
+
+register = template.Library()
+
+
+@register.filter
+def category(category_id):
+    """Категория из справочника по её id."""
+    return registry.category(category_id)
+
+
+@register.filter
+def location(location_id):
+    """Местоположение из справочника по его id."""
+    return registry.location(location_id)
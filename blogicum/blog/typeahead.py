@@ -0,0 +1,397 @@
+"""Подсказки для строки поиска из индекса заголовков в памяти процесса.
+
+Заголовки постов и категорий лежат в списке, их номера и данные для
+проверки видимости — в массивах `array`. Индекс — массив чисел «номер
+заголовка, смещение слова», отсортированный по тексту заголовка с
+этого слова; поиск по префиксу — двоичный поиск и проход по соседним
+ключам. Ключ занимает 8 байт: строки под каждое слово не создаются.
+
+В индекс попадают опубликованные посты; дату публикации и видимость
+категории проверяет сам поиск, поэтому отложенные посты появляются в
+подсказках вовремя, а скрытие категории не требует перестройки.
+
+Индекс строится из базы один раз на процесс и дальше меняется только
+событиями: сигналы пишут их
+в журнал — таблицу `TypeaheadEvent`, номера событий выдаёт база — и
+отмечают номер последнего в общем кэше. Фоновый поток процесса раз в
+`SYNC_INTERVAL` секунд сверяется с этой отметкой и, только если она
+новее его индекса, читает новые события одним запросом. Поток
+запускается при первом поиске или событии в процессе — и в каждом
+процессе, созданном `fork`, заново. Если события уже удалены из
+журнала или индекс не построен, поток строит его заново, а запросы
+обслуживают старый индекс (или пустой). Поиск по
+префиксу читает только память и к базе не обращается.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from array import array
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Max
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Category, Post, TypeaheadEvent
+
+logger = logging.getLogger(__name__)
+
+KEY_LENGTH = 24
+MIN_PREFIX = 2
+LIMIT = 8
+SYNC_INTERVAL = 5
+SEQUENCE_KEY = 'blog:typeahead:sequence'
+# Сколько секунд события хранятся в журнале.
+EVENT_TIMEOUT = 60 * 60
+WORD_START = re.compile(r'\b\w')
+OFFSET_BITS = 16
+OFFSET_MASK = (1 << OFFSET_BITS) - 1
+POST, CATEGORY = 'p', 'c'
+STATE = (
+    '_keys', '_titles', '_refs', '_pub_dates', '_post_categories',
+    '_numbers', '_categories',
+)
+
+
+def normalize(text):
+    return ' '.join(text.casefold().replace('ё', 'е').split())
+
+
+def post_entry(post):
+    """Событие журнала для поста: данные для индекса или удаление."""
+    if not post.is_published or post.category_id is None:
+        return (POST, post.pk, None)
+    return (
+        POST, post.pk,
+        (post.title, post.pub_date.timestamp(), post.category_id),
+    )
+
+
+def category_entry(category):
+    return (
+        CATEGORY, category.pk,
+        (category.title, category.slug, category.is_published),
+    )
+
+
+def word_keys(titles, number):
+    """Ключи индекса для слов заголовка с номером `number`."""
+    return [
+        number << OFFSET_BITS | match.start()
+        for match in WORD_START.finditer(normalize(titles[number]))
+    ]
+
+
+def sort_key(titles, key):
+    offset = key & OFFSET_MASK
+    text = normalize(titles[key >> OFFSET_BITS])
+    return text[offset:offset + KEY_LENGTH], key
+
+
+def bisect_left(keys, titles, target):
+    """Первая позиция в `keys`, где ключ не меньше `target`."""
+    low, high = 0, len(keys)
+    while low < high:
+        middle = (low + high) // 2
+        if sort_key(titles, keys[middle]) < target:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+class TitleIndex:
+    # Запускать ли фоновый поток при поиске и публикации событий; в
+    # тестах индекс сверяется с журналом явным вызовом `sync()`.
+    background = True
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._thread = None
+        self.reset()
+
+    def reset(self):
+        """Забывает индекс: следующий поиск запустит его построение."""
+        with self._lock:
+            self._keys = None
+            self._sequence = 0
+            self._clear()
+
+    def _clear(self):
+        # Данные заголовков по их номерам; у удалённых заголовок None.
+        self._titles = []
+        self._refs = array('q')  # pk поста или -pk категории
+        self._pub_dates = array('d')
+        self._post_categories = array('q')
+        self._numbers = {}  # pk поста или -pk категории → номер
+        self._categories = {}  # pk → (slug, is_published)
+
+    @property
+    def built(self):
+        return self._keys is not None
+
+    def _set(self, kind, pk, data):
+        """Записывает данные заголовка и возвращает его номер."""
+        ref = pk if kind == POST else -pk
+        number = self._numbers.get(ref)
+        if number is None:
+            number = self._numbers[ref] = len(self._titles)
+            self._titles.append(None)
+            self._refs.append(ref)
+            self._pub_dates.append(0)
+            self._post_categories.append(0)
+        self._titles[number] = data[0]
+        if kind == POST:
+            self._pub_dates[number] = data[1]
+            self._post_categories[number] = data[2]
+        else:
+            self._categories[pk] = data[1:]
+        return number
+
+    def load(self, posts, categories, sequence=0):
+        """Заменяет индекс заголовками из пар `(pk, данные)`.
+
+        Новый индекс собирается без блокировки: до замены запросы
+        обслуживает старый.
+        """
+        fresh = TitleIndex()
+        for kind, items in ((POST, posts), (CATEGORY, categories)):
+            for pk, data in items:
+                fresh._set(kind, pk, data)
+        words = []
+        for number, title in enumerate(fresh._titles):
+            text = normalize(title)
+            words.extend(
+                (
+                    text[match.start():match.start() + KEY_LENGTH],
+                    number << OFFSET_BITS | match.start(),
+                )
+                for match in WORD_START.finditer(text)
+            )
+        words.sort()
+        fresh._keys = array('Q', (key for _, key in words))
+        with self._lock:
+            for name in STATE:
+                setattr(self, name, getattr(fresh, name))
+            self._sequence = sequence
+
+    def build(self):
+        """Читает заголовки из базы; события журнала, пришедшие во время
+        чтения, применит следующая сверка с журналом."""
+        sequence = TypeaheadEvent.objects.aggregate(
+            sequence=Max('pk'),
+        )['sequence'] or 0
+        cache.add(SEQUENCE_KEY, sequence, None)
+        posts = list(Post.objects.filter(
+            is_published=True, category__isnull=False,
+        ).values_list('pk', 'title', 'pub_date', 'category_id').iterator())
+        categories = list(Category.objects.values_list(
+            'pk', 'title', 'slug', 'is_published',
+        ))
+        self.load(
+            (
+                (pk, (title, pub_date.timestamp(), category_id))
+                for pk, title, pub_date, category_id in posts
+            ),
+            ((pk, data) for pk, *data in categories),
+            sequence,
+        )
+
+    def start(self):
+        """Запускает фоновую сверку с журналом, если она ещё не идёт.
+
+        После `fork` поток родителя в дочернем процессе не работает,
+        поэтому проверяется, жив ли он.
+        """
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name='typeahead-sync', daemon=True,
+            )
+            self._thread.start()
+
+    def _forked(self):
+        # Блокировку мог держать поток родителя, которого здесь уже нет.
+        self._lock = threading.RLock()
+        self._thread = None
+
+    def _run(self):
+        while True:
+            try:
+                self.sync()
+            except Exception:
+                logger.exception('Не удалось обновить индекс подсказок')
+            finally:
+                connection.close()
+            time.sleep(SYNC_INTERVAL)
+
+    def apply(self, event):
+        kind, pk, data = event
+        with self._lock:
+            keys, titles = self._keys, self._titles
+            number = self._numbers.get(pk if kind == POST else -pk)
+            if number is not None and titles[number] is not None:
+                for key in word_keys(titles, number):
+                    position = bisect_left(
+                        keys, titles, sort_key(titles, key),
+                    )
+                    if position < len(keys) and keys[position] == key:
+                        del keys[position]
+                titles[number] = None
+            if data is None:
+                if kind == CATEGORY:
+                    self._categories.pop(pk, None)
+                return
+            number = self._set(kind, pk, data)
+            for key in word_keys(titles, number):
+                keys.insert(
+                    bisect_left(keys, titles, sort_key(titles, key)), key,
+                )
+
+    def publish(self, event):
+        """Записывает событие в журнал и сразу применяет его у себя."""
+        if self.background:
+            self.start()
+        kind, pk, data = event
+        sequence = TypeaheadEvent.objects.create(
+            kind=kind, object_id=pk, data=data,
+        ).pk
+        TypeaheadEvent.objects.filter(
+            pk__lt=sequence,
+            created_at__lt=timezone.now() - timedelta(seconds=EVENT_TIMEOUT),
+        ).delete()
+        cache.set(SEQUENCE_KEY, sequence, None)
+        if not self.built:
+            return
+        with self._lock:
+            self.apply(event)
+            if self._sequence == sequence - 1:
+                self._sequence = sequence
+
+    def publish_many(self, events):
+        """`publish()` для нескольких событий одним запросом на запись.
+
+        Номера событий `bulk_create()` не возвращает, поэтому номер
+        индекса не сдвигается: сверка с журналом применит их ещё раз,
+        это ничего не меняет.
+        """
+        if not events:
+            return
+        if self.background:
+            self.start()
+        TypeaheadEvent.objects.bulk_create(
+            TypeaheadEvent(kind=kind, object_id=pk, data=data)
+            for kind, pk, data in events
+        )
+        sequence = TypeaheadEvent.objects.aggregate(
+            sequence=Max('pk'),
+        )['sequence']
+        TypeaheadEvent.objects.filter(
+            pk__lte=sequence - len(events),
+            created_at__lt=timezone.now() - timedelta(seconds=EVENT_TIMEOUT),
+        ).delete()
+        cache.set(SEQUENCE_KEY, sequence, None)
+        if not self.built:
+            return
+        with self._lock:
+            for event in events:
+                self.apply(event)
+
+    def sync(self):
+        """Применяет новые события журнала; вызывается из фонового потока.
+
+        Журнал читается, только если отметка в общем кэше новее индекса
+        или пропала. Непостроенный индекс и индекс, пропустивший
+        события, строятся заново.
+        """
+        if not self.built:
+            self.build()
+            return
+        latest = cache.get(SEQUENCE_KEY)
+        if latest is not None and latest <= self._sequence:
+            return
+        # Последнее применённое событие читается вместе с новыми: если
+        # его уже нет, журнал мог потерять и те, что шли за ним.
+        events = list(TypeaheadEvent.objects.filter(
+            pk__gte=self._sequence,
+        ).order_by('pk').values_list('pk', 'kind', 'object_id', 'data'))
+        if self._sequence and (not events or events[0][0] != self._sequence):
+            logger.warning('Журнал подсказок потерял события')
+            self.build()
+            return
+        with self._lock:
+            for sequence, kind, pk, data in events:
+                if sequence > self._sequence:
+                    self.apply((kind, pk, data and tuple(data)))
+                    self._sequence = sequence
+        if latest is None:
+            cache.add(SEQUENCE_KEY, self._sequence, None)
+
+    def _visible(self, number, now):
+        ref = self._refs[number]
+        if ref < 0:
+            return self._categories[-ref][1]
+        category = self._categories.get(self._post_categories[number])
+        return self._pub_dates[number] <= now and category and category[1]
+
+    def lookup(self, prefix, limit=LIMIT):
+        """Видимые категории и посты, в заголовке которых есть слово,
+        начинающееся с `prefix`: сначала категории, затем посты.
+
+        Читает только память: пока индекс не построен, подсказок нет,
+        а строит его запущенный здесь фоновый поток.
+        """
+        if self.background:
+            self.start()
+        prefix = normalize(prefix)
+        if len(prefix) < MIN_PREFIX:
+            return []
+        if not self.built:
+            return []
+        head = prefix[:KEY_LENGTH]
+        now = time.time()
+        found = {POST: [], CATEGORY: []}
+        with self._lock:
+            keys, titles = self._keys, self._titles
+            position = bisect_left(keys, titles, (head,))
+            while position < len(keys) and len(found[POST]) < limit:
+                key = keys[position]
+                position += 1
+                number, offset = key >> OFFSET_BITS, key & OFFSET_MASK
+                text = normalize(titles[number])
+                if not text.startswith(head, offset):
+                    break
+                kind = CATEGORY if self._refs[number] < 0 else POST
+                if (
+                    number in found[kind]
+                    or not text.startswith(prefix, offset)
+                    or not self._visible(number, now)
+                ):
+                    continue
+                found[kind].append(number)
+            return [
+                self._result(number)
+                for number in (found[CATEGORY] + found[POST])[:limit]
+            ]
+
+    def _result(self, number):
+        ref = self._refs[number]
+        if ref < 0:
+            slug = self._categories[-ref][0]
+            url = reverse('blog:category_posts', args=(slug,))
+        else:
+            url = reverse('blog:post_detail', args=(ref,))
+        return {'title': self._titles[number], 'url': url}
+
+
+index = TitleIndex()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=index._forked)
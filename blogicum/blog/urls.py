@@ -6,6 +6,12 @@ app_name = 'blog'
 
 urlpatterns = [
     path('', views.IndexListView.as_view(), name='index'),
+    path('search/', views.SearchView.as_view(), name='search'),
+    path(
+        'search/suggest/',
+        views.TypeaheadView.as_view(),
+        name='search_suggest',
+    ),
     path(
         'posts/create/',
         views.PostCreateView.as_view(),
@@ -1,53 +1,204 @@
 # import datetime
+import hashlib
+import math
+from urllib.parse import urlencode
 
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count
-from django.http import Http404
-from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.db.models import QuerySet
+from django.http import Http404, JsonResponse
 from django.urls import reverse
 from django.utils import timezone
 from django.views.generic import (CreateView, DeleteView, DetailView, ListView,
-                                  UpdateView)
+                                  UpdateView, View)
 
+from . import feed, outbox, search, typeahead
 from .constants import POSTS_IN_PAGE
 from .forms import CommentForm, EditUserForm, PostForm
-from .models import Category, Comment, Post, User
-from core.mixins import (AuthorshipMixin, SuccessUrlPostDetail,
-                         SuccessUrlProfile)
+from .models import (PUBLIC_USER_FIELDS, Comment, Post, ProfileStats, User,
+                     private_user_fields)
+from .registry import registry
+from core.cache import tiered_cache
+from core.mixins import (AnonymousPageCacheMixin, AuthorshipMixin,
+                         CachedObjectMixin, ConditionalGetMixin,
+                         KeysetPaginationMixin, ParentObjectMixin,
+                         SuccessUrlPostDetail, SuccessUrlProfile)
+from core.paginators import CachedPagePaginator, cached_counts_version
+
+POST_VERSION_FIELDS = (
+    'pub_date', 'updated_at', 'comment_count',
+    # Поля, из которых `post_cache_tags()` строит теги страницы.
+    'category_id', 'author_id', 'location_id',
+)
+
+
+def post_cache_tags(posts):
+    """Теги кэша страниц для показанных на странице постов."""
+    tags = []
+    for post in posts:
+        tags += [f'post:{post.pk}', f'category:{post.category_id}']
+        if isinstance(post, Post):
+            tags += [
+                f'author:{post.author_id}',
+                f'location:{post.location_id}',
+            ]
+        else:
+            # Строка FeedEntry хранит имя автора и места у себя.
+            tags.append('feed-entries')
+    return tags
+
+
+class FeedPaginator(CachedPagePaginator):
+    """Строки страниц ленты кэшируются с тегами показанных постов.
+
+    У авторов постов в кэш попадают только публичные поля.
+    """
+
+    page_tags = ('feed',)
+
+    def get_page_tags(self, rows):
+        return [*self.page_tags, *post_cache_tags(rows)]
+
+    def _get_page(self, object_list, *args, **kwargs):
+        if isinstance(object_list, QuerySet) and object_list.model is Post:
+            object_list = object_list.defer(*private_user_fields('author__'))
+        return super()._get_page(object_list, *args, **kwargs)
+
+
+class FeedPageCacheMixin(AnonymousPageCacheMixin):
+    """Кэш страниц ленты.
+
+    Страница не живёт дольше момента ближайшей отложенной публикации:
+    наступление даты публикации не вызывает сигналов.
+    """
+
+    def get_page_cache_timeout(self):
+        timeout = super().get_page_cache_timeout()
+        now = timezone.now()
+        upcoming = Post.objects.filter(
+            is_published=True, pub_date__gt=now,
+        ).order_by('pub_date').values_list('pub_date', flat=True).first()
+        if upcoming is not None:
+            delay = math.ceil((upcoming - now).total_seconds())
+            timeout = min(timeout, delay)
+        return timeout
+
+    def get_page_cache_tags(self, context):
+        return post_cache_tags(context.get('page_obj') or ())
+
+
+class FeedConditionalGetMixin(ConditionalGetMixin):
+    """ETag ленты по постам текущей страницы.
+
+    Строки страницы выбираются тем же запросом, что и для отрисовки, но
+    только с полями версии поста (или карточки `FeedEntry`). Число
+    страниц учитывается через версию счётчиков пагинатора.
+    """
+
+    def get_validators(self):
+        if feed.is_enabled():
+            fields = (*feed.CARD_FIELDS, 'category_id')
+        else:
+            fields = POST_VERSION_FIELDS
+        queryset = self.get_queryset().select_related(None).only(*fields)
+        _, page, rows, _ = self.paginate_queryset(
+            queryset, self.get_paginate_by(queryset),
+        )
+        state = (
+            cached_counts_version(),
+            page.has_next(),
+            page.has_previous(),
+            [[row.pk, *(getattr(row, name) for name in fields)]
+             for row in rows],
+        )
+        return hashlib.md5(repr(state).encode()).hexdigest(), None
 
 
-class IndexListView(ListView):
+class IndexListView(FeedPageCacheMixin, FeedConditionalGetMixin,
+                    KeysetPaginationMixin, ListView):
     """Главная страница"""
 
     template_name = 'blog/index.html'
     paginate_by = POSTS_IN_PAGE
-    queryset = Post.active_objects.all()
-    ordering = '-pub_date'
+    paginator_class = FeedPaginator
 
+    def get_queryset(self):
+        if feed.is_enabled():
+            return feed.visible_entries().order_by('-pub_date')
+        return Post.active_objects.order_by('-pub_date')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if feed.is_enabled():
+            context['post_card_template'] = feed.CARD_TEMPLATE
+        return context
 
-class CategoryListView(ListView):
+    def get_page_cache_tags(self, context):
+        return ['feed', *super().get_page_cache_tags(context)]
+
+
+class CategoryListView(FeedPageCacheMixin, FeedConditionalGetMixin,
+                       KeysetPaginationMixin, ListView):
     """Страница категорий"""
 
     paginate_by = POSTS_IN_PAGE
+    paginator_class = FeedPaginator
     template_name = 'blog/category.html'
 
     def get_context_data(self, **kwargs):
-        return dict(
-            **super().get_context_data(**kwargs),
-            category=get_object_or_404(
-                Category,
-                slug=self.kwargs['category_slug'],
-            ),
-        )
+        context = super().get_context_data(**kwargs)
+        context['category'] = self.category
+        if feed.is_enabled():
+            context['post_card_template'] = feed.CARD_TEMPLATE
+        return context
+
+    def get_page_cache_tags(self, context):
+        return [
+            f'feed:category:{self.category.pk}',
+            f'category:{self.category.pk}',
+            *super().get_page_cache_tags(context),
+        ]
 
     def get_queryset(self):
-        category = get_object_or_404(
-            Category.objects.filter(
-                is_published=True,
-                slug=self.kwargs['category_slug'],
-            )
-        )
-        return category.posts(manager='active_objects').order_by('-pub_date')
+        self.category = registry.category_by_slug(self.kwargs['category_slug'])
+        if self.category is None or not self.category.is_published:
+            raise Http404('Page not found')
+        if feed.is_enabled():
+            return feed.visible_entries().filter(
+                category=self.category,
+            ).order_by('-pub_date')
+        return Post.active_objects.filter(
+            category=self.category,
+        ).order_by('-pub_date')
+
+
+class SearchView(KeysetPaginationMixin, ListView):
+    """Поиск по публикациям"""
+
+    template_name = 'blog/search.html'
+    paginate_by = POSTS_IN_PAGE
+    keyset_pagination = True
+    keyset_paginator_class = search.SearchPaginator
+    keyset_ordering = ('rank', 'pk')
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        return search.search(self.query)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        context['extra_query'] = urlencode({'q': self.query})
+        return context
+
+
+class TypeaheadView(View):
+    """Подсказки для строки поиска из индекса в памяти процесса"""
+
+    def get(self, request):
+        return JsonResponse({
+            'results': typeahead.index.lookup(request.GET.get('q', '')),
+        })
 
 
 class PostCreateView(LoginRequiredMixin, SuccessUrlProfile, CreateView):
@@ -59,56 +210,80 @@ class PostCreateView(LoginRequiredMixin, SuccessUrlProfile, CreateView):
 
     def form_valid(self, form):
         form.instance.author = self.request.user
-        return super().form_valid(form)
+        with transaction.atomic():
+            response = super().form_valid(form)
+            outbox.enqueue_post_notification(self.object)
+        return response
 
 
-class ProfileListView(ListView):
+class ProfileListView(FeedPageCacheMixin, KeysetPaginationMixin, ListView):
     """Страница пользователя"""
 
     model = Post
     template_name = 'blog/profile.html'
     slug_url_kwarg = 'username'
     paginate_by = POSTS_IN_PAGE
+    paginator_class = FeedPaginator
     ordering = '-pub_date'
 
     def get_queryset(self):
-        self.user = get_object_or_404(User, username=self.kwargs['username'])
+        username = self.kwargs['username']
+        fields = tiered_cache.get_or_set(
+            f'blog:user:{username}',
+            lambda: User.objects.filter(username=username).values(
+                'pk', *PUBLIC_USER_FIELDS,
+            ).first(),
+            tags=lambda fields: [f'author:{fields["pk"]}'],
+        )
+        if fields is None:
+            raise Http404('Page not found')
+        self.user = User(**fields)
         posts = self.user.posts
         if self.user == self.request.user:
             posts = posts.filter(author=self.user)
         else:
             posts = posts.all()
-        return posts.order_by('-pub_date').annotate(
-            comment_count=Count('comments'),
-        )
+        return posts.order_by('-pub_date')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['profile'] = self.user
+        context['stats'] = ProfileStats.objects.filter(pk=self.user.pk).first()
         return context
 
+    def get_page_cache_tags(self, context):
+        return [
+            f'feed:author:{self.user.pk}',
+            f'author:{self.user.pk}',
+            *super().get_page_cache_tags(context),
+        ]
+
 
-class PostDetailView(DetailView):
+class PostDetailView(AnonymousPageCacheMixin, ConditionalGetMixin,
+                     CachedObjectMixin, DetailView):
     """Страница поста"""
 
-    model = Post
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
 
-    def dispatch(self, request, *args, **kwargs):
-        post = self.get_object()
-        now = timezone.now()
-
-        if (not post.is_published or (post.category
-                                      and not post.category.is_published)):
-            if (not request.user.is_authenticated
-                    or request.user != post.author):
-                raise Http404('Page not found')
-            return super().dispatch(request, *args, **kwargs)
+    def get_validators(self):
+        user = self.request.user
+        version = Post.objects.visible_to(user).filter(
+            pk=self.kwargs['post_id'],
+        ).values_list('updated_at', 'comment_count').first()
+        if version is None:
+            return None, None
+        updated_at, comment_count = version
+        etag = (
+            f'{self.kwargs["post_id"]}-{updated_at.timestamp()}'
+            f'-{comment_count}'
+        )
+        # Страница авторизованного пользователя зависит от него самого,
+        # поэтому её отличает только ETag (см. `ConditionalGetMixin`).
+        return etag, None if user.is_authenticated else updated_at
 
-        if post.pub_date > now and request.user != post.author:
-            raise Http404('Page not found')
-        return super().dispatch(request, *args, **kwargs)
+    def get_queryset(self):
+        return Post.objects.with_related().visible_to(self.request.user)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -120,8 +295,17 @@ class PostDetailView(DetailView):
         context['post'] = post
         return context
 
+    def get_page_cache_tags(self, context):
+        # Комментарии уже загружены при отрисовке шаблона.
+        return [
+            *post_cache_tags([context['post']]),
+            *(f'author:{comment.author_id}'
+              for comment in context['comments']),
+        ]
 
-class CommentCreateView(LoginRequiredMixin, CreateView):
+
+class CommentCreateView(LoginRequiredMixin, SuccessUrlPostDetail,
+                        CreateView):
     """Страница создания комментария"""
 
     model = Comment
@@ -129,20 +313,23 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
     template_name = 'blog/comment.html'
 
     def dispatch(self, request, *args, **kwargs):
-        self.id_post_comment = get_object_or_404(Post, pk=kwargs['post_id'])
+        if not Post.objects.visible_to(request.user).filter(
+            pk=kwargs['post_id'],
+        ).exists():
+            raise Http404('Page not found')
         return super().dispatch(request, *args, **kwargs)
 
     def form_valid(self, form):
         form.instance.author = self.request.user
-        form.instance.post = Post.objects.get(pk=self.kwargs.get('post_id'))
-        return super().form_valid(form)
-
-    def get_success_url(self):
-        return reverse('blog:post_detail',
-                       kwargs={'post_id': self.id_post_comment.pk})
+        form.instance.post_id = self.kwargs['post_id']
+        # Вставка комментария и обновление счётчиков из сигналов
+        # выполняются одной транзакцией.
+        with transaction.atomic():
+            return super().form_valid(form)
 
 
-class CommentUpdateView(AuthorshipMixin, SuccessUrlPostDetail, UpdateView):
+class CommentUpdateView(AuthorshipMixin, ParentObjectMixin,
+                        SuccessUrlPostDetail, UpdateView):
     """Страница редактирования комментария"""
 
     form_class = CommentForm
@@ -150,14 +337,6 @@ class CommentUpdateView(AuthorshipMixin, SuccessUrlPostDetail, UpdateView):
     template_name = 'blog/comment.html'
     pk_url_kwarg = 'comment_id'
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['post'] = get_object_or_404(Post,
-                                            pk=self.kwargs['post_id'])
-        context['comment'] = get_object_or_404(Comment,
-                                               pk=self.kwargs['comment_id'])
-        return context
-
 
 class PostUpdateView(AuthorshipMixin, UpdateView):
     """Страница редактирования поста"""
@@ -198,7 +377,8 @@ class PostDeleteView(AuthorshipMixin, SuccessUrlProfile, DeleteView):
         return context
 
 
-class CommentDeleteView(AuthorshipMixin, SuccessUrlPostDetail, DeleteView):
+class CommentDeleteView(AuthorshipMixin, ParentObjectMixin,
+                        SuccessUrlPostDetail, DeleteView):
     """Страница удаления комментария"""
 
     model = Comment
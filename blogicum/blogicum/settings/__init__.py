@@ -0,0 +1,20 @@
+"""Настройки проекта.
+
+Профиль выбирается переменной окружения `DJANGO_ENV`: `dev` (по
+умолчанию) или `prod`. Профиль можно указать и напрямую:
+`DJANGO_SETTINGS_MODULE=blogicum.settings.prod`.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+PROFILE = os.environ.get('DJANGO_ENV', 'dev')
+
+if PROFILE == 'prod':
+    from .prod import *  # noqa: F401, F403
+elif PROFILE == 'dev':
+    from .dev import *  # noqa: F401, F403
+else:
+    raise ImproperlyConfigured(
+        f'Неизвестный профиль настроек DJANGO_ENV={PROFILE!r}.'
+    )
@@ -1,22 +1,20 @@
+"""Общие настройки для всех профилей."""
 from pathlib import Path
 
-BASE_DIR = Path(__file__).resolve().parent.parent
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 
 SECRET_KEY = 'django-insecure-9yto-j-aq9oj$_hy(w5^hus5_)v3tkka+s^f(hg!(n965gqxhm'
 
-DEBUG = True
+DEBUG = False
 
 ALLOWED_HOSTS = ['127.0.0.1', 'localhost']
 
-INTERNAL_IPS = [
-    '127.0.0.1',
-]
-
 
 INSTALLED_APPS = [
     'blog.apps.BlogConfig',
     'pages.apps.PagesConfig',
+    'core.apps.CoreConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -24,7 +22,6 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django_bootstrap5',
-    'debug_toolbar',
 ]
 
 MIDDLEWARE = [
@@ -35,7 +32,6 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
 ROOT_URLCONF = 'blogicum.urls'
@@ -45,7 +41,7 @@ TEMPLATES_DIR = BASE_DIR / 'templates'
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [BASE_DIR / 'templates/'],
+        'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -68,6 +64,13 @@ DATABASES = {
     }
 }
 
+# Общий кэш процессов; он же второй уровень `core.cache`.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -98,6 +101,7 @@ USE_TZ = True
 
 STATIC_URL = 'project_static/'
 STATICFILES_DIRS = [BASE_DIR / 'project_static']
+STATIC_ROOT = BASE_DIR / 'static_root'
 
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -111,6 +115,19 @@ LOGIN_REDIRECT_URL = 'blog:index'
 
 LOGIN_URL = 'login'
 
+# Курсорная пагинация лент вместо постраничной (OFFSET).
+KEYSET_PAGINATION = False
+
+# Главная и категории читают ленту из таблицы FeedEntry.
+FEED_READ_MODEL = False
+
+# Время жизни кэша страниц для анонимных посетителей, секунды (0 — выкл).
+# Включается только в боевых настройках.
+PAGE_CACHE_TIMEOUT = 0
+
+# Адрес сайта для ссылок в письмах.
+SITE_URL = 'http://127.0.0.1:8000'
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 # EMAIL_FILE_URL = 'sent_emails/'
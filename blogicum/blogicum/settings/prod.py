@@ -0,0 +1,60 @@
+"""Боевые настройки.
+
+Debug-панель здесь не подключается и не импортируется; проверка
+`manage.py check --deploy` завершается ошибкой, если она всё же
+оказалась в настройках.
+"""
+import os
+
+from .base import *  # noqa: F401, F403
+from .base import SECRET_KEY, SITE_URL, STATIC_ROOT, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', SECRET_KEY)
+
+ALLOWED_HOSTS = os.environ.get(
+    'DJANGO_ALLOWED_HOSTS', '127.0.0.1,localhost',
+).split(',')
+
+SITE_URL = os.environ.get('DJANGO_SITE_URL', SITE_URL)
+
+# Процессы сервера делят один файловый кэш: сбросы тегов, счётчиков и
+# справочников видны всем процессам.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get(
+            'DJANGO_CACHE_DIR', '/var/tmp/blogicum_cache',
+        ),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+# Анонимные посетители получают страницы из кэша.
+PAGE_CACHE_TIMEOUT = 600
+
+# `collectstatic` добавляет хеши в имена и сжатые копии `.gz`/`.br`;
+# отдаёт их `core.static.PrecompressedStatic` из `blogicum.wsgi`.
+STATIC_ROOT = os.environ.get('DJANGO_STATIC_ROOT', STATIC_ROOT)
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+# Шаблоны компилируются один раз на процесс.
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'context_processors': [
+            processor
+            for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+            if processor != 'django.template.context_processors.debug'
+        ],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
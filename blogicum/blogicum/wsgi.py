@@ -5,3 +5,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_wsgi_application()
+
+# Импорт после настройки Django: обёртка читает STATIC_ROOT и STATIC_URL.
+from core.static import PrecompressedStatic  # noqa: E402
+
+application = PrecompressedStatic(application)
@@ -0,0 +1,203 @@
+"""Двухуровневый кэш для выборок из базы данных.
+
+L1 — ограниченный LRU в памяти процесса с коротким временем жизни, L2 —
+общий кэш Django (`CACHES['default']`), который видят все процессы.
+Записи помечаются тегами: `invalidate_tags()` удаляет записи с этими
+тегами из L1 текущего процесса и меняет версии тегов в L2, поэтому
+остальные процессы видят изменение не позже чем через `L1_TIMEOUT`.
+
+Что кэшировать, решает вызывающий код: в кэш попадает только то, что
+прочитано через `tiered_cache.get_or_set()` или `cached_list()`.
+"""
+import datetime
+import hashlib
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+
+from django.core.cache import cache as shared_cache
+from django.core.exceptions import EmptyResultSet
+
+ENTRY_KEY = 'cache:entry:{}'
+TAG_KEY = 'cache:tag:{}'
+DEFAULT_TIMEOUT = 300
+JITTER = 0.1
+L1_MAX_ENTRIES = 1024
+L1_TIMEOUT = 5
+DATETIME_SECONDS = re.compile(
+    r'(\d{4}-\d\d-\d\d[ T]\d\d:\d\d):\d\d(\.\d+)?'
+)
+
+
+def jittered(timeout, jitter=JITTER):
+    """Случайно укорачивает время жизни на долю до `jitter`, чтобы
+    записи, созданные одновременно, не истекали разом."""
+    return max(1, round(timeout * (1 - random.uniform(0, jitter))))
+
+
+def tag_versions(tags):
+    """Текущие версии тегов в L2; отсутствующие версии создаются."""
+    keys = [TAG_KEY.format(tag) for tag in set(tags)]
+    versions = shared_cache.get_many(keys)
+    missing = {
+        key: uuid.uuid4().hex for key in keys if key not in versions
+    }
+    if missing:
+        shared_cache.set_many(missing, None)
+        versions.update(missing)
+    return versions
+
+
+def tags_valid(versions):
+    """Не менялись ли теги с момента получения `versions`."""
+    return not versions or shared_cache.get_many(versions) == versions
+
+
+def invalidate_tags(*tags):
+    """Делает неактуальными все записи, помеченные одним из тегов."""
+    keys = [TAG_KEY.format(tag) for tag in set(tags)]
+    shared_cache.delete_many(keys)
+    tiered_cache.local.discard(keys)
+
+
+def round_to_minute(param):
+    """Округляет дату до минуты, чтобы фильтр `pub_date <= now` не давал
+    новый ключ кэша на каждый запрос."""
+    # SQLite получает даты уже приведёнными к строке.
+    if isinstance(param, datetime.datetime):
+        return param.replace(second=0, microsecond=0)
+    if isinstance(param, str):
+        return DATETIME_SECONDS.sub(r'\1', param)
+    return param
+
+
+def queryset_key(queryset):
+    """Ключ выборки по её SQL; даты в параметрах округляются до минуты."""
+    sql, params = queryset.query.sql_with_params()
+    params = [round_to_minute(param) for param in params]
+    return hashlib.md5(f'{sql}{params}'.encode()).hexdigest()
+
+
+class LocalLRU:
+    """Ограниченный LRU в памяти процесса."""
+
+    def __init__(self, max_entries=L1_MAX_ENTRIES, timeout=L1_TIMEOUT):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        """Возвращает пару `(найдено, значение)`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires, value, _ = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, tag_keys=()):
+        with self._lock:
+            self._entries[key] = (
+                time.monotonic() + self.timeout, value, frozenset(tag_keys),
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, tag_keys):
+        """Удаляет записи, помеченные любым из тегов."""
+        tag_keys = set(tag_keys)
+        with self._lock:
+            for key in [
+                key for key, (_, _, tags) in self._entries.items()
+                if tags & tag_keys
+            ]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class TieredCache:
+    """Кэш «L1 в процессе → L2 общий» со счётчиками попаданий."""
+
+    def __init__(self, max_entries=L1_MAX_ENTRIES, l1_timeout=L1_TIMEOUT):
+        self.local = LocalLRU(max_entries, l1_timeout)
+        self._stats = Counter()
+        self._stats_lock = threading.Lock()
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, tags=()):
+        """Читает значение из L1, затем из L2, иначе вызывает `default()`.
+
+        `tags` — список тегов либо функция, получающая вычисленное
+        значение. Значение None не кэшируется.
+        """
+        found, value = self.local.get(key)
+        if found:
+            self._count('l1_hits')
+            return value
+        entry = shared_cache.get(ENTRY_KEY.format(key))
+        if entry is not None and tags_valid(entry['tags']):
+            self._count('l2_hits')
+            self.local.set(key, entry['value'], entry['tags'])
+            return entry['value']
+        self._count('misses')
+        # Версии заранее известных тегов берутся до чтения из базы, чтобы
+        # сброс во время чтения не оставил в кэше устаревшее значение.
+        versions = None if callable(tags) else tag_versions(tags)
+        value = default()
+        if value is None:
+            return value
+        if versions is None:
+            versions = tag_versions(tags(value))
+        shared_cache.set(
+            ENTRY_KEY.format(key),
+            {'value': value, 'tags': versions},
+            jittered(timeout),
+        )
+        self.local.set(key, value, versions)
+        return value
+
+    def stats(self):
+        """Счётчики попаданий в L1, L2 и промахов этого процесса."""
+        with self._stats_lock:
+            return {
+                name: self._stats[name]
+                for name in ('l1_hits', 'l2_hits', 'misses')
+            }
+
+    def clear(self):
+        """Очищает L1 и счётчики этого процесса."""
+        self.local.clear()
+        with self._stats_lock:
+            self._stats.clear()
+
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+
+tiered_cache = TieredCache()
+
+
+def cached_list(queryset, timeout=DEFAULT_TIMEOUT, tags=()):
+    """Читает выборку списком через `tiered_cache`."""
+    try:
+        key = queryset_key(queryset)
+    except EmptyResultSet:
+        return []
+    return tiered_cache.get_or_set(
+        f'queryset:{key}',
+        lambda: list(queryset.all()),
+        timeout,
+        tags,
+    )
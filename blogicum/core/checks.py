@@ -0,0 +1,38 @@
+"""Проверки настроек для `manage.py check --deploy`."""
+import sys
+
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+DEBUG_TOOLBAR = 'debug_toolbar'
+
+
+@register(Tags.security, deploy=True)
+def check_debug_machinery(app_configs, **kwargs):
+    """Отладочные инструменты не должны попадать в боевой профиль."""
+    errors = []
+    if settings.DEBUG:
+        errors.append(Error(
+            'DEBUG включён.',
+            hint='Используйте профиль DJANGO_ENV=prod.',
+            id='core.E001',
+        ))
+    if DEBUG_TOOLBAR in settings.INSTALLED_APPS:
+        errors.append(Error(
+            'debug_toolbar подключён в INSTALLED_APPS.',
+            id='core.E002',
+        ))
+    if any(
+        middleware.startswith(f'{DEBUG_TOOLBAR}.')
+        for middleware in settings.MIDDLEWARE
+    ):
+        errors.append(Error(
+            'DebugToolbarMiddleware подключён в MIDDLEWARE.',
+            id='core.E003',
+        ))
+    if DEBUG_TOOLBAR in sys.modules:
+        errors.append(Error(
+            'Модуль debug_toolbar импортирован при запуске проекта.',
+            id='core.E004',
+        ))
+    return errors
@@ -0,0 +1,185 @@
+"""Урезание таблицы стилей до классов, которые встречаются в шаблонах.
+
+Правило остаётся, если хотя бы один его селектор использует только
+известные классы; селекторы без классов (`body`, `:root`, `h1`) остаются
+всегда. `@media` урезаются рекурсивно, `@keyframes` остаются, только если
+их имя встречается в оставшихся правилах.
+"""
+import re
+
+CLASS_ATTRIBUTE = re.compile(r'\bclass\s*=\s*(["\'])(.*?)\1', re.DOTALL)
+TEMPLATE_TAG = re.compile(r'{%.*?%}|{{.*?}}|{#.*?#}', re.DOTALL)
+SELECTOR_CLASS = re.compile(r'\.(-?[_a-zA-Z][_a-zA-Z0-9-]*)')
+# Классы внутри :not() и атрибутов не нужны элементу, чтобы правило
+# к нему применилось.
+SELECTOR_IGNORED = re.compile(r':not\([^()]*\)|\[[^\]]*\]')
+KEYFRAMES = re.compile(r'@(?:-webkit-)?keyframes\s+([^\s{]+)')
+
+
+def classes_in_html(html):
+    """Классы из атрибутов `class` разметки или шаблона Django.
+
+    Теги шаблона заменяются пробелами, поэтому классы из веток
+    `{% if %}` тоже учитываются.
+    """
+    classes = set()
+    for _, value in CLASS_ATTRIBUTE.findall(html):
+        classes.update(TEMPLATE_TAG.sub(' ', value).split())
+    return classes
+
+
+def selector_classes(selector):
+    return set(SELECTOR_CLASS.findall(SELECTOR_IGNORED.sub('', selector)))
+
+
+def _rule_preludes(nodes):
+    for prelude, body in nodes:
+        if isinstance(body, list):
+            yield from _rule_preludes(body)
+        elif body is not None and not prelude.startswith('@'):
+            yield prelude
+
+
+def selectors(css):
+    """Селекторы всех правил таблицы стилей, включая вложенные в @media."""
+    for prelude in _rule_preludes(parse(css)):
+        yield from _split_selectors(prelude)
+
+
+def classes_in_css(css):
+    """Все классы, которые упоминаются в селекторах таблицы стилей."""
+    classes = set()
+    for selector in selectors(css):
+        classes |= selector_classes(selector)
+    return classes
+
+
+def _skip_string(css, pos):
+    quote = css[pos]
+    pos += 1
+    while pos < len(css) and css[pos] != quote:
+        pos += 2 if css[pos] == '\\' else 1
+    return pos + 1
+
+
+def _block_end(css, pos):
+    """Позиция после `}`, закрывающей блок, который начат перед `pos`."""
+    depth = 1
+    while depth:
+        char = css[pos]
+        if char in '"\'':
+            pos = _skip_string(css, pos)
+            continue
+        if css.startswith('/*', pos):
+            pos = css.index('*/', pos) + 2
+            continue
+        depth += {'{': 1, '}': -1}.get(char, 0)
+        pos += 1
+    return pos
+
+
+def parse(css):
+    """Разбирает таблицу стилей на пары `(прелюдия, тело)`.
+
+    Тело — строка объявлений, список вложенных пар для `@media` и
+    `@supports` или None для `@charset` и `@import`. Комментарии
+    возвращаются парами `(комментарий, None)`.
+    """
+    nodes = []
+    pos = 0
+    start = 0
+    while pos < len(css):
+        char = css[pos]
+        if css.startswith('/*', pos):
+            end = css.index('*/', pos) + 2
+            if not css[start:pos].strip():
+                nodes.append((css[pos:end], None))
+                start = end
+            pos = end
+        elif char in '"\'':
+            pos = _skip_string(css, pos)
+        elif char == ';':
+            nodes.append((css[start:pos + 1].strip(), None))
+            pos = start = pos + 1
+        elif char == '{':
+            prelude = css[start:pos].strip()
+            end = _block_end(css, pos + 1)
+            body = css[pos + 1:end - 1]
+            if prelude.startswith(('@media', '@supports')):
+                body = parse(body)
+            nodes.append((prelude, body))
+            pos = start = end
+        else:
+            pos += 1
+    return nodes
+
+
+def serialize(nodes):
+    parts = []
+    for prelude, body in nodes:
+        if body is None:
+            parts.append(prelude)
+        elif isinstance(body, list):
+            parts.append(f'{prelude}{{{serialize(body)}}}')
+        else:
+            parts.append(f'{prelude}{{{body}}}')
+    return ''.join(parts)
+
+
+def _split_selectors(prelude):
+    selectors, depth, start = [], 0, 0
+    for pos, char in enumerate(prelude):
+        depth += {'(': 1, ')': -1}.get(char, 0)
+        if char == ',' and not depth:
+            selectors.append(prelude[start:pos])
+            start = pos + 1
+    selectors.append(prelude[start:])
+    return selectors
+
+
+def _purge_nodes(nodes, classes):
+    kept = []
+    for prelude, body in nodes:
+        if body is None or prelude.startswith('@'):
+            if isinstance(body, list):
+                body = _purge_nodes(body, classes)
+                if not body:
+                    continue
+            kept.append((prelude, body))
+            continue
+        selectors = [
+            selector for selector in _split_selectors(prelude)
+            if selector_classes(selector) <= classes
+        ]
+        if selectors:
+            kept.append((','.join(selectors), body))
+    return kept
+
+
+def _drop_unused_keyframes(nodes):
+    names = set()
+    css = serialize([
+        node for node in nodes if not KEYFRAMES.match(node[0])
+    ])
+    for match in re.finditer(r'animation(?:-name)?\s*:([^;}]*)', css):
+        names.update(re.split(r'[\s,]+', match.group(1)))
+    return [
+        node for node in nodes
+        if not KEYFRAMES.match(node[0])
+        or KEYFRAMES.match(node[0]).group(1) in names
+    ]
+
+
+def purge(css, classes, inline=False):
+    """Оставляет в `css` только правила, применимые к классам `classes`.
+
+    С `inline=True` убираются ещё комментарии и `@charset`: результат
+    встраивается в `<style>`.
+    """
+    nodes = _purge_nodes(parse(css), set(classes))
+    if inline:
+        nodes = [
+            node for node in nodes
+            if not node[0].startswith(('/*', '@charset'))
+        ]
+    return serialize(_drop_unused_keyframes(nodes))
@@ -0,0 +1,101 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand
+from django.template import Context, Template
+from django.utils.module_loading import import_string
+
+from core.css import classes_in_html, purge
+
+SOURCE = 'css/bootstrap.min.css'
+STYLESHEET = 'css/blogicum.min.css'
+CRITICAL_TEMPLATE = 'includes/critical_css.html'
+# Шаблоны, которые видны на первом экране ленты.
+CRITICAL_TEMPLATES = (
+    'base.html',
+    'includes/header.html',
+    'blog/index.html',
+    'includes/post_card.html',
+    'includes/feed_card.html',
+    'includes/post_image.html',
+)
+# Формы, которые шаблоны выводят через `{% bootstrap_form %}`, и
+# аргументы их конструкторов.
+FORMS = {
+    'blog.forms.PostForm': {},
+    'blog.forms.CommentForm': {},
+    'blog.forms.EditUserForm': {},
+    'django.contrib.auth.forms.UserCreationForm': {},
+    'django.contrib.auth.forms.AuthenticationForm': {},
+    'django.contrib.auth.forms.PasswordChangeForm': {'user': None},
+    'django.contrib.auth.forms.PasswordResetForm': {},
+    'django.contrib.auth.forms.SetPasswordForm': {'user': None},
+}
+BOOTSTRAP_MARKUP = Template(
+    '{% load django_bootstrap5 %}'
+    '{% bootstrap_form form %}'
+    '{% bootstrap_button button_type="submit" content="button" %}'
+)
+
+
+def template_dirs():
+    return [Path(path) for path in settings.TEMPLATES[0]['DIRS']]
+
+
+def template_classes(names=None):
+    """Классы из шаблонов проекта; `names` ограничивает список файлов."""
+    classes = set()
+    for directory in template_dirs():
+        for path in directory.glob('**/*.html'):
+            name = path.relative_to(directory).as_posix()
+            if name == CRITICAL_TEMPLATE:
+                continue
+            if names is None or name in names:
+                classes |= classes_in_html(path.read_text())
+    return classes
+
+
+def form_classes():
+    """Классы разметки, которую django_bootstrap5 выводит для форм."""
+    classes = set()
+    for path, kwargs in FORMS.items():
+        form_class = import_string(path)
+        # Пустые данные дают и разметку ошибок валидации.
+        for form in (form_class(**kwargs), form_class(data={}, **kwargs)):
+            classes |= classes_in_html(
+                BOOTSTRAP_MARKUP.render(Context({'form': form})),
+            )
+    return classes
+
+
+def used_classes():
+    return template_classes() | form_classes()
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает урезанную таблицу стилей Bootstrap по классам из шаблонов '
+        'и форм, а также встроенный CSS первого экрана ленты.'
+    )
+
+    def handle(self, *args, **options):
+        source = Path(finders.find(SOURCE)).read_text()
+        directory = Path(finders.find(SOURCE)).parent.parent
+
+        stylesheet = purge(source, used_classes())
+        (directory / STYLESHEET).write_text(stylesheet)
+
+        critical = purge(
+            source,
+            template_classes(CRITICAL_TEMPLATES),
+            inline=True,
+        )
+        (template_dirs()[0] / CRITICAL_TEMPLATE).write_text(
+            '{# Создано командой `manage.py build_css`, не редактировать. #}\n'
+            f'<style>{critical}</style>\n'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{STYLESHEET}: {len(source)} → {len(stylesheet)} байт, '
+            f'{CRITICAL_TEMPLATE}: {len(critical)} байт.'
+        ))
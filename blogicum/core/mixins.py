@@ -1,15 +1,65 @@
 """Файл для хранения собственны миксинов."""
+import hashlib
+from calendar import timegm
+
+from django.conf import settings
+from django.http import Http404
 from django.shortcuts import redirect
 from django.urls import reverse, reverse_lazy
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from . import page_cache
+from .paginators import InvalidCursor, KeysetPaginator
+
+
+class CachedObjectMixin:
+    """Загружает объект представления не больше одного раза за запрос."""
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_cached_object'):
+            self._cached_object = super().get_object()
+        return self._cached_object
 
 
-class AuthorshipMixin:
+class AuthorshipMixin(CachedObjectMixin):
+    """Пускает к объекту только его автора.
+
+    Сравнивает `author_id` без загрузки пользователя; загруженный для
+    проверки объект переиспользуется представлением.
+    """
+
     def dispatch(self, request, *args, **kwargs):
-        if self.get_object().author != request.user:
+        if self.get_object().author_id != request.user.pk:
             return redirect('blog:post_detail', post_id=self.kwargs['post_id'])
         return super().dispatch(request, *args, **kwargs)
 
 
+class ParentObjectMixin:
+    """Загружает родительский объект тем же запросом, что и сам объект.
+
+    Объект ищется только среди дочерних для родителя из URL, а родитель
+    попадает в контекст под именем `parent_field`.
+    """
+
+    parent_field = 'post'
+    parent_url_kwarg = 'post_id'
+
+    def get_queryset(self):
+        return super().get_queryset().select_related(
+            self.parent_field,
+        ).filter(**{
+            f'{self.parent_field}_id': self.kwargs[self.parent_url_kwarg],
+        })
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context[self.parent_field] = getattr(self.object, self.parent_field)
+        return context
+
+
 class SuccessUrlPostDetail:
     def get_success_url(self):
         return reverse(
@@ -23,3 +73,135 @@ class SuccessUrlProfile:
         return reverse_lazy(
             'blog:profile', kwargs={'username': self.request.user},
         )
+
+
+class KeysetPaginationMixin:
+    """Курсорная пагинация для ListView.
+
+    Включается атрибутом `keyset_pagination` или настройкой
+    `KEYSET_PAGINATION`; иначе работает обычная пагинация по номеру.
+    """
+
+    keyset_pagination = None
+    keyset_paginator_class = KeysetPaginator
+    keyset_ordering = ('-pub_date', '-pk')
+    cursor_kwarg = 'cursor'
+
+    def uses_keyset_pagination(self):
+        if self.keyset_pagination is None:
+            return getattr(settings, 'KEYSET_PAGINATION', False)
+        return self.keyset_pagination
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.uses_keyset_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = self.keyset_paginator_class(
+            queryset, page_size, ordering=self.keyset_ordering,
+        )
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class AnonymousPageCacheMixin:
+    """Отдаёт анонимным посетителям готовую страницу из кэша.
+
+    Кэшируются только успешные ответы на GET без установки cookie; ключ
+    строится из пути с параметрами запроса. Время жизни задаётся
+    настройкой `PAGE_CACHE_TIMEOUT` (0 отключает кэш), а теги страницы —
+    методом `get_page_cache_tags()`, который получает контекст шаблона
+    после отрисовки.
+    """
+
+    def get_page_cache_timeout(self):
+        """Время жизни сохраняемой страницы; вызывается только при промахе."""
+        return getattr(settings, 'PAGE_CACHE_TIMEOUT', 0)
+
+    def get_page_cache_tags(self, context):
+        return []
+
+    def uses_page_cache(self):
+        return (
+            self.request.method == 'GET'
+            and not self.request.user.is_authenticated
+            and getattr(settings, 'PAGE_CACHE_TIMEOUT', 0) > 0
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.uses_page_cache():
+            return super().dispatch(request, *args, **kwargs)
+        response = page_cache.get_page(request.get_full_path())
+        if response is not None:
+            return get_conditional_response(
+                request,
+                etag=response.get('ETag'),
+                last_modified=parse_http_date_safe(
+                    response.get('Last-Modified'),
+                ),
+                response=response,
+            )
+        response = super().dispatch(request, *args, **kwargs)
+        if (response.status_code == 200
+                and hasattr(response, 'add_post_render_callback')):
+            response.add_post_render_callback(self._store_page)
+        return response
+
+    def _store_page(self, response):
+        timeout = self.get_page_cache_timeout()
+        if response.cookies or timeout <= 0:
+            return
+        page_cache.set_page(
+            self.request.get_full_path(),
+            response,
+            self.get_page_cache_tags(response.context_data or {}),
+            timeout,
+        )
+
+
+class ConditionalGetMixin:
+    """Отвечает 304 Not Modified, не выполняя представление.
+
+    Валидаторы страницы возвращает `get_validators()` — пару
+    `(etag, last_modified)`, любой элемент которой может быть None.
+    Для авторизованного пользователя ETag дополняется его pk и токеном
+    CSRF: вход заново меняет токен, и сохранённая браузером форма со
+    старым токеном не будет признана актуальной.
+    """
+
+    def get_validators(self):
+        return None, None
+
+    def user_etag(self, etag):
+        request = self.request
+        if etag is None or not request.user.is_authenticated:
+            return etag
+        # Без cookie страница выдаст новый токен, и следующий запрос
+        # придёт уже с ним, то есть с другим ETag.
+        csrf_cookie = request.META.get('CSRF_COOKIE', '')
+        return hashlib.md5(
+            f'{etag}-{request.user.pk}-{csrf_cookie}'.encode(),
+        ).hexdigest()
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        etag, last_modified = self.get_validators()
+        etag = self.user_etag(etag)
+        if etag is not None:
+            etag = quote_etag(etag)
+        if last_modified is not None:
+            last_modified = timegm(last_modified.utctimetuple())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified,
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if etag is not None:
+            response.headers.setdefault('ETag', etag)
+        if last_modified is not None:
+            response.headers.setdefault(
+                'Last-Modified', http_date(last_modified),
+            )
+        return response
@@ -0,0 +1,47 @@
+"""Кэш целых страниц для анонимных посетителей.
+
+Каждая страница хранится вместе с версиями тегов, от которых зависит её
+содержимое (например, `post:1`, `category:2`). Теги общие с
+`core.cache`: `core.cache.invalidate_tags()` делает неактуальными все
+страницы с этими тегами, остальные записи кэша не затрагиваются.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from .cache import tag_versions, tags_valid
+
+PAGE_KEY = 'page-cache:page:{}'
+STORED_HEADERS = ('ETag', 'Last-Modified')
+
+
+def _page_key(path):
+    return PAGE_KEY.format(hashlib.md5(path.encode()).hexdigest())
+
+
+def get_page(path):
+    """Возвращает сохранённый ответ для `path` или None."""
+    page = cache.get(_page_key(path))
+    if page is None:
+        return None
+    if not tags_valid(page['tags']):
+        return None
+    response = HttpResponse(
+        page['content'], content_type=page['content_type'],
+    )
+    for header, value in page['headers'].items():
+        response[header] = value
+    return response
+
+
+def set_page(path, response, tags, timeout):
+    cache.set(_page_key(path), {
+        'content': response.content,
+        'content_type': response['Content-Type'],
+        'headers': {
+            header: response[header]
+            for header in STORED_HEADERS if response.has_header(header)
+        },
+        'tags': tag_versions(tags),
+    }, timeout)
@@ -0,0 +1,288 @@
+"""Пагинаторы для лент публикаций."""
+import base64
+import binascii
+import datetime
+import json
+from collections.abc import Sequence
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Page, Paginator
+from django.db.models import Max, Q, QuerySet
+from django.utils.functional import cached_property
+
+from .cache import DEFAULT_TIMEOUT, cached_list, queryset_key
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+COUNT_VERSION_KEY = 'paginator:count-version'
+COUNT_TIMEOUT = 60
+
+
+def cached_counts_version():
+    """Метка версии закэшированных счётчиков; меняется при сбросе."""
+    return cache.get_or_set(COUNT_VERSION_KEY, 1, None)
+
+
+def invalidate_cached_counts():
+    """Сбрасывает все закэшированные счётчики пагинаторов."""
+    try:
+        cache.incr(COUNT_VERSION_KEY)
+    except ValueError:
+        cache.set(COUNT_VERSION_KEY, 1, None)
+
+
+class WindowedPage(Page):
+    """Страница, которая отдаёт сокращённый список номеров страниц."""
+
+    on_each_side = 2
+    on_ends = 1
+
+    @property
+    def elided_page_range(self):
+        return self.paginator.get_elided_page_range(
+            self.number,
+            on_each_side=self.on_each_side,
+            on_ends=self.on_ends,
+        )
+
+
+class CachedCountPaginator(Paginator):
+    """Пагинатор с закэшированным числом объектов.
+
+    Счётчик хранится в кэше по ключу, построенному из SQL запроса, и
+    сбрасывается вызовом `invalidate_cached_counts()` либо по истечении
+    `COUNT_TIMEOUT` секунд (например, когда наступает время отложенной
+    публикации). Даты в параметрах запроса округляются до минуты, чтобы
+    фильтр `pub_date <= now` не давал новый ключ на каждый запрос.
+    """
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+        key = (
+            f'paginator:count:{cached_counts_version()}'
+            f':{queryset_key(self.object_list)}'
+        )
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            cache.set(key, count, COUNT_TIMEOUT)
+        return count
+
+    def _get_page(self, *args, **kwargs):
+        return WindowedPage(*args, **kwargs)
+
+
+class EstimatedCountPaginator(CachedCountPaginator):
+    """Пагинатор для больших таблиц: без фильтров число объектов
+    оценивается по наибольшему первичному ключу.
+
+    Оценка — один проход по индексу вместо `COUNT(*)` по всей таблице;
+    она завышена на число удалённых строк, поэтому последние страницы
+    могут оказаться пустыми. Небольшие таблицы (до `exact_below`
+    строк) и выборки с фильтрами считаются точно.
+    """
+
+    exact_below = 10_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimate = queryset.model._base_manager.using(
+                queryset.db,
+            ).aggregate(estimate=Max('pk'))['estimate'] or 0
+            if estimate >= self.exact_below:
+                return estimate
+        return super().count
+
+    def page(self, number):
+        """Страница, строки которой выбираются по первичным ключам.
+
+        Далёкие страницы пропускают `OFFSET` строк: ключи пропускаются
+        по индексу, а соединения и колонки считаются только для строк
+        страницы.
+        """
+        page = super().page(number)
+        queryset = page.object_list
+        if isinstance(queryset, QuerySet) and queryset.query.low_mark:
+            pks = list(queryset.values_list('pk', flat=True))
+            page.object_list = self.object_list.filter(pk__in=pks)
+        return page
+
+
+class CachedPagePaginator(CachedCountPaginator):
+    """Пагинатор, который читает строки страниц через `core.cache`.
+
+    Теги записи возвращает `get_page_tags(rows)`; по умолчанию это
+    `page_tags`.
+    """
+
+    page_tags = ()
+    page_timeout = DEFAULT_TIMEOUT
+
+    def get_page_tags(self, rows):
+        return self.page_tags
+
+    def _get_page(self, object_list, number, paginator):
+        if isinstance(object_list, QuerySet):
+            object_list = cached_list(
+                object_list, self.page_timeout, self.get_page_tags,
+            )
+        return super()._get_page(object_list, number, paginator)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPage(Sequence):
+    """Страница курсорной пагинации."""
+
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Пагинатор по ключу сортировки вместо OFFSET.
+
+    Страница выбирается условием «строго после/до ключа» по составному
+    ключу `ordering`, поэтому стоимость запроса не зависит от глубины
+    страницы. Последнее поле ключа должно быть уникальным.
+    """
+
+    keyset = True
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-pk')):
+        directions = {field.startswith('-') for field in ordering}
+        if len(directions) != 1:
+            raise ValueError(
+                'Все поля ключа должны сортироваться в одну сторону.'
+            )
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = tuple(field.lstrip('-') for field in ordering)
+        self.descending = directions.pop()
+
+    def encode_cursor(self, direction, values=None):
+        if values is not None:
+            values = [
+                value.isoformat() if isinstance(value, datetime.datetime)
+                else value
+                for value in values
+            ]
+        payload = json.dumps({'d': direction, 'v': values})
+        return base64.urlsafe_b64encode(
+            payload.encode()
+        ).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(
+                cursor + '=' * (-len(cursor) % 4)
+            ))
+            direction, values = payload['d'], payload['v']
+            if direction not in (NEXT, PREVIOUS):
+                raise ValueError
+            if values is None:
+                return direction, None
+            if len(values) != len(self.fields):
+                raise ValueError
+            return direction, [
+                self._get_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except (binascii.Error, ValueError, KeyError, TypeError,
+                ValidationError):
+            raise InvalidCursor('Некорректный курсор страницы.')
+
+    def page(self, cursor=None):
+        direction, values = NEXT, None
+        if cursor:
+            direction, values = self.decode_cursor(cursor)
+
+        queryset = self.queryset
+        ordering = self.ordering
+        if direction == PREVIOUS:
+            ordering = self._reversed(ordering)
+        if values is not None:
+            queryset = queryset.filter(
+                self._beyond(values, backwards=direction == PREVIOUS)
+            )
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if direction == PREVIOUS:
+            rows.reverse()
+            has_next, has_previous = values is not None, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        return KeysetPage(
+            rows,
+            self,
+            next_cursor=(
+                self.encode_cursor(NEXT, self._key(rows[-1]))
+                if has_next and rows else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(PREVIOUS, self._key(rows[0]))
+                if has_previous and rows else None
+            ),
+        )
+
+    @property
+    def last_cursor(self):
+        return self.encode_cursor(PREVIOUS)
+
+    def _get_field(self, name):
+        opts = self.queryset.model._meta
+        return opts.pk if name == 'pk' else opts.get_field(name)
+
+    def _key(self, obj):
+        return [getattr(obj, name) for name in self.fields]
+
+    def _beyond(self, values, backwards=False):
+        """Условие «кортеж ключа строго дальше `values`» по сортировке."""
+        lookup = 'lt' if self.descending != backwards else 'gt'
+        condition = Q()
+        for index, name in enumerate(self.fields):
+            step = Q(**{f'{name}__{lookup}': values[index]})
+            for prev_name, prev_value in zip(self.fields, values[:index]):
+                step &= Q(**{prev_name: prev_value})
+            condition |= step
+        return condition
+
+    @staticmethod
+    def _reversed(ordering):
+        return tuple(
+            field[1:] if field.startswith('-') else f'-{field}'
+            for field in ordering
+        )
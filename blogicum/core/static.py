@@ -0,0 +1,122 @@
+"""WSGI-обёртка, которая отдаёт собранную статику без Django.
+
+Файлы берутся из `STATIC_ROOT`. Если браузер принимает сжатые ответы и
+рядом с файлом лежит копия `.br` или `.gz` (см. `core.storage`),
+отдаётся она. Имена с хешем из манифеста кэшируются браузером навсегда:
+при изменении файла меняется и имя.
+"""
+import json
+import mimetypes
+from pathlib import Path
+
+from django.conf import settings
+from django.utils.http import http_date
+
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Имена без хеша могут указывать на другой файл после выкладки.
+REVALIDATE = 'public, max-age=3600'
+CHUNK_SIZE = 64 * 1024
+
+
+def accepted_encodings(header):
+    """Кодировки из Accept-Encoding, кроме запрещённых через `q=0`."""
+    encodings = set()
+    for part in header.split(','):
+        encoding, _, params = part.partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        encodings.add(encoding.strip().lower())
+    return encodings
+
+
+class PrecompressedStatic:
+    """Отдаёт файлы из `STATIC_ROOT`, остальные запросы передаёт дальше."""
+
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        root = root or settings.STATIC_ROOT
+        self.root = Path(root).resolve() if root else None
+        prefix = prefix or settings.STATIC_URL
+        self.prefix = '/' + prefix.strip('/') + '/'
+        self.hashed_names = self._hashed_names()
+
+    def _hashed_names(self):
+        if self.root is None:
+            return frozenset()
+        try:
+            with open(self.root / 'staticfiles.json') as file:
+                return frozenset(json.load(file)['paths'].values())
+        except (OSError, ValueError, KeyError):
+            return frozenset()
+
+    def _find(self, name):
+        if self.root is None:
+            return None
+        path = (self.root / name).resolve()
+        if self.root not in path.parents or not path.is_file():
+            return None
+        return path
+
+    def __call__(self, environ, start_response):
+        path_info = environ.get('PATH_INFO', '')
+        method = environ.get('REQUEST_METHOD')
+        if method not in ('GET', 'HEAD') or not path_info.startswith(
+            self.prefix,
+        ):
+            return self.application(environ, start_response)
+        name = path_info[len(self.prefix):]
+        path = self._find(name)
+        if path is None:
+            return self.application(environ, start_response)
+
+        content_type, _ = mimetypes.guess_type(name)
+        headers = [
+            ('Content-Type', content_type or 'application/octet-stream'),
+            ('Cache-Control', (
+                IMMUTABLE if name in self.hashed_names else REVALIDATE
+            )),
+        ]
+        variants = [
+            (encoding, Path(f'{path}{suffix}'))
+            for encoding, suffix in ENCODINGS
+            if Path(f'{path}{suffix}').is_file()
+        ]
+        if variants:
+            headers.append(('Vary', 'Accept-Encoding'))
+        accepted = accepted_encodings(
+            environ.get('HTTP_ACCEPT_ENCODING', ''),
+        )
+        for encoding, variant in variants:
+            if encoding in accepted:
+                headers.append(('Content-Encoding', encoding))
+                path = variant
+                break
+
+        stat = path.stat()
+        headers += [
+            ('Content-Length', str(stat.st_size)),
+            ('Last-Modified', http_date(stat.st_mtime)),
+        ]
+        start_response('200 OK', headers)
+        if method == 'HEAD':
+            return []
+        file = open(path, 'rb')
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if file_wrapper is not None:
+            return file_wrapper(file, CHUNK_SIZE)
+        return _read_chunks(file)
+
+
+def _read_chunks(file):
+    with file:
+        while True:
+            chunk = file.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
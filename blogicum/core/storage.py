@@ -0,0 +1,54 @@
+"""Хранилище статики с хешами в именах и сжатыми копиями файлов.
+
+После `collectstatic` рядом с текстовыми файлами (CSS, JS, SVG и т.п.)
+лежат копии `.gz` и `.br`. Отдаёт их
+`core.static.PrecompressedStatic`.
+"""
+import gzip
+import os
+
+import brotli
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.svg', '.ico', '.txt', '.json', '.xml', '.map',
+    '.html',
+)
+# Сжатая копия не нужна, если она экономит меньше 5%.
+MIN_RATIO = 0.95
+
+
+def _compressors():
+    yield '.gz', lambda data: gzip.compress(data, 9, mtime=0)
+    yield '.br', lambda data: brotli.compress(data, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        names = {}
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options,
+        ):
+            yield name, hashed_name, processed
+            if not isinstance(processed, Exception):
+                names[name] = hashed_name
+        if dry_run:
+            return
+        for name, hashed_name in names.items():
+            for compressed in {name, hashed_name} - {None}:
+                self.compress(compressed)
+
+    def compress(self, name):
+        """Сохраняет сжатые копии файла `name` рядом с ним."""
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+            return
+        path = self.path(name)
+        with open(path, 'rb') as file:
+            data = file.read()
+        for suffix, compress in _compressors():
+            compressed = compress(data)
+            if len(compressed) >= len(data) * MIN_RATIO:
+                continue
+            with open(f'{path}{suffix}.tmp', 'wb') as file:
+                file.write(compressed)
+            os.replace(f'{path}{suffix}.tmp', f'{path}{suffix}')
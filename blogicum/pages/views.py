@@ -1,4 +1,69 @@
+import datetime
+import os
+
+from django.contrib.staticfiles.storage import (ManifestFilesMixin,
+                                                staticfiles_storage)
 from django.shortcuts import render
+from django.template.loader import get_template
+from django.template.loader_tags import ExtendsNode, IncludeNode
+from django.views.generic import TemplateView
+
+from core.mixins import ConditionalGetMixin
+
+
+def template_files(names):
+    """Файлы шаблонов `names` и всех шаблонов, которые они расширяют или
+    подключают по имени-строке."""
+    files = {}
+    names = list(names)
+    while names:
+        name = names.pop()
+        if name in files:
+            continue
+        template = get_template(name).template
+        files[name] = template.origin.name
+        for node in template.nodelist.get_nodes_by_type(
+            (ExtendsNode, IncludeNode),
+        ):
+            expression = (
+                node.parent_name if isinstance(node, ExtendsNode)
+                else node.template
+            )
+            if isinstance(expression.var, str):
+                names.append(expression.var)
+    return files.values()
+
+
+def static_manifest_mtime():
+    """Время изменения манифеста статики: `collectstatic` меняет в нём
+    хешированные адреса файлов. 0, если манифеста нет."""
+    if not isinstance(staticfiles_storage, ManifestFilesMixin):
+        return 0
+    try:
+        return os.path.getmtime(
+            staticfiles_storage.path(staticfiles_storage.manifest_name),
+        )
+    except OSError:
+        return 0
+
+
+class StaticPageView(ConditionalGetMixin, TemplateView):
+    """Статическая страница с валидаторами по времени изменения её
+    шаблонов (со всеми подключёнными) и манифеста статики."""
+
+    def get_validators(self):
+        mtime = max(
+            static_manifest_mtime(),
+            *map(os.path.getmtime, template_files(self.get_template_names())),
+        )
+        user = self.request.user
+        last_modified = datetime.datetime.fromtimestamp(
+            mtime, tz=datetime.timezone.utc,
+        )
+        return (
+            str(mtime),
+            None if user.is_authenticated else last_modified,
+        )
 
 
 def csrf_failure(request, reason='Незащищенная форма'):
@@ -0,0 +1,23 @@
+// Подсказки для строки поиска: заголовки постов и категорий
+// с `blog:search_suggest` попадают в <datalist> поля ввода.
+document.querySelectorAll('input[data-suggest-url]').forEach((input) => {
+  const list = document.getElementById(input.getAttribute('list'));
+  let timer = null;
+  let controller = null;
+
+  input.addEventListener('input', () => {
+    clearTimeout(timer);
+    timer = setTimeout(async () => {
+      if (controller) controller.abort();
+      controller = new AbortController();
+      const url = `${input.dataset.suggestUrl}?q=${encodeURIComponent(input.value)}`;
+      try {
+        const response = await fetch(url, {signal: controller.signal});
+        const {results} = await response.json();
+        list.replaceChildren(...results.map(({title}) => new Option(title)));
+      } catch (error) {
+        if (error.name !== 'AbortError') throw error;
+      }
+    }, 150);
+  });
+});
@@ -10,6 +10,8 @@ from typing import (Any, Iterable, List, NamedTuple, Optional, Tuple, Type,
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
 from django.db.models import Field, Model
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -32,6 +34,37 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def run_on_commit(request, monkeypatch):
+    """Тест идёт в транзакции, которая не фиксируется, поэтому обработчики
+    `on_commit` выполняются сразу, как при автофиксации. Тесты с меткой
+    `defer_on_commit` проверяют сам отложенный вызов."""
+    if 'defer_on_commit' in request.keywords:
+        return
+    monkeypatch.setattr(
+        transaction, 'on_commit', lambda func, using=None: func(),
+    )
+
+
+@pytest.fixture(autouse=True)
+def no_typeahead_thread(monkeypatch):
+    """Индекс подсказок сверяется с журналом только явным `sync()`."""
+    from blog.typeahead import TitleIndex
+
+    monkeypatch.setattr(TitleIndex, 'background', False)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from blog.typeahead import index
+    from core.cache import tiered_cache
+
+    cache.clear()
+    tiered_cache.clear()
+    index.reset()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -354,6 +387,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
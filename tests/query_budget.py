@@ -0,0 +1,22 @@
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def format_queries(context):
+    return '\n'.join(
+        f'{n}. {query["sql"]}'
+        for n, query in enumerate(context.captured_queries, start=1)
+    )
+
+
+@contextmanager
+def assert_max_queries(budget, label=''):
+    """Проверяет, что блок кода выполняет не больше `budget` SQL-запросов."""
+    with CaptureQueriesContext(connection) as context:
+        yield context
+    assert len(context) <= budget, (
+        f'{label} выполняет {len(context)} SQL-запросов при допустимых'
+        f' {budget}:\n{format_queries(context)}'
+    )
@@ -0,0 +1,78 @@
+import pytest
+from bs4 import BeautifulSoup
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.constants import POSTS_IN_PAGE
+from blog.models import Post
+from core.paginators import CachedCountPaginator, WindowedPage
+
+PAGES = 40
+
+
+def feed_count():
+    paginator = CachedCountPaginator(
+        Post.active_objects.order_by('-pub_date'), POSTS_IN_PAGE,
+    )
+    with CaptureQueriesContext(connection) as context:
+        count = paginator.count
+    return count, len(context)
+
+
+@pytest.mark.django_db
+def test_count_follows_publication(mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True,
+    )
+    assert feed_count() == (1, 1)
+    assert feed_count() == (1, 0)
+
+    post.is_published = False
+    post.save()
+    assert feed_count() == (0, 1)
+    assert feed_count() == (0, 0)
+
+    post.is_published = True
+    post.save()
+    assert feed_count() == (1, 1)
+
+    post.delete()
+    assert feed_count() == (0, 1)
+
+
+@pytest.mark.django_db
+def test_count_follows_hidden_category(mixer, user, published_category):
+    mixer.cycle(2).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True,
+    )
+    assert feed_count()[0] == 2
+    published_category.is_published = False
+    published_category.save()
+    assert feed_count()[0] == 0
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('page', (1, PAGES // 2, PAGES))
+def test_page_bar_is_windowed(client, user, published_category, page):
+    now = timezone.now()
+    Post.objects.bulk_create(
+        Post(
+            title=f'Пост {n}', text='Текст', author=user,
+            category=published_category, pub_date=now,
+        )
+        for n in range(PAGES * POSTS_IN_PAGE)
+    )
+    soup = BeautifulSoup(
+        client.get('/', {'page': page}).content, 'html.parser',
+    )
+    numbers = [
+        item.get_text(strip=True)
+        for item in soup.select('.pagination .page-item')
+        if item.get_text(strip=True).isdigit()
+    ]
+    window = WindowedPage.on_each_side * 2 + 1 + WindowedPage.on_ends * 2
+    assert len(numbers) <= window
+    assert {'1', str(PAGES), str(page)} <= set(numbers)
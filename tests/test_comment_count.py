@@ -0,0 +1,92 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import FeedEntry, Post
+
+
+@pytest.fixture
+def post(mixer, user, published_category, published_location):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location, is_published=True,
+    )
+
+
+def assert_count(post, expected):
+    assert Post.objects.get(pk=post.pk).comment_count == expected
+    assert FeedEntry.objects.get(pk=post.pk).comment_count == expected
+
+
+@pytest.mark.django_db
+def test_view_create_and_delete(user_client, post):
+    response = user_client.post(
+        f'/posts/{post.id}/comment/', {'text': 'Комментарий'},
+    )
+    assert response.status_code == 302
+    assert_count(post, 1)
+    comment = post.comments.get()
+    response = user_client.post(
+        f'/posts/{post.id}/delete_comment/{comment.id}/',
+    )
+    assert response.status_code == 302
+    assert_count(post, 0)
+
+
+@pytest.mark.django_db
+def test_edit_does_not_change_count(user_client, mixer, user, post):
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    user_client.post(
+        f'/posts/{post.id}/edit_comment/{comment.id}/', {'text': 'Правка'},
+    )
+    assert_count(post, 1)
+
+
+@pytest.mark.django_db
+def test_admin_delete(admin_client, mixer, user, post):
+    comments = mixer.cycle(3).blend('blog.Comment', post=post, author=user)
+    assert_count(post, 3)
+    response = admin_client.post(
+        f'/admin/blog/comment/{comments[0].id}/delete/', {'post': 'yes'},
+    )
+    assert response.status_code == 302
+    assert_count(post, 2)
+    response = admin_client.post('/admin/blog/comment/', {
+        'action': 'delete_selected',
+        '_selected_action': [comment.id for comment in comments[1:]],
+        'post': 'yes',
+    })
+    assert response.status_code == 302
+    assert_count(post, 0)
+
+
+@pytest.mark.django_db
+def test_cascade_delete_of_comment_author(mixer, user, another_user, post):
+    mixer.blend('blog.Comment', post=post, author=user)
+    mixer.cycle(2).blend('blog.Comment', post=post, author=another_user)
+    assert_count(post, 3)
+    another_user.delete()
+    assert_count(post, 1)
+
+
+@pytest.mark.django_db
+def test_reconcile_repairs_drift(mixer, user, post,
+                                 published_category, published_location):
+    mixer.cycle(2).blend('blog.Comment', post=post, author=user)
+    other = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location,
+    )
+    Post.objects.filter(pk=post.pk).update(comment_count=7)
+    FeedEntry.objects.filter(pk__in=(post.pk, other.pk)).update(
+        comment_count=5,
+    )
+    output = StringIO()
+    call_command('reconcile_comment_counts', chunk_size=1, stdout=output)
+    assert Post.objects.get(pk=post.pk).comment_count == 2
+    assert Post.objects.get(pk=other.pk).comment_count == 0
+    assert dict(FeedEntry.objects.values_list('pk', 'comment_count')) == {
+        post.pk: 2, other.pk: 0,
+    }
+    assert 'Проверено публикаций: 2, исправлено: 2.' in output.getvalue()
@@ -0,0 +1,174 @@
+import os
+from http import HTTPStatus
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.cache import cache
+from django.db import connection
+from django.template.loader import get_template
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from core.cache import tiered_cache
+
+
+@pytest.fixture
+def post(mixer, user, published_category, published_location):
+    return mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        location=published_location,
+    )
+
+
+def assert_not_modified(client, url, **headers):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, **headers)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        f'Убедитесь, что неизменившаяся страница `{url}` отдаёт 304.'
+    )
+    assert not response.templates, (
+        f'Убедитесь, что для ответа 304 страница `{url}` не отрисовывается.'
+    )
+    assert len(context.captured_queries) <= 1
+
+
+@pytest.mark.django_db
+def test_post_not_modified(client, post):
+    url = f'/posts/{post.id}/'
+    response = client.get(url)
+    assert_not_modified(client, url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert_not_modified(
+        client, url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+    )
+
+
+@pytest.mark.django_db
+def test_post_modified_by_comment(mixer, client, user, post):
+    url = f'/posts/{post.id}/'
+    etag = client.get(url)['ETag']
+    mixer.blend('blog.Comment', post=post, author=user)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_post_etag_depends_on_user(client, user_client, post):
+    url = f'/posts/{post.id}/'
+    assert client.get(url)['ETag'] != user_client.get(url)['ETag']
+    assert not user_client.get(url).has_header('Last-Modified')
+
+
+@pytest.mark.django_db
+def test_feeds_not_modified(client, post, published_category):
+    for url in ('/', f'/category/{published_category.slug}/'):
+        etag = client.get(url)['ETag']
+        assert_not_modified(client, url, HTTP_IF_NONE_MATCH=etag)
+
+
+def cold_queries(client, url):
+    cache.clear()
+    tiered_cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('feed_read_model', (False, True))
+def test_feed_validators_do_not_grow(settings, mixer, client, post,
+                                     feed_read_model):
+    settings.FEED_READ_MODEL = feed_read_model
+    urls = ('/', f'/category/{post.category.slug}/')
+    few = [cold_queries(client, url) for url in urls]
+    mixer.cycle(9).blend(
+        'blog.Post', author=post.author, category=post.category,
+        location=post.location,
+    )
+    assert [cold_queries(client, url) for url in urls] == few
+
+
+@pytest.mark.django_db
+def test_feed_modified_by_new_post(mixer, client, user, post):
+    url = f'/category/{post.category.slug}/'
+    etag = client.get(url)['ETag']
+    mixer.blend(
+        'blog.Post', author=user, category=post.category,
+        location=post.location,
+    )
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_static_pages_not_modified(client):
+    for url in ('/pages/about/', '/pages/rules/'):
+        response = client.get(url)
+        assert_not_modified(client, url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert_not_modified(
+            client, url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+
+
+@pytest.mark.django_db
+def test_page_cache_hit_not_modified(settings, client, post):
+    settings.PAGE_CACHE_TIMEOUT = 600
+    url = f'/posts/{post.id}/'
+    etag = client.get(url)['ETag']
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert not context.captured_queries
+
+
+@pytest.mark.django_db
+def test_static_page_modified_by_included_template(client):
+    url = '/pages/about/'
+    etag = client.get(url)['ETag']
+    path = get_template('includes/critical_css.html').origin.name
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 60))
+    try:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    finally:
+        os.utime(path, (stat.st_atime, stat.st_mtime))
+    assert response.status_code == HTTPStatus.OK
+
+
+def log_in(client, user):
+    token = BeautifulSoup(
+        client.get('/auth/login/').content, 'html.parser',
+    ).select_one('[name=csrfmiddlewaretoken]')['value']
+    response = client.post('/auth/login/', {
+        'username': user.username,
+        'password': 'password',
+        'csrfmiddlewaretoken': token,
+    })
+    assert response.status_code == HTTPStatus.FOUND
+
+
+@pytest.mark.django_db
+def test_relogin_revalidates_comment_form(user, post):
+    user.set_password('password')
+    user.save()
+    client = Client(enforce_csrf_checks=True)
+    url = f'/posts/{post.id}/'
+    log_in(client, user)
+    etag = client.get(url)['ETag']
+    client.get('/auth/logout/')
+    log_in(client, user)
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    token = BeautifulSoup(response.content, 'html.parser').select_one(
+        '[name=csrfmiddlewaretoken]',
+    )['value']
+    response = client.post(f'/posts/{post.id}/comment/', {
+        'text': 'Комментарий', 'csrfmiddlewaretoken': token,
+    })
+    assert response.status_code == HTTPStatus.FOUND
+    etag = client.get(url)['ETag']
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
@@ -0,0 +1,82 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.digests import send_digests
+from blog.models import CategorySubscription, DigestRun
+
+
+@pytest.fixture
+def categories(mixer):
+    return mixer.cycle(3).blend('blog.Category', is_published=True)
+
+
+@pytest.fixture
+def fresh_posts(mixer, user, categories):
+    now = timezone.now()
+    return [
+        mixer.blend(
+            'blog.Post', author=user, category=category, is_published=True,
+            pub_date=now - timedelta(hours=1),
+        )
+        for category in categories[:2]
+    ]
+
+
+def subscribe(mixer, n, categories):
+    readers = mixer.cycle(n).blend(
+        'auth.User', email=(f'reader{i}@blogicum.not' for i in range(n)),
+    )
+    for reader in readers:
+        for category in categories:
+            CategorySubscription.objects.create(
+                user=reader, category=category,
+            )
+    return readers
+
+
+@pytest.mark.django_db
+def test_one_digest_per_subscriber(mixer, categories, fresh_posts):
+    readers = subscribe(mixer, 2, categories)
+    assert send_digests() == 2
+    assert sorted(message.to[0] for message in mail.outbox) == sorted(
+        reader.email for reader in readers
+    )
+    body = mail.outbox[0].body
+    for post in fresh_posts:
+        assert post.title in body
+        assert post.get_absolute_url() in body
+    assert DigestRun.objects.get().digests == 2
+
+    mail.outbox.clear()
+    assert send_digests() == 0
+    assert not mail.outbox
+
+
+@pytest.mark.django_db
+def test_queries_do_not_grow_with_subscribers(mixer, categories,
+                                              fresh_posts):
+    subscribe(mixer, 2, categories)
+    send_digests(dry_run=True)
+    with CaptureQueriesContext(connection) as few:
+        send_digests(dry_run=True)
+    subscribe(mixer, 20, categories)
+    with CaptureQueriesContext(connection) as many:
+        assert send_digests(dry_run=True, chunk_size=5) == 22
+    assert len(many) == len(few)
+
+
+@pytest.mark.django_db
+def test_dry_run(mixer, categories, fresh_posts):
+    subscribe(mixer, 3, categories[:1])
+    output = StringIO()
+    call_command('send_digests', dry_run=True, stdout=output)
+    assert 'Собрано дайджестов: 3' in output.getvalue()
+    assert not mail.outbox
+    assert not DigestRun.objects.exists()
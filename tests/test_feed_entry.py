@@ -0,0 +1,58 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import FeedEntry
+
+
+@pytest.fixture
+def make_posts(mixer, user, published_category):
+    def make(n):
+        return mixer.cycle(n).blend(
+            'blog.Post', author=user, category=published_category,
+            is_published=True,
+        )
+    return make
+
+
+def save_queries(category):
+    with CaptureQueriesContext(connection) as queries:
+        category.save()
+    return [query['sql'] for query in queries.captured_queries]
+
+
+@pytest.mark.django_db
+def test_category_rename_updates_entries_in_place(make_posts,
+                                                  published_category):
+    make_posts(2)
+    published_category.title = 'Первое название'
+    few = save_queries(published_category)
+    make_posts(8)
+    published_category.title = 'Второе название'
+    published_category.slug = 'second'
+    assert len(save_queries(published_category)) == len(few)
+    assert not any(
+        sql.startswith(('DELETE FROM "blog_feedentry"',
+                        'INSERT INTO "blog_feedentry"'))
+        for sql in few
+    )
+    assert set(FeedEntry.objects.values_list(
+        'category_slug', 'category_title',
+    )) == {('second', 'Второе название')}
+
+
+@pytest.mark.django_db
+def test_category_visibility_adds_and_removes_entries(make_posts,
+                                                      published_category):
+    posts = make_posts(3)
+    published_category.is_published = False
+    published_category.save()
+    assert not FeedEntry.objects.exists()
+    published_category.title = 'Скрытая'
+    published_category.save()
+    assert not FeedEntry.objects.exists()
+    published_category.is_published = True
+    published_category.save()
+    assert sorted(FeedEntry.objects.values_list('pk', flat=True)) == sorted(
+        post.pk for post in posts
+    )
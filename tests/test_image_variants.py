@@ -0,0 +1,262 @@
+from datetime import timedelta
+from io import BytesIO, StringIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from PIL import Image
+
+from blog import images
+from blog.management.commands.process_images import Command
+from blog.models import (IMAGE_FAILED, IMAGE_PENDING, IMAGE_PROCESSING,
+                         IMAGE_READY, ImageClaim, Post)
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def jpeg(width, height, exif=None):
+    data = BytesIO()
+    Image.new('RGB', (width, height), 'teal').save(
+        data, 'JPEG', exif=exif or Image.Exif(),
+    )
+    return SimpleUploadedFile('photo.jpg', data.getvalue(), 'image/jpeg')
+
+
+def process_images():
+    call_command('process_images', once=True, workers=2, stdout=StringIO())
+
+
+@pytest.fixture
+def post(mixer, user, published_category):
+    post = mixer.blend('blog.Post', author=user, category=published_category)
+    post.image = jpeg(2000, 1000)
+    post.save()
+    process_images()
+    post.refresh_from_db()
+    return post
+
+
+@pytest.mark.django_db
+def test_upload_waits_for_worker(client, mixer, user, published_category):
+    post = mixer.blend('blog.Post', author=user, category=published_category)
+    post.image = jpeg(2000, 1000)
+    post.save()
+    post.refresh_from_db()
+    assert post.image_status == IMAGE_PENDING
+    assert post.image_variants == {}
+    soup = BeautifulSoup(
+        client.get(f'/posts/{post.id}/').content, 'html.parser',
+    )
+    assert not soup.select('picture')
+    assert soup.select_one('img[src$="image-pending.svg"]')
+
+    process_images()
+    post.refresh_from_db()
+    assert post.image_status == IMAGE_READY
+    soup = BeautifulSoup(
+        client.get(f'/posts/{post.id}/').content, 'html.parser',
+    )
+    assert soup.select_one('picture img')['width'] == '1280'
+
+
+@pytest.mark.django_db
+def test_worker_fixes_orientation_and_strips_exif(mixer, user,
+                                                  published_category,
+                                                  media_root):
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: повернуть на 90° по часовой.
+    exif[0x010F] = 'Camera'  # Make
+    post = mixer.blend('blog.Post', author=user, category=published_category)
+    post.image = jpeg(200, 100, exif)
+    post.save()
+    process_images()
+    post.refresh_from_db()
+    with Image.open(media_root / post.image.name) as image:
+        assert image.size == (100, 200)
+        assert not image.getexif()
+    assert (post.image_variants['width'],
+            post.image_variants['height']) == (100, 200)
+
+
+@pytest.mark.django_db
+def test_form_does_not_decode_upload(user_client, published_category,
+                                     published_location, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('Pillow не должен открывать файл в запросе.')
+
+    monkeypatch.setattr(Image, 'open', fail)
+    response = user_client.post('/posts/create/', {
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'category': published_category.pk,
+        'location': published_location.pk,
+        'pub_date': '2020-01-01 10:00',
+        'image': jpeg(2000, 1000),
+    })
+    assert response.status_code == 302
+    assert Post.objects.get().image_status == IMAGE_PENDING
+
+
+@pytest.mark.django_db
+def test_variants_created_by_worker(post, media_root):
+    variants = Post.objects.get(pk=post.pk).image_variants
+    assert variants['source'] == post.image.name
+    assert [
+        (size['name'], size['width'], size['height'])
+        for size in variants['sizes']
+    ] == [('card', 640, 320), ('detail', 1280, 640)]
+    for name in (variants['webp'], *(
+        size[key] for size in variants['sizes'] for key in ('src', 'webp')
+    )):
+        assert (media_root / name).exists()
+
+
+@pytest.mark.django_db
+def test_templates_use_variants(client, post):
+    for url, width in ((f'/posts/{post.id}/', '1280'), ('/', '640')):
+        soup = BeautifulSoup(client.get(url).content, 'html.parser')
+        images = soup.select('picture img')
+        assert len(images) == 1
+        assert images[0]['width'] == width
+        assert '640w' in images[0]['srcset']
+        assert '.webp 640w' in soup.select_one(
+            'picture source[type="image/webp"]',
+        )['srcset']
+
+
+@pytest.mark.django_db
+def test_broken_image_is_not_shown(client, mixer, user, published_category):
+    post = mixer.blend('blog.Post', author=user, category=published_category)
+    post.image = SimpleUploadedFile('broken.jpg', b'not an image')
+    post.save()
+    process_images()
+    post.refresh_from_db()
+    assert post.image_status == IMAGE_FAILED
+    post.save()
+    assert Post.objects.get(pk=post.pk).image_status == IMAGE_FAILED
+    soup = BeautifulSoup(
+        client.get(f'/posts/{post.id}/').content, 'html.parser',
+    )
+    assert not soup.select('picture')
+    assert not soup.select('img[src$="image-pending.svg"]')
+
+
+@pytest.mark.django_db
+def test_backfill_command(post):
+    expected = Post.objects.get(pk=post.pk).image_variants
+    Post.objects.update(image_variants={})
+    call_command('generate_image_variants', stdout=StringIO())
+    assert Post.objects.get(pk=post.pk).image_status == IMAGE_PENDING
+    process_images()
+    post.refresh_from_db()
+    assert post.image_variants['source'] == post.image.name
+    assert len(post.image_variants['sizes']) == len(expected['sizes'])
+
+
+@pytest.mark.django_db
+def test_reprocessing_replaces_files(post, media_root):
+    old_files = {post.image.name, *images.variant_files(post.image_variants)}
+    call_command('generate_image_variants', force=True, stdout=StringIO())
+    process_images()
+    post.refresh_from_db()
+    new_files = {post.image.name, *images.variant_files(post.image_variants)}
+    assert not old_files & new_files
+    assert all((media_root / name).exists() for name in new_files)
+    assert not any((media_root / name).exists() for name in old_files)
+
+
+@pytest.mark.django_db
+def test_removing_image_deletes_variants(post, media_root):
+    files = images.variant_files(post.image_variants)
+    post.image = None
+    post.save()
+    assert not any((media_root / name).exists() for name in files)
+
+
+@pytest.mark.django_db
+def test_outdated_result_is_discarded(post, media_root):
+    post.image = jpeg(800, 400)
+    post.save()
+    command = Command()
+    (name,) = command.claim(1).values()
+    variants = images.process_upload(name)
+    # Пока обработчик работал, картинку заменили ещё раз.
+    post.image = jpeg(600, 300)
+    post.save()
+    command.finish(post.pk, name, variants)
+    post.refresh_from_db()
+    assert post.image_status == IMAGE_PENDING
+    assert (media_root / name).exists()
+    for path in (variants['source'], *images.variant_files(variants)):
+        assert not (media_root / path).exists()
+
+
+@pytest.mark.django_db
+def test_backfill_skips_images_in_processing(post):
+    Post.objects.update(image_variants={}, image_status=IMAGE_PROCESSING)
+    call_command('generate_image_variants', stdout=StringIO())
+    assert Post.objects.get(pk=post.pk).image_status == IMAGE_PROCESSING
+
+
+@pytest.mark.django_db
+def test_claim_lease_is_separate_from_updated_at(post):
+    post.image = jpeg(800, 400)
+    post.save()
+    updated_at = Post.objects.get(pk=post.pk).updated_at
+    command = Command()
+    assert list(command.claim(1)) == [post.pk]
+    assert Post.objects.get(pk=post.pk).updated_at == updated_at
+    assert ImageClaim.objects.filter(pk=post.pk).exists()
+
+    # Правка категории или автора не продлевает срок обработки.
+    ImageClaim.objects.update(claimed_at=timezone.now() - timedelta(hours=1))
+    Post.objects.update(updated_at=timezone.now())
+    command.requeue_stale(60)
+    assert Post.objects.get(pk=post.pk).image_status == IMAGE_PENDING
+    assert not ImageClaim.objects.exists()
+
+
+@pytest.mark.django_db
+def test_other_format_saved_under_new_name(mixer, user, published_category,
+                                           media_root):
+    data = BytesIO()
+    Image.new('RGB', (800, 400), 'teal').save(data, 'BMP')
+    post = mixer.blend('blog.Post', author=user, category=published_category)
+    post.image = SimpleUploadedFile('picture.bmp', data.getvalue())
+    post.save()
+    old_name = post.image.name
+    process_images()
+    post.refresh_from_db()
+    assert post.image_status == IMAGE_READY
+    assert post.image.name.endswith('.jpg')
+    assert post.image_variants['source'] == post.image.name
+    assert not (media_root / old_name).exists()
+    with Image.open(media_root / post.image.name) as image:
+        assert image.format == 'JPEG'
+
+
+@pytest.mark.django_db
+def test_animated_image_kept_as_is(client, mixer, user, published_category,
+                                   media_root):
+    data = BytesIO()
+    frames = [Image.new('P', (800, 400), color) for color in (1, 2, 3)]
+    frames[0].save(data, 'GIF', save_all=True, append_images=frames[1:])
+    post = mixer.blend('blog.Post', author=user, category=published_category)
+    post.image = SimpleUploadedFile('animation.gif', data.getvalue())
+    post.save()
+    process_images()
+    post.refresh_from_db()
+    assert post.image_status == IMAGE_READY
+    assert (media_root / post.image.name).read_bytes() == data.getvalue()
+    assert post.image_variants['sizes'] == []
+    soup = BeautifulSoup(
+        client.get(f'/posts/{post.id}/').content, 'html.parser',
+    )
+    assert soup.select_one('picture img')['src'].endswith('.gif')
+    assert not soup.select('picture source')
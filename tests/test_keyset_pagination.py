@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.models import Post
+from core.paginators import InvalidCursor, KeysetPaginator
+
+PER_PAGE = 2
+
+
+@pytest.fixture
+def posts(mixer, user, published_category, published_location):
+    """Пять постов; у двух одинаковая дата, их порядок задаёт pk."""
+    now = timezone.now()
+    dates = [now - timedelta(days=days) for days in (1, 2, 2, 3, 4)]
+    return [
+        mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            location=published_location, pub_date=date,
+        )
+        for date in dates
+    ]
+
+
+@pytest.fixture
+def expected(posts):
+    return list(
+        Post.objects.order_by('-pub_date', '-pk').values_list('pk', flat=True)
+    )
+
+
+def make_paginator():
+    return KeysetPaginator(Post.objects.all(), PER_PAGE)
+
+
+def pks(page):
+    return [post.pk for post in page]
+
+
+@pytest.mark.django_db
+def test_next_pages_cover_feed(expected):
+    paginator = make_paginator()
+    page = paginator.page()
+    assert not page.has_previous()
+    seen = pks(page)
+    while page.has_next():
+        page = paginator.page(page.next_cursor)
+        assert page.has_previous()
+        seen += pks(page)
+    assert seen == expected
+    assert len(page) == (len(expected) % PER_PAGE or PER_PAGE)
+
+
+@pytest.mark.django_db
+def test_previous_page_returns_same_rows(expected):
+    paginator = make_paginator()
+    first = paginator.page()
+    second = paginator.page(first.next_cursor)
+    assert pks(second) == expected[PER_PAGE:2 * PER_PAGE]
+    back = paginator.page(second.previous_cursor)
+    assert pks(back) == pks(first)
+    assert back.has_next() and not back.has_previous()
+
+
+@pytest.mark.django_db
+def test_last_cursor(expected):
+    paginator = make_paginator()
+    last = paginator.page(paginator.last_cursor)
+    assert pks(last) == expected[-PER_PAGE:]
+    assert not last.has_next()
+    assert last.has_previous()
+    before = paginator.page(last.previous_cursor)
+    assert pks(before) == expected[-2 * PER_PAGE:-PER_PAGE]
+
+
+@pytest.mark.django_db
+def test_single_page_has_no_cursors(posts):
+    paginator = KeysetPaginator(Post.objects.all(), len(posts))
+    for cursor in (None, paginator.last_cursor):
+        page = paginator.page(cursor)
+        assert len(page) == len(posts)
+        assert not page.has_other_pages()
+
+
+@pytest.mark.django_db
+def test_empty_queryset():
+    page = make_paginator().page()
+    assert not len(page)
+    assert not page.has_other_pages()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('cursor', (
+    'мусор',
+    'e30',  # {}
+    'eyJkIjoieCIsInYiOm51bGx9',  # {"d": "x", "v": null}
+))
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        make_paginator().page(cursor)
+
+
+def test_mixed_ordering_rejected():
+    with pytest.raises(ValueError):
+        KeysetPaginator(Post.objects.all(), PER_PAGE, ('-pub_date', 'pk'))
+
+
+@pytest.mark.django_db
+def test_feed_invalid_cursor_is_404(settings, client, posts):
+    settings.KEYSET_PAGINATION = True
+    assert client.get('/', {'cursor': 'мусор'}).status_code == 404
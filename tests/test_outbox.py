@@ -0,0 +1,109 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog import outbox
+from blog.models import (OUTBOX_FAILED, OUTBOX_PENDING, OUTBOX_SENT,
+                         EmailOutbox)
+
+
+def send_outbox(**options):
+    call_command('send_outbox', once=True, stdout=StringIO(), **options)
+
+
+@pytest.fixture
+def post_data(published_category, published_location):
+    return {
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'category': published_category.pk,
+        'location': published_location.pk,
+        'pub_date': '2020-01-01 10:00',
+    }
+
+
+@pytest.mark.django_db
+def test_post_creation_only_enqueues_email(user_client, post_data):
+    response = user_client.post('/posts/create/', post_data)
+    assert response.status_code == 302
+    assert not mail.outbox
+    message = EmailOutbox.objects.get()
+    assert message.status == OUTBOX_PENDING
+    assert 'Заголовок' in message.subject
+
+    send_outbox()
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].to == outbox.POST_NOTIFICATION_TO
+    message.refresh_from_db()
+    assert message.status == OUTBOX_SENT
+    assert message.sent_at is not None
+
+
+@pytest.mark.django_db
+def test_invalid_form_and_edit_do_not_enqueue(user_client, post_data,
+                                              post_with_published_location):
+    post = post_with_published_location
+    user_client.post('/posts/create/', {**post_data, 'title': ''})
+    user_client.post(f'/posts/{post.id}/edit/', post_data)
+    assert not EmailOutbox.objects.exists()
+
+
+@pytest.mark.django_db
+def test_failed_send_is_retried_with_backoff(monkeypatch):
+    message = outbox.enqueue('Тема', 'Текст', 'a@blogicum.not', ['b@x.not'])
+
+    def fail(self, *args, **kwargs):
+        raise ConnectionError('smtp is down')
+
+    monkeypatch.setattr(EmailMessage, 'send', fail)
+    send_outbox(max_attempts=2)
+    message.refresh_from_db()
+    assert message.status == OUTBOX_PENDING
+    assert message.attempts == 1
+    assert 'smtp is down' in message.last_error
+    delay = message.next_attempt_at - timezone.now()
+    assert timedelta(seconds=50) < delay <= timedelta(
+        seconds=outbox.backoff(1),
+    )
+
+    EmailOutbox.objects.update(next_attempt_at=timezone.now())
+    send_outbox(max_attempts=2)
+    message.refresh_from_db()
+    assert message.status == OUTBOX_FAILED
+    assert outbox.backoff(2) == 2 * outbox.backoff(1)
+
+
+@pytest.mark.django_db
+def test_batches_share_one_connection(monkeypatch):
+    for n in range(5):
+        outbox.enqueue(f'Тема {n}', 'Текст', 'a@blogicum.not', ['b@x.not'])
+    opened = []
+    original_open = mail.get_connection().__class__.open
+
+    def open_connection(self):
+        opened.append(self)
+        return original_open(self)
+
+    monkeypatch.setattr(
+        mail.get_connection().__class__, 'open', open_connection,
+    )
+    send_outbox(batch_size=3)
+    assert len(mail.outbox) == 5
+    assert len(opened) == 2
+
+
+@pytest.mark.django_db
+def test_metrics():
+    outbox.enqueue('Тема', 'Текст', 'a@blogicum.not', ['b@x.not'])
+    outbox.enqueue('Тема', 'Текст', 'a@blogicum.not', ['b@x.not'])
+    assert outbox.metrics()['queue_depth'] == 2
+    send_outbox()
+    metrics = outbox.metrics()
+    assert metrics['queue_depth'] == 0
+    assert metrics['sent'] == 2
+    assert metrics['latency_p95'] >= metrics['latency_p50'] >= 0
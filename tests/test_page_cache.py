@@ -0,0 +1,99 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.fixture(autouse=True)
+def enable_page_cache(settings):
+    settings.PAGE_CACHE_TIMEOUT = 600
+
+
+@pytest.fixture
+def posts(mixer, user, published_category, published_location):
+    return mixer.cycle(2).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        location=published_location,
+    )
+
+
+def get_without_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    return response, not context.captured_queries
+
+
+@pytest.fixture
+def page_urls(posts, user, published_category):
+    return (
+        '/',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+        f'/posts/{posts[0].id}/',
+    )
+
+
+@pytest.mark.django_db
+def test_anonymous_pages_served_from_cache(client, page_urls):
+    for url in page_urls:
+        first = client.get(url)
+        second, cached = get_without_queries(client, url)
+        assert cached, (
+            f'Убедитесь, что повторный запрос анонима к `{url}` отдаётся'
+            ' из кэша без обращений к базе данных.'
+        )
+        assert second.content == first.content
+
+
+@pytest.mark.django_db
+def test_authenticated_pages_not_cached(user_client, page_urls):
+    for url in page_urls:
+        user_client.get(url)
+        _, cached = get_without_queries(user_client, url)
+        assert not cached, (
+            f'Убедитесь, что страница `{url}` не кэшируется для'
+            ' авторизованного пользователя.'
+        )
+
+
+@pytest.mark.django_db
+def test_comment_purges_only_its_post(mixer, client, user, posts):
+    commented, other = (f'/posts/{post.id}/' for post in posts)
+    client.get(commented)
+    client.get(other)
+    comment = mixer.blend(
+        'blog.Comment', post=posts[0], author=user, text='Новый комментарий',
+    )
+    response, cached = get_without_queries(client, commented)
+    assert not cached and comment.text in response.content.decode()
+    _, cached = get_without_queries(client, other)
+    assert cached, (
+        'Убедитесь, что комментарий сбрасывает кэш только страниц своего'
+        ' поста.'
+    )
+
+
+@pytest.mark.django_db
+def test_post_edit_purges_feeds(client, posts, published_category):
+    url = f'/category/{published_category.slug}/'
+    client.get(url)
+    posts[1].title = 'Новый заголовок'
+    posts[1].save()
+    response, cached = get_without_queries(client, url)
+    assert not cached and 'Новый заголовок' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_private_user_fields_not_cached(client, user_client, user,
+                                        page_urls):
+    user.email = 'private@blogicum.not'
+    user.set_password('секрет')
+    user.save()
+    for url in page_urls:
+        client.get(url)
+        user_client.get(url)
+    entries = b''.join(cache._cache.values())
+    assert user.password.encode() not in entries
+    assert user.email.encode() not in entries
@@ -0,0 +1,122 @@
+import pytest
+from django.contrib.admin.models import LogEntry
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.models import FeedEntry, Post
+from core.paginators import EstimatedCountPaginator
+
+CHANGELIST_URL = reverse('admin:blog_post_changelist')
+
+
+@pytest.fixture
+def make_posts(mixer, user, published_category, published_location):
+    def make(n, **kwargs):
+        kwargs.setdefault('category', published_category)
+        return mixer.cycle(n).blend(
+            'blog.Post', author=user, location=published_location,
+            is_published=True, **kwargs,
+        )
+    return make
+
+
+def changelist_queries(client):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(CHANGELIST_URL)
+    assert response.status_code == 200
+    return len(queries)
+
+
+@pytest.mark.django_db
+def test_changelist_queries_do_not_grow(admin_client, make_posts, mixer):
+    mixer.cycle(5).blend('blog.Category')
+    make_posts(1)
+    changelist_queries(admin_client)
+    few = changelist_queries(admin_client)
+    make_posts(30)
+    changelist_queries(admin_client)
+    assert changelist_queries(admin_client) == few
+
+
+@pytest.mark.django_db
+def test_changelist_shows_text_start(admin_client, make_posts):
+    make_posts(1, text='Начало ' + 'очень длинного текста ' * 100)
+    content = admin_client.get(CHANGELIST_URL).content.decode()
+    assert 'Начало очень длинного' in content
+    assert 'текста ' * 10 not in content
+
+
+@pytest.mark.django_db
+def test_edited_rows_saved_with_one_update(admin_client, make_posts, mixer):
+    posts = make_posts(3)
+    target = mixer.blend('blog.Category', is_published=True)
+    data = {
+        'form-TOTAL_FORMS': len(posts),
+        'form-INITIAL_FORMS': len(posts),
+        '_save': 'Сохранить',
+    }
+    for n, post in enumerate(posts):
+        data[f'form-{n}-id'] = post.pk
+        data[f'form-{n}-category'] = target.pk
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.post(CHANGELIST_URL, data)
+    assert response.status_code == 302
+    updates = [
+        query['sql'] for query in queries.captured_queries
+        if query['sql'].startswith('UPDATE "blog_post" SET "category_id"')
+    ]
+    assert len(updates) == 1
+    for table in ('blog_feedentry', 'blog_typeaheadevent'):
+        inserts = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith(f'INSERT INTO "{table}"')
+        ]
+        assert len(inserts) == 1
+    assert set(
+        Post.objects.values_list('category_id', flat=True)
+    ) == {target.pk}
+    assert set(
+        FeedEntry.objects.values_list('category_id', flat=True)
+    ) == {target.pk}
+    assert LogEntry.objects.count() == len(posts)
+
+
+def save_queries(client, posts, category):
+    data = {
+        'form-TOTAL_FORMS': len(posts),
+        'form-INITIAL_FORMS': len(posts),
+        '_save': 'Сохранить',
+    }
+    for n, post in enumerate(posts):
+        data[f'form-{n}-id'] = post.pk
+        data[f'form-{n}-category'] = category.pk
+    with CaptureQueriesContext(connection) as queries:
+        assert client.post(CHANGELIST_URL, data).status_code == 302
+    return len(queries)
+
+
+@pytest.mark.django_db
+def test_saving_rows_queries_do_not_grow(admin_client, make_posts, mixer):
+    few, many = make_posts(2), make_posts(8)
+    first, second = mixer.cycle(2).blend('blog.Category', is_published=True)
+    save_queries(admin_client, few, first)
+    assert save_queries(admin_client, many, second) == save_queries(
+        admin_client, few, second,
+    )
+    assert LogEntry.objects.count() == 2 * len(few) + len(many)
+
+
+@pytest.mark.django_db
+def test_estimated_count(make_posts, monkeypatch):
+    posts = make_posts(5)
+    posts[-2].delete()
+    monkeypatch.setattr(EstimatedCountPaginator, 'exact_below', 3)
+    paginator = EstimatedCountPaginator(Post.objects.order_by('pk'), 2)
+    assert paginator.count == posts[-1].pk
+    filtered = Post.objects.filter(pk__lt=posts[-1].pk).order_by('pk')
+    assert EstimatedCountPaginator(filtered, 2).count == 3
+
+    monkeypatch.setattr(EstimatedCountPaginator, 'exact_below', 10)
+    paginator = EstimatedCountPaginator(Post.objects.order_by('pk'), 2)
+    assert paginator.count == 4
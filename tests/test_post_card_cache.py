@@ -0,0 +1,46 @@
+import pytest
+
+
+@pytest.fixture
+def post(mixer, user, published_category, published_location):
+    return mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        location=published_location,
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('attr, value', (
+    ('title', 'Новый заголовок'),
+    ('text', 'Новый текст'),
+))
+def test_card_follows_post_changes(client, post, attr, value):
+    client.get('/')
+    setattr(post, attr, value)
+    post.save()
+    assert value in client.get('/').content.decode(), (
+        'Убедитесь, что карточка поста обновляется после изменения поста.'
+    )
+
+
+@pytest.mark.django_db
+def test_card_follows_related_changes(client, user, post, published_location):
+    client.get('/')
+    published_location.name = 'Новое место'
+    published_location.save()
+    user.username = 'new_username'
+    user.save()
+    content = client.get('/').content.decode()
+    assert 'Новое место' in content and '@new_username' in content, (
+        'Убедитесь, что карточка поста обновляется после изменения места'
+        ' и автора.'
+    )
+
+
+@pytest.mark.django_db
+def test_card_follows_comment_count(mixer, client, user, post):
+    client.get('/')
+    mixer.blend('blog.Comment', post=post, author=user)
+    assert 'Комментарии (1)' in client.get('/').content.decode()
@@ -0,0 +1,80 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import ProfileStats
+
+
+def stats_of(user):
+    row = ProfileStats.objects.get(pk=user.pk)
+    return row.post_count, row.comment_count, row.last_post_date
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    now = timezone.now().replace(microsecond=0)
+    return mixer.cycle(3).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        pub_date=(now - timedelta(days=n) for n in range(3)),
+    )
+
+
+@pytest.mark.django_db
+def test_stats_follow_posts_and_comments(mixer, user, another_user, posts):
+    comments = mixer.cycle(2).blend(
+        'blog.Comment', post=posts[1], author=another_user,
+    )
+    assert stats_of(user) == (3, 0, posts[0].pub_date)
+    assert stats_of(another_user)[:2] == (0, 2)
+
+    posts[0].delete()
+    comments[0].delete()
+    assert stats_of(user) == (2, 0, posts[1].pub_date)
+    assert stats_of(another_user)[:2] == (0, 1)
+
+    posts[1].delete()
+    assert stats_of(another_user)[:2] == (0, 0), (
+        'Убедитесь, что каскадное удаление комментариев учитывается в'
+        ' статистике их автора.'
+    )
+
+
+@pytest.mark.django_db
+def test_stats_follow_author_change(user, another_user, posts):
+    # Так автора меняет форма поста в админке.
+    posts[0].author = another_user
+    posts[0].save()
+    assert stats_of(user) == (2, 0, posts[1].pub_date)
+    assert stats_of(another_user) == (1, 0, posts[0].pub_date)
+
+    posts[1].author = another_user
+    posts[1].save()
+    assert stats_of(user) == (1, 0, posts[2].pub_date)
+    assert stats_of(another_user) == (2, 0, posts[0].pub_date)
+
+
+@pytest.mark.django_db
+def test_rebuild_command(mixer, user, another_user, posts):
+    mixer.blend('blog.Comment', post=posts[0], author=another_user)
+    expected = {
+        row.pk: (row.post_count, row.comment_count, row.last_post_date)
+        for row in ProfileStats.objects.all()
+    }
+    ProfileStats.objects.update(post_count=0, comment_count=0)
+    call_command('rebuild_profile_stats', chunk_size=1, stdout=StringIO())
+    assert {
+        row.pk: (row.post_count, row.comment_count, row.last_post_date)
+        for row in ProfileStats.objects.all()
+    } == expected
+
+
+@pytest.mark.django_db
+def test_profile_shows_stats(client, user, posts):
+    response = client.get(f'/profile/{user.username}/')
+    assert response.context['stats'].post_count == len(posts)
+    assert f'Публикаций: {len(posts)}' in response.content.decode()
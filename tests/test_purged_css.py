@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+from core.css import purge, selector_classes, selectors
+from core.management.commands.build_css import (CRITICAL_TEMPLATE,
+                                                CRITICAL_TEMPLATES, SOURCE,
+                                                STYLESHEET, template_classes,
+                                                used_classes)
+
+REBUILD = 'Пересоберите стили командой `python manage.py build_css`.'
+
+
+def read_static(name):
+    return Path(finders.find(name)).read_text()
+
+
+@pytest.mark.django_db
+def test_purged_stylesheet_keeps_used_classes():
+    used = used_classes()
+    purged = set(selectors(read_static(STYLESHEET)))
+    missing = {
+        selector for selector in selectors(read_static(SOURCE))
+        if selector_classes(selector) <= used and selector not in purged
+    }
+    assert not missing, (
+        f'В `{STYLESHEET}` нет правил для классов из шаблонов: '
+        f'{sorted(set().union(*map(selector_classes, missing)))}. {REBUILD}'
+    )
+
+
+def test_critical_css_is_up_to_date():
+    expected = purge(
+        read_static(SOURCE), template_classes(CRITICAL_TEMPLATES),
+        inline=True,
+    )
+    critical = Path(
+        settings.TEMPLATES[0]['DIRS'][0], CRITICAL_TEMPLATE,
+    ).read_text()
+    assert f'<style>{expected}</style>' in critical, REBUILD
+
+
+def test_purge():
+    css = (
+        '@charset "UTF-8";/*! license */'
+        ':root{--x:1}body{margin:0}.card,.unused{padding:1px}'
+        '.btn:not(.active)>.icon{color:red}.spinner{animation:spin 1s}'
+        '@keyframes spin{to{transform:rotate(1turn)}}'
+        '@media (min-width:576px){.card .title{margin:0}.unused{margin:0}}'
+    )
+    assert purge(css, {'card', 'btn', 'icon'}) == (
+        '@charset "UTF-8";/*! license */'
+        ':root{--x:1}body{margin:0}.card{padding:1px}'
+        '.btn:not(.active)>.icon{color:red}'
+    )
+    assert purge(css, {'card', 'title', 'spinner'}, inline=True) == (
+        ':root{--x:1}body{margin:0}.card{padding:1px}'
+        '.spinner{animation:spin 1s}'
+        '@keyframes spin{to{transform:rotate(1turn)}}'
+        '@media (min-width:576px){.card .title{margin:0}}'
+    )
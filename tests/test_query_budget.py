@@ -0,0 +1,137 @@
+from http import HTTPStatus
+from urllib.parse import urlencode
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from blog import typeahead
+from blog.urls import urlpatterns as blog_urlpatterns
+from pages.urls import urlpatterns as pages_urlpatterns
+from core.cache import tiered_cache
+from query_budget import assert_max_queries
+
+DATA_SIZES = (1, 10, 100)
+
+# Допустимое число запросов для каждого именованного URL при холодных
+# кэшах. Для страниц с авторизацией сюда входят чтение сессии и
+# пользователя, для лент и поста — запросы валидаторов условного GET,
+# для страниц с категориями и местами — загрузка справочников
+# (`blog.registry`) после сброса кэша. Подсказки отвечают из индекса в
+# памяти и к базе не обращаются.
+QUERY_BUDGETS = {
+    'blog:index': 6,
+    'blog:category_posts': 6,
+    'blog:profile': 6,
+    'blog:post_detail': 5,
+    'blog:craete_post': 4,
+    'blog:add_comment': 3,
+    'blog:edit_profile': 2,
+    'blog:edit_post': 5,
+    'blog:delete_post': 5,
+    'blog:edit_comment': 3,
+    'blog:delete_comment': 3,
+    'blog:search': 4,
+    'blog:search_suggest': 0,
+    'pages:about': 0,
+    'pages:rules': 0,
+}
+AUTHOR_ONLY = {
+    'blog:craete_post',
+    'blog:add_comment',
+    'blog:edit_profile',
+    'blog:edit_post',
+    'blog:delete_post',
+    'blog:edit_comment',
+    'blog:delete_comment',
+}
+
+
+def get_url_names():
+    return [
+        f'{app}:{pattern.name}'
+        for app, patterns in (
+            ('blog', blog_urlpatterns),
+            ('pages', pages_urlpatterns),
+        )
+        for pattern in patterns
+        if pattern.name
+    ]
+
+
+def test_every_url_has_budget():
+    missing = set(get_url_names()) - set(QUERY_BUDGETS)
+    assert not missing, (
+        'Задайте лимит SQL-запросов в `QUERY_BUDGETS` для URL: '
+        + ', '.join(sorted(missing))
+    )
+
+
+def build_url(name, user, post, comment, category):
+    kwargs = {
+        'blog:category_posts': {'category_slug': category.slug},
+        'blog:profile': {'username': user.username},
+        'blog:post_detail': {'post_id': post.id},
+        'blog:add_comment': {'post_id': post.id},
+        'blog:edit_post': {'post_id': post.id},
+        'blog:delete_post': {'post_id': post.id},
+        'blog:edit_comment': {'post_id': post.id, 'comment_id': comment.id},
+        'blog:delete_comment': {'post_id': post.id, 'comment_id': comment.id},
+    }.get(name, {})
+    url = reverse(name, kwargs=kwargs)
+    if name in ('blog:search', 'blog:search_suggest'):
+        url += '?' + urlencode({'q': post.title.split()[0]})
+    return url
+
+
+@pytest.mark.django_db
+def test_query_budget(
+    mixer, user, user_client, unlogged_client,
+    published_category, published_location,
+):
+    post = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        location=published_location,
+    )
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    # Индекс подсказок строит фоновый поток; здесь он построен заранее.
+    typeahead.index.build()
+    n_posts = n_comments = 1
+    counts = {}
+    for size in DATA_SIZES:
+        mixer.cycle(size - n_posts).blend(
+            'blog.Post',
+            author=user,
+            category=published_category,
+            location=published_location,
+        )
+        mixer.cycle(size - n_comments).blend(
+            'blog.Comment', post=post, author=user,
+        )
+        n_posts = n_comments = size
+
+        for name in get_url_names():
+            client = user_client if name in AUTHOR_ONLY else unlogged_client
+            url = build_url(name, user, post, comment, published_category)
+            # Замеряется запрос с холодными кэшами: так его видит первый
+            # посетитель после сброса или истечения записей.
+            cache.clear()
+            tiered_cache.clear()
+            with assert_max_queries(
+                QUERY_BUDGETS[name], f'Страница `{url}` ({size} записей)'
+            ) as context:
+                response = client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Убедитесь, что страница `{url}` загружается без ошибок.'
+            )
+            counts.setdefault(name, []).append(len(context))
+
+    for name, sizes in counts.items():
+        assert len(set(sizes)) == 1, (
+            f'Число SQL-запросов страницы `{name}` растёт с объёмом данных:'
+            + ', '.join(
+                f' {size} записей — {n}' for size, n in zip(DATA_SIZES, sizes)
+            )
+        )
@@ -0,0 +1,101 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+CHECKED_TABLES = ('blog_post', 'blog_comment', 'blog_feedentry')
+N_POSTS = 15
+
+
+def get_query_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def assert_plans_use_indexes(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Убедитесь, что страница `{url}` загружается без ошибок.'
+    )
+    checked = 0
+    for query in context.captured_queries:
+        sql = query['sql']
+        if not sql.startswith('SELECT') or not any(
+            f'"{table}"' in sql for table in CHECKED_TABLES
+        ):
+            continue
+        checked += 1
+        plan = get_query_plan(sql)
+        for step in plan:
+            for table in CHECKED_TABLES:
+                assert not re.match(rf'SCAN {table}\b(?! USING)', step), (
+                    f'Запрос страницы `{url}` читает таблицу `{table}`'
+                    f' полным просмотром.\nSQL: {sql}\nПлан: {plan}'
+                )
+            assert 'USE TEMP B-TREE' not in step, (
+                f'Запрос страницы `{url}` сортирует строки во временном'
+                f' B-дереве вместо индекса.\nSQL: {sql}\nПлан: {plan}'
+            )
+    assert checked, f'Страница `{url}` не обращается к публикациям.'
+
+
+@pytest.fixture
+def feed(mixer, user, published_category, published_location):
+    now = timezone.now()
+    posts = mixer.cycle(N_POSTS).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        location=published_location,
+        pub_date=(now - timedelta(hours=n) for n in range(N_POSTS)),
+    )
+    mixer.cycle(3).blend('blog.Comment', post=posts[0], author=user)
+    return posts
+
+
+@pytest.fixture
+def feed_urls(feed, user, published_category):
+    return (
+        '/',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+    )
+
+
+@pytest.mark.django_db
+def test_feed_query_plans(client, feed_urls):
+    for url in feed_urls:
+        assert_plans_use_indexes(client, url)
+        assert_plans_use_indexes(client, f'{url}?page=2')
+
+
+@pytest.mark.django_db
+@override_settings(KEYSET_PAGINATION=True)
+def test_keyset_feed_query_plans(client, feed_urls):
+    for url in feed_urls:
+        response = client.get(url)
+        cursor = response.context['page_obj'].next_cursor
+        assert cursor, f'Убедитесь, что лента `{url}` разбита на страницы.'
+        assert_plans_use_indexes(client, f'{url}?cursor={cursor}')
+
+
+@pytest.mark.django_db
+@override_settings(FEED_READ_MODEL=True)
+def test_feed_read_model_query_plans(client, feed_urls):
+    for url in feed_urls[:2]:
+        assert_plans_use_indexes(client, url)
+        assert_plans_use_indexes(client, f'{url}?page=2')
+        with override_settings(KEYSET_PAGINATION=True):
+            cursor = client.get(url).context['page_obj'].next_cursor
+            assert_plans_use_indexes(client, f'{url}?cursor={cursor}')
+
+
+@pytest.mark.django_db
+def test_post_detail_query_plans(client, feed):
+    assert_plans_use_indexes(client, f'/posts/{feed[0].id}/')
@@ -0,0 +1,120 @@
+import pytest
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.forms import CategoryChoiceField, LocationChoiceField
+from blog.models import Category, Location
+from blog.registry import VERSION_KEY, Registry, registry
+
+
+def queries(func, *args):
+    with CaptureQueriesContext(connection) as context:
+        result = func(*args)
+    return result, len(context)
+
+
+@pytest.mark.django_db
+def test_registry_loads_once(published_category, published_location):
+    other = Registry()
+    categories, first = queries(other.categories)
+    assert categories == [published_category]
+    assert first == 2
+    assert queries(other.category, published_category.pk) == (
+        published_category, 0,
+    )
+    assert queries(other.category_by_slug, published_category.slug) == (
+        published_category, 0,
+    )
+    assert queries(other.location, published_location.pk) == (
+        published_location, 0,
+    )
+    assert queries(other.category, published_category.pk + 1) == (None, 0)
+
+
+@pytest.mark.django_db
+def test_version_read_once_per_request(
+    client, published_category, published_location, mixer, user, monkeypatch,
+):
+    mixer.cycle(3).blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location, is_published=True,
+    )
+    reads = []
+    get_or_set = cache.get_or_set
+    monkeypatch.setattr(
+        cache, 'get_or_set',
+        lambda key, *args: reads.append(key) or get_or_set(key, *args),
+    )
+    for _ in range(2):
+        reads.clear()
+        response = client.get(f'/category/{published_category.slug}/')
+        assert response.status_code == 200
+        assert reads.count(VERSION_KEY) == 1
+
+
+@pytest.mark.django_db
+def test_other_process_reloads_after_change(published_category):
+    # Второй экземпляр справочника — копия в другом процессе: он видит
+    # только метку версии в общем кэше.
+    other = Registry()
+    other.categories()
+    version = cache.get(VERSION_KEY)
+    published_category.title = 'Новое название'
+    published_category.save()
+    assert cache.get(VERSION_KEY) != version
+    category, count = queries(other.category, published_category.pk)
+    assert category.title == 'Новое название'
+    assert count == 2
+    assert queries(other.categories)[1] == 0
+
+
+@pytest.mark.defer_on_commit
+@pytest.mark.django_db
+def test_version_changes_after_commit(
+    published_category, django_capture_on_commit_callbacks,
+):
+    registry.categories()
+    version = cache.get(VERSION_KEY)
+    with django_capture_on_commit_callbacks(execute=True):
+        published_category.title = 'Новое название'
+        published_category.save()
+        assert cache.get(VERSION_KEY) == version
+    assert cache.get(VERSION_KEY) != version
+
+
+@pytest.mark.django_db
+def test_other_process_reloads_after_delete(mixer):
+    location = mixer.blend('blog.Location')
+    other = Registry()
+    assert other.location(location.pk) == location
+    location.delete()
+    assert other.location(location.pk) is None
+    assert other.locations() == []
+
+
+@pytest.mark.django_db
+def test_cache_reset_reloads(published_category):
+    other = Registry()
+    other.categories()
+    Category.objects.filter(pk=published_category.pk).update(slug='other')
+    cache.clear()
+    assert other.category_by_slug('other') is not None
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('field_class, model, fixture', (
+    (CategoryChoiceField, Category, 'published_category'),
+    (LocationChoiceField, Location, 'published_location'),
+))
+def test_choice_fields_use_registry(request, field_class, model, fixture):
+    obj = request.getfixturevalue(fixture)
+    registry.invalidate()
+    field = field_class(model.objects.all())
+    choices = list(field.choices)
+    assert [value for value, _ in choices] == ['', obj.pk]
+    assert queries(field.clean, str(obj.pk)) == (obj, 0)
+    with pytest.raises(ValidationError) as error:
+        field.clean(str(obj.pk + 1))
+    assert error.value.code == 'invalid_choice'
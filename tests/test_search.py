@@ -0,0 +1,122 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from blog import search
+from blog.models import Post
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make(title, text='-', **kwargs):
+        kwargs.setdefault('category', published_category)
+        kwargs.setdefault('is_published', True)
+        kwargs.setdefault('pub_date', timezone.now() - timedelta(hours=1))
+        return mixer.blend(
+            'blog.Post', author=user, title=title, text=text, **kwargs,
+        )
+    return make
+
+
+def found(text):
+    return list(search.search(text).values_list('pk', flat=True))
+
+
+@pytest.mark.django_db
+def test_index_follows_post_changes(make_post):
+    post = make_post('Пельмени по-сибирски')
+    assert found('пельмени') == [post.pk]
+
+    post.title = 'Вареники'
+    post.save()
+    assert found('пельмени') == []
+    assert found('вареники') == [post.pk]
+
+    Post.objects.filter(pk=post.pk).update(text='С картошкой')
+    assert found('картошкой') == [post.pk]
+
+    post.delete()
+    assert found('вареники') == []
+
+
+@pytest.mark.django_db
+def test_hidden_posts_are_not_found(make_post, mixer):
+    visible = make_post('Рецепт борща')
+    make_post('Рецепт борща', is_published=False)
+    make_post('Рецепт борща', pub_date=timezone.now() + timedelta(days=1))
+    make_post(
+        'Рецепт борща',
+        category=mixer.blend('blog.Category', is_published=False),
+    )
+    assert found('борща') == [visible.pk]
+
+
+@pytest.mark.django_db
+def test_title_match_ranks_first(make_post):
+    for title in ('Море', 'Горы', 'Поле'):
+        make_post(title, 'Про отпуск')
+    in_text = make_post('Заметки', 'Немного про грибы и лес')
+    in_title = make_post('Грибы', 'Про лес')
+    assert found('грибы') == [in_title.pk, in_text.pk]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('text', ['"', 'NOT', 'a OR', '*', '(лес', '   '])
+def test_fts_syntax_in_query_is_ignored(make_post, text):
+    make_post('Лес')
+    assert isinstance(found(text), list)
+
+
+@pytest.mark.django_db
+def test_all_matches_are_ranked(make_post):
+    relevant = make_post('Кот', 'Кот и кот')
+    for n in range(20):
+        make_post(f'Заметка {n}', 'Утром во двор пришёл кот')
+    assert found('кот')[0] == relevant.pk
+    assert len(found('кот')) == 21
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', [{}, {'q': ''}, {'q': '"'}, {'q': '?!'}])
+def test_search_page_without_words(client, make_post, params):
+    make_post('Лес')
+    response = client.get(reverse('blog:search'), params)
+    assert response.status_code == 200
+    assert len(response.context['page_obj']) == 0
+
+
+@pytest.mark.django_db
+def test_search_page_keeps_query_in_cursor(client, make_post):
+    for n in range(15):
+        make_post(f'Весна {n}')
+    make_post('Осень')
+    response = client.get(reverse('blog:search'), {'q': 'весна'})
+    page = response.context['page_obj']
+    assert len(page) == 10
+    assert 'Осень' not in response.content.decode()
+    assert 'q=%D0%B2%D0%B5%D1%81%D0%BD%D0%B0' in response.content.decode()
+
+    response = client.get(
+        reverse('blog:search'), {'q': 'весна', 'cursor': page.next_cursor},
+    )
+    assert len(response.context['page_obj']) == 5
+
+
+@pytest.mark.django_db
+def test_rebuild_command(make_post):
+    post = make_post('Зима')
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {search.TABLE}({search.TABLE}) "
+            "VALUES ('delete-all')"
+        )
+    assert found('зима') == []
+    output = StringIO()
+    call_command('rebuild_search_index', stdout=output)
+    assert found('зима') == [post.pk]
+    assert 'Проиндексировано публикаций: 1' in output.getvalue()
@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from django.conf import settings
+
+from core.checks import check_debug_machinery
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'blogicum'
+
+
+def run_manage(*args, profile):
+    env = {**os.environ, 'DJANGO_ENV': profile}
+    env.pop('DJANGO_SETTINGS_MODULE', None)
+    return subprocess.run(
+        [sys.executable, 'manage.py', *args],
+        cwd=PROJECT_DIR, env=env, capture_output=True, text=True,
+    )
+
+
+def test_debug_machinery_detected():
+    # Тесты запускаются с профилем dev.
+    assert 'debug_toolbar' in settings.INSTALLED_APPS
+    ids = {error.id for error in check_debug_machinery(None)}
+    assert {'core.E002', 'core.E003', 'core.E004'} <= ids
+
+
+def test_prod_profile_passes_deploy_check():
+    result = run_manage('check', '--deploy', profile='prod')
+    assert result.returncode == 0, result.stderr
+    assert 'core.E' not in result.stderr
+
+
+def test_dev_profile_fails_deploy_check():
+    result = run_manage('check', '--deploy', profile='dev')
+    assert result.returncode != 0
+    assert 'core.E002' in result.stderr
+
+
+def test_prod_profile_uses_cached_loader():
+    result = run_manage(
+        'shell', '-c',
+        'import sys; from django.conf import settings; '
+        'print(settings.TEMPLATES[0]["OPTIONS"]["loaders"][0][0]); '
+        'print("debug_toolbar" in sys.modules)',
+        profile='prod',
+    )
+    assert result.stdout.split() == [
+        'django.template.loaders.cached.Loader', 'False',
+    ], result.stderr
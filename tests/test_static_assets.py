@@ -0,0 +1,89 @@
+import gzip
+import json
+from io import StringIO
+
+import brotli
+import pytest
+from django.core.management import call_command
+
+from core.static import PrecompressedStatic, accepted_encodings
+
+
+@pytest.fixture
+def static_root(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    settings.STATICFILES_STORAGE = (
+        'core.storage.CompressedManifestStaticFilesStorage'
+    )
+    call_command('collectstatic', interactive=False, stdout=StringIO())
+    return tmp_path
+
+
+def not_found(environ, start_response):
+    start_response('404 Not Found', [])
+    return [b'django']
+
+
+def get(application, path, accept_encoding=''):
+    result = {}
+
+    def start_response(status, headers):
+        result['status'] = status
+        result['headers'] = dict(headers)
+
+    body = b''.join(application({
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'HTTP_ACCEPT_ENCODING': accept_encoding,
+    }, start_response))
+    return result['status'], result['headers'], body
+
+
+def test_collectstatic_writes_hashed_compressed_files(static_root):
+    paths = json.loads((static_root / 'staticfiles.json').read_text())['paths']
+    hashed = paths['css/bootstrap.min.css']
+    assert hashed != 'css/bootstrap.min.css'
+    original = (static_root / hashed).read_bytes()
+    assert gzip.decompress(
+        (static_root / f'{hashed}.gz').read_bytes(),
+    ) == original
+    assert brotli.decompress(
+        (static_root / f'{hashed}.br').read_bytes(),
+    ) == original
+    assert not (static_root / f'{paths["img/logo.png"]}.gz').exists()
+
+
+def test_wsgi_serves_precompressed_immutable_files(static_root):
+    application = PrecompressedStatic(not_found)
+    paths = json.loads((static_root / 'staticfiles.json').read_text())['paths']
+    url = f'/project_static/{paths["css/bootstrap.min.css"]}'
+
+    status, headers, body = get(application, url, 'gzip, deflate')
+    assert status == '200 OK'
+    assert headers['Content-Encoding'] == 'gzip'
+    assert headers['Content-Type'] == 'text/css'
+    assert headers['Vary'] == 'Accept-Encoding'
+    assert 'immutable' in headers['Cache-Control']
+    assert gzip.decompress(body).startswith(b'@charset')
+
+    status, headers, body = get(application, url, 'gzip;q=0')
+    assert 'Content-Encoding' not in headers
+    assert int(headers['Content-Length']) == len(body)
+
+    _, headers, _ = get(application, '/project_static/css/bootstrap.min.css')
+    assert 'immutable' not in headers['Cache-Control']
+
+    for path in ('/project_static/missing.css', '/project_static/../x',
+                 '/posts/1/'):
+        assert get(application, path)[0] == '404 Not Found'
+
+
+def test_accepted_encodings():
+    assert accepted_encodings('br;q=0.5, gzip;q=0, *') == {'br', '*'}
+
+
+@pytest.mark.django_db
+def test_bootstrap_is_served_locally(client):
+    content = client.get('/').content.decode()
+    assert 'cdn.jsdelivr.net' not in content
+    assert '/project_static/css/blogicum.min.css' in content
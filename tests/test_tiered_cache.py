@@ -0,0 +1,83 @@
+import pytest
+
+from core.cache import (DEFAULT_TIMEOUT, JITTER, LocalLRU, TieredCache,
+                        cached_list, invalidate_tags, jittered, tiered_cache)
+
+
+class Loader:
+    def __init__(self, value='значение'):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+def test_levels_and_stats():
+    cache = TieredCache()
+    load = Loader()
+    for _ in range(3):
+        assert cache.get_or_set('key', load) == load.value
+    cache.local.clear()
+    assert cache.get_or_set('key', load) == load.value
+    assert load.calls == 1
+    assert cache.stats() == {'l1_hits': 2, 'l2_hits': 1, 'misses': 1}
+
+
+def test_invalidate_tags():
+    load, other = Loader(), Loader()
+    tiered_cache.get_or_set('tagged', load, tags=['post:1'])
+    tiered_cache.get_or_set('other', other, tags=['post:2'])
+    invalidate_tags('post:1')
+    tiered_cache.get_or_set('tagged', load, tags=['post:1'])
+    tiered_cache.get_or_set('other', other, tags=['post:2'])
+    assert (load.calls, other.calls) == (2, 1), (
+        'Убедитесь, что сброс тега удаляет только помеченные им записи.'
+    )
+
+
+def test_tags_from_value():
+    load = Loader(value=[7])
+    tiered_cache.get_or_set(
+        'rows', load, tags=lambda rows: [f'post:{pk}' for pk in rows],
+    )
+    invalidate_tags('post:7')
+    tiered_cache.get_or_set('rows', load, tags=lambda rows: [])
+    assert load.calls == 2
+
+
+def test_none_not_cached():
+    load = Loader(value=None)
+    tiered_cache.get_or_set('missing', load)
+    tiered_cache.get_or_set('missing', load)
+    assert load.calls == 2
+
+
+def test_lru_bounded():
+    lru = LocalLRU(max_entries=2)
+    for key in 'abc':
+        lru.set(key, key)
+    assert lru.get('a') == (False, None)
+    assert lru.get('c') == (True, 'c')
+
+
+def test_jitter_range():
+    values = {jittered(DEFAULT_TIMEOUT) for _ in range(200)}
+    assert min(values) >= DEFAULT_TIMEOUT * (1 - JITTER)
+    assert max(values) <= DEFAULT_TIMEOUT
+    assert len(values) > 1
+
+
+@pytest.mark.django_db
+def test_cached_list_invalidated_by_signals(mixer, user, published_category):
+    from blog.models import Post
+
+    post = mixer.blend('blog.Post', author=user, category=published_category)
+    queryset = Post.objects.filter(category=published_category)
+    tags = ['feed']
+    assert cached_list(queryset, tags=tags) == [post]
+    new_post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+    )
+    assert set(cached_list(queryset, tags=tags)) == {post, new_post}
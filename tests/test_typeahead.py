@@ -0,0 +1,217 @@
+import threading
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from blog import typeahead
+from blog.models import TypeaheadEvent
+from blog.typeahead import TitleIndex, index
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make(title, **kwargs):
+        kwargs.setdefault('category', published_category)
+        kwargs.setdefault('is_published', True)
+        kwargs.setdefault('pub_date', timezone.now() - timedelta(hours=1))
+        return mixer.blend('blog.Post', author=user, title=title, **kwargs)
+    return make
+
+
+def titles(prefix):
+    """Заголовки подсказок после сверки индекса с журналом, как её
+    делает фоновый поток; сам поиск не обращается к базе."""
+    index.sync()
+    with CaptureQueriesContext(connection) as queries:
+        results = index.lookup(prefix)
+    assert not queries.captured_queries
+    return [result['title'] for result in results]
+
+
+@pytest.mark.django_db
+def test_prefix_matches_any_word(make_post, published_category):
+    make_post('Рецепт борща')
+    make_post('Борщевик у дороги')
+    make_post('Щи')
+    published_category.title = 'Борщи и супы'
+    published_category.save()
+    assert titles('БОР') == [
+        'Борщи и супы', 'Рецепт борща', 'Борщевик у дороги',
+    ]
+    assert titles('рецепт бо') == ['Рецепт борща']
+    assert titles('б') == []
+
+
+@pytest.mark.django_db
+def test_hidden_posts_are_not_suggested(make_post, mixer):
+    make_post('Скрытый', is_published=False)
+    make_post('Скрытый', pub_date=timezone.now() + timedelta(days=1))
+    make_post(
+        'Скрытый', category=mixer.blend('blog.Category', is_published=False),
+    )
+    assert titles('скр') == []
+
+
+@pytest.mark.django_db
+def test_index_follows_changes(make_post, published_category):
+    post = make_post('Пельмени')
+    assert titles('пель') == ['Пельмени']
+    post.title = 'Вареники'
+    post.save()
+    assert titles('пель') == []
+    assert titles('вар') == ['Вареники']
+    published_category.is_published = False
+    published_category.save()
+    assert titles('вар') == []
+    published_category.is_published = True
+    published_category.save()
+    assert titles('вар') == ['Вареники']
+    post.delete()
+    assert titles('вар') == []
+
+
+@pytest.mark.django_db
+def test_other_process_applies_journal(make_post):
+    other = TitleIndex()
+    make_post('Старый пост')
+    other.build()
+    make_post('Новый пост')
+    assert [result['title'] for result in other.lookup('пост')] == [
+        'Старый пост',
+    ]
+    with CaptureQueriesContext(connection) as queries:
+        other.sync()
+    assert len(queries.captured_queries) == 1
+    with CaptureQueriesContext(connection) as queries:
+        results = other.lookup('пост')
+        other.sync()
+    assert not queries.captured_queries
+    assert sorted(result['title'] for result in results) == [
+        'Новый пост', 'Старый пост',
+    ]
+
+
+@pytest.mark.defer_on_commit
+@pytest.mark.django_db
+def test_rolled_back_change_is_not_published(
+    make_post, django_capture_on_commit_callbacks,
+):
+    index.build()
+    events = TypeaheadEvent.objects.count()
+    # Без execute обработчики отбрасываются, как при откате транзакции.
+    with django_capture_on_commit_callbacks():
+        make_post('Фантом')
+    assert TypeaheadEvent.objects.count() == events
+    assert titles('фант') == []
+    with django_capture_on_commit_callbacks(execute=True):
+        make_post('Настоящий')
+    assert titles('наст') == ['Настоящий']
+
+
+@pytest.mark.django_db
+def test_processes_publish_without_losing_events(make_post):
+    other = TitleIndex()
+    other.build()
+    index.build()
+    make_post('Первый пост')
+    second = make_post('Второй пост', is_published=False)
+    second.is_published = True
+    # Другой процесс пишет событие, ничего не зная о событиях первого.
+    other.publish(typeahead.post_entry(second))
+    numbers = list(TypeaheadEvent.objects.values_list('pk', flat=True))
+    assert len(numbers) == len(set(numbers))
+    for process in (index, other):
+        process.sync()
+        assert sorted(
+            result['title'] for result in process.lookup('пост')
+        ) == ['Второй пост', 'Первый пост']
+
+
+@pytest.mark.django_db
+def test_lost_events_trigger_rebuild(make_post, monkeypatch):
+    other = TitleIndex()
+    make_post('Старый пост')
+    other.build()
+    make_post('Новый пост')
+    TypeaheadEvent.objects.all().delete()
+    make_post('Третий пост')
+    builds = []
+    build = TitleIndex.build
+    monkeypatch.setattr(
+        TitleIndex, 'build', lambda self: builds.append(self) or build(self),
+    )
+    other.sync()
+    assert builds == [other]
+    assert sorted(
+        result['title'] for result in other.lookup('пост')
+    ) == ['Новый пост', 'Старый пост', 'Третий пост']
+
+
+@pytest.mark.django_db
+def test_lookup_does_not_build_index(make_post):
+    make_post('Пост')
+    with CaptureQueriesContext(connection) as queries:
+        assert index.lookup('пост') == []
+    assert not queries.captured_queries
+    assert not index.built
+
+
+def test_start_runs_one_sync_thread(monkeypatch):
+    started = threading.Event()
+    monkeypatch.setattr(TitleIndex, '_run', lambda self: started.wait())
+    other = TitleIndex()
+    other.start()
+    thread = other._thread
+    other.start()
+    assert other._thread is thread and thread.is_alive()
+    started.set()
+    thread.join()
+
+
+def test_lookup_starts_sync_thread(monkeypatch):
+    started = threading.Event()
+    monkeypatch.setattr(TitleIndex, 'background', True)
+    monkeypatch.setattr(TitleIndex, '_run', lambda self: started.wait())
+    other = TitleIndex()
+    assert other.lookup('пост') == []
+    thread = other._thread
+    assert thread.is_alive()
+    # В процессе после fork потока родителя нет: поиск запустит свой.
+    other._forked()
+    other.lookup('пост')
+    assert other._thread is not thread
+    started.set()
+    thread.join()
+    other._thread.join()
+
+
+@pytest.mark.django_db
+def test_suggest_endpoint(client, make_post):
+    post = make_post('Осенний лес')
+    index.build()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse('blog:search_suggest'), {'q': 'осен'})
+    assert not queries.captured_queries
+    assert response.json() == {'results': [
+        {'title': 'Осенний лес', 'url': post.get_absolute_url()},
+    ]}
+
+
+@pytest.mark.django_db
+def test_publish_many(make_post):
+    other = TitleIndex()
+    other.build()
+    index.build()
+    posts = [make_post(f'Пост {n}', is_published=False) for n in range(2)]
+    for post in posts:
+        post.is_published = True
+    index.publish_many([typeahead.post_entry(post) for post in posts])
+    for process in (index, other):
+        process.sync()
+        assert sorted(
+            result['title'] for result in process.lookup('пост')
+        ) == ['Пост 0', 'Пост 1']